@@ -91,6 +91,14 @@ class ApacheThriftGen(SimpleCodegenTask):
   def synthetic_target_type(self, target):
     return JavaLibrary
 
+  @property
+  def supports_parallel_codegen(self):
+    return True
+
+  def prepare_parallel_codegen(self):
+    # Bootstrap the thrift compiler once, before any worker needs it.
+    self._thrift_cmd
+
   def is_gentarget(self, target):
     return (isinstance(target, JavaThriftLibrary) and
             'thrift' == self._thrift_defaults.compiler(target))
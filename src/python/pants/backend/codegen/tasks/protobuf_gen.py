@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import subprocess
+import threading
 from collections import OrderedDict
 from hashlib import sha1
 
@@ -77,6 +78,7 @@ class ProtobufGen(SimpleCodegenTask):
     super(ProtobufGen, self).__init__(*args, **kwargs)
     self.plugins = self.get_options().protoc_plugins or []
     self._extra_paths = self.get_options().extra_path or []
+    self._extract_lock = threading.Lock()
 
   @memoized_property
   def protobuf_binary(self):
@@ -85,6 +87,14 @@ class ProtobufGen(SimpleCodegenTask):
                                      self.get_options().version,
                                      'protoc')
 
+  @property
+  def supports_parallel_codegen(self):
+    return True
+
+  def prepare_parallel_codegen(self):
+    # Bootstrap protoc once, before any worker needs it.
+    self.protobuf_binary
+
   @property
   def javadeps(self):
     return self.resolve_deps(self.get_options().javadeps or [])
@@ -177,13 +187,15 @@ class ProtobufGen(SimpleCodegenTask):
     """Extracts the jar to a subfolder of workdir/extracted and returns the path to it."""
     with open(jar_path, 'rb') as f:
       outdir = os.path.join(self.workdir, 'extracted', sha1(f.read()).hexdigest())
-    if not os.path.exists(outdir):
-      ZIP.extract(jar_path, outdir)
-      self.context.log.debug('Extracting jar {jar} at {jar_path}.'
-                             .format(jar=coordinate, jar_path=jar_path))
-    else:
-      self.context.log.debug('Jar {jar} already extracted at {jar_path}.'
-                             .format(jar=coordinate, jar_path=jar_path))
+    # Targets generated concurrently may import the same jar.
+    with self._extract_lock:
+      if not os.path.exists(outdir):
+        ZIP.extract(jar_path, outdir)
+        self.context.log.debug('Extracting jar {jar} at {jar_path}.'
+                               .format(jar=coordinate, jar_path=jar_path))
+      else:
+        self.context.log.debug('Jar {jar} already extracted at {jar_path}.'
+                               .format(jar=coordinate, jar_path=jar_path))
     return outdir
 
   def _proto_path_imports(self, proto_targets):
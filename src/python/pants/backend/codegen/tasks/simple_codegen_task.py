@@ -9,11 +9,13 @@ import logging
 import os
 from abc import abstractmethod
 from collections import OrderedDict
+from multiprocessing import cpu_count
 
 from twitter.common.collections import OrderedSet
 
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
+from pants.base.worker_pool import Work, WorkerPool
 from pants.base.workunit import WorkUnitLabel
 from pants.build_graph.address import Address
 from pants.build_graph.address_lookup_error import AddressLookupError
@@ -46,6 +48,9 @@ class SimpleCodegenTask(Task):
                    'allowed, the logic of find_sources will associate generated sources with '
                    'the least-dependent targets that generate them.',
               advanced=True)
+    register('--worker-count', type=int, default=cpu_count(), advanced=True,
+             help='The maximum number of targets to generate code for concurrently. Only used by '
+                  'code generators that support parallel codegen.')
 
   @classmethod
   def get_fingerprint_strategy(cls):
@@ -68,6 +73,23 @@ class SimpleCodegenTask(Task):
     """
     return True
 
+  @property
+  def supports_parallel_codegen(self):
+    """A property indicating whether `execute_codegen` may run concurrently for several targets.
+
+    Subclasses should only return True if `execute_codegen` writes nothing outside the given
+    `target_workdir` and touches no unsynchronized task state. Duplicate source handling and
+    synthetic target injection are always performed serially, in dependency order.
+    """
+    return False
+
+  def prepare_parallel_codegen(self):
+    """Prepares for `execute_codegen` to run concurrently, before any of it does.
+
+    Subclasses supporting parallel codegen should bootstrap any tools `execute_codegen` lazily
+    memoizes here, so that workers do not race to bootstrap them.
+    """
+
   def synthetic_target_extra_dependencies(self, target, target_workdir):
     """Gets any extra dependencies generated synthetic targets should have.
 
@@ -146,16 +168,49 @@ class SimpleCodegenTask(Task):
     with self.invalidated(self.codegen_targets(),
                           invalidate_dependents=True,
                           fingerprint_strategy=self.get_fingerprint_strategy()) as invalidation_check:
-      with self.context.new_workunit(name='execute', labels=[WorkUnitLabel.MULTITOOL]):
+      with self.context.new_workunit(name='execute', labels=[WorkUnitLabel.MULTITOOL]) as workunit:
+        vts_to_generate = [vt for vt in invalidation_check.all_vts
+                           if not vt.valid and self._do_validate_sources_present(vt.target)]
+        worker_count = min(self.get_options().worker_count, len(vts_to_generate))
+        parallel = self.supports_parallel_codegen and worker_count > 1
+        if parallel:
+          self.prepare_parallel_codegen()
+          self._execute_codegen_concurrently(vts_to_generate, workunit, worker_count)
+
+        generated_vts = set(vts_to_generate)
+        # Synthetic targets are wired into the graph in batches, so that transitive invalidation
+        # only walks the graph once per batch rather than once per target.  A batch must be flushed
+        # before duplicate sources are checked, since that check walks the synthetic targets of the
+        # target's dependencies.
+        pending_derived_addresses = []
         for vt in invalidation_check.all_vts:
           # Build the target and handle duplicate sources.
           if not vt.valid:
-            if self._do_validate_sources_present(vt.target):
-              self.execute_codegen(vt.target, vt.results_dir)
+            if vt in generated_vts:
+              if not parallel:
+                self.execute_codegen(vt.target, vt.results_dir)
+              if pending_derived_addresses:
+                self.context.build_graph.inject_synthetic_dependencies(pending_derived_addresses)
+                pending_derived_addresses = []
               self._handle_duplicate_sources(vt.target, vt.results_dir)
             vt.update()
-          # And inject a synthetic target to represent it.
-          self._inject_synthetic_target(vt.target, vt.results_dir)
+          # And create a synthetic target to represent it.
+          synthetic_target = self._create_synthetic_target(vt.target, vt.results_dir)
+          pending_derived_addresses.append((vt.target.address, synthetic_target.address))
+        self.context.build_graph.inject_synthetic_dependencies(pending_derived_addresses)
+
+  def _execute_codegen_concurrently(self, vts, workunit, worker_count):
+    """Generates code for each of the given versioned targets on a pool of `worker_count` workers.
+
+    Each target generates into its own `results_dir`, so the generators do not interfere with each
+    other; all graph mutation is left to the caller.
+    """
+    pool = WorkerPool(workunit, self.context.run_tracker, worker_count)
+    try:
+      pool.submit_work_and_wait(Work(self.execute_codegen,
+                                     [(vt.target, vt.results_dir) for vt in vts]))
+    finally:
+      pool.shutdown()
 
   @property
   def _copy_target_attributes(self):
@@ -171,6 +226,17 @@ class SimpleCodegenTask(Task):
     :param target: The target to inject a synthetic target for.
     :param target_workdir: The work directory containing the generated code for the target.
     """
+    synthetic_target = self._create_synthetic_target(target, target_workdir)
+    self.context.build_graph.inject_synthetic_dependencies([(target.address,
+                                                             synthetic_target.address)])
+    return synthetic_target
+
+  def _create_synthetic_target(self, target, target_workdir):
+    """Create and return a synthetic target for the given target and workdir.
+
+    The synthetic target is added to the build graph, but dependency edges to and from it are left
+    to `BuildGraph.inject_synthetic_dependencies`.
+    """
     copied_attributes = {}
     for attribute in self._copy_target_attributes:
       copied_attributes[attribute] = getattr(target, attribute)
@@ -186,27 +252,6 @@ class SimpleCodegenTask(Task):
       **copied_attributes
     )
 
-    build_graph = self.context.build_graph
-    # NB(pl): This bypasses the convenience function (Target.inject_dependency) in order
-    # to improve performance.  Note that we can walk the transitive dependee subgraph once
-    # for transitive invalidation rather than walking a smaller subgraph for every single
-    # dependency injected.
-    for dependent_address in build_graph.dependents_of(target.address):
-      build_graph.inject_dependency(
-        dependent=dependent_address,
-        dependency=synthetic_target.address,
-      )
-    # NB(pl): See the above comment.  The same note applies.
-    for concrete_dependency_address in build_graph.dependencies_of(target.address):
-      build_graph.inject_dependency(
-        dependent=synthetic_target.address,
-        dependency=concrete_dependency_address,
-      )
-    build_graph.walk_transitive_dependee_graph(
-      build_graph.dependencies_of(target.address),
-      work=lambda t: t.mark_transitive_invalidation_hash_dirty(),
-    )
-
     if target in self.context.target_roots:
       self.context.target_roots.append(synthetic_target)
 
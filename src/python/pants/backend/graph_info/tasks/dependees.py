@@ -5,10 +5,8 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
-from collections import defaultdict
-
 from pants.backend.graph_info.tasks.target_filter_task_mixin import TargetFilterTaskMixin
-from pants.base.build_environment import get_buildroot
+from pants.build_graph.dependee_index import DependeeIndex
 from pants.task.console_task import ConsoleTask
 
 
@@ -32,45 +30,16 @@ class ReverseDepmap(TargetFilterTaskMixin, ConsoleTask):
     self._spec_excludes = None
 
   def console_output(self, _):
-    address_mapper = self.context.address_mapper
-    buildfiles = address_mapper.scan_build_files(base_path=None, spec_excludes=self._spec_excludes)
-
-    build_graph = self.context.build_graph
-    build_file_parser = self.context.build_file_parser
-
-    dependees_by_target = defaultdict(set)
-    for build_file in buildfiles:
-      address_map = build_file_parser.parse_build_file(build_file)
-      for address in address_map.keys():
-        build_graph.inject_address_closure(address)
-      for address in address_map.keys():
-        target = build_graph.get_target(address)
-        # TODO(John Sirois): tighten up the notion of targets written down in a BUILD by a
-        # user vs. targets created by pants at runtime.
-        target = self.get_concrete_target(target)
-        for dependency in target.dependencies:
-          dependency = self.get_concrete_target(dependency)
-          dependees_by_target[dependency].add(target)
+    dependee_index = DependeeIndex(self.context.address_mapper,
+                                   self.context.build_graph,
+                                   DependeeIndex.index_file(self.get_options().pants_workdir),
+                                   spec_excludes=self._spec_excludes)
 
-    roots = set(self.context.target_roots)
+    roots = set(root.address for root in self.context.target_roots)
     if self._closed:
       for root in roots:
-        yield root.address.spec
-
-    for dependent in self.get_dependents(dependees_by_target, roots):
-      yield dependent.address.spec
-
-  def get_dependents(self, dependees_by_target, roots):
-    check = set(roots)
-    known_dependents = set()
-    while True:
-      dependents = set(known_dependents)
-      for target in check:
-        dependents.update(dependees_by_target[target])
-      check = dependents - known_dependents
-      if not check or not self._transitive:
-        return dependents - set(roots)
-      known_dependents = dependents
+        yield root.spec
 
-  def get_concrete_target(self, target):
-    return target.concrete_derived_from
+    dependees = dependee_index.dependees_of(roots, transitive=self._transitive)
+    for dependee in sorted(dependees - roots):
+      yield dependee.spec
@@ -5,13 +5,27 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+from pants.build_graph.owner_index import OwnerIndex
 from pants.task.console_task import ConsoleTask
 
 
 class Filemap(ConsoleTask):
   """Print a mapping from source file to the target that owns the source file."""
 
+  @classmethod
+  def register_options(cls, register):
+    super(Filemap, cls).register_options(register)
+    register('--owner-index', action='store_true', default=True, advanced=True,
+             help='When no targets are specified, map the sources of every target in the repo '
+                  'using a persistent index that is updated incrementally as BUILD files and '
+                  'source directories change, rather than parsing every BUILD file.')
+
   def console_output(self, _):
+    if not self.context.target_roots and self.get_options().owner_index:
+      for line in self._indexed_console_output():
+        yield line
+      return
+
     visited = set()
     for target in self._find_targets():
       if target not in visited:
@@ -19,6 +33,19 @@ class Filemap(ConsoleTask):
         for rel_source in target.sources_relative_to_buildroot():
           yield '{} {}'.format(rel_source, target.address.spec)
 
+  def _indexed_console_output(self):
+    address_mapper = self.context.address_mapper
+    owner_index = OwnerIndex(address_mapper,
+                             self.context.build_graph,
+                             OwnerIndex.index_file(self.get_options().pants_workdir))
+    build_files = address_mapper.scan_build_files(base_path=None,
+                                                  spec_excludes=self.context.spec_excludes)
+    spec_paths = set(build_file.spec_path for build_file in build_files)
+    sources_by_address = owner_index.sources_in_spec_paths(spec_paths)
+    for address in sorted(sources_by_address):
+      for rel_source in sources_by_address[address]:
+        yield '{} {}'.format(rel_source, address.spec)
+
   def _find_targets(self):
     if len(self.context.target_roots) > 0:
       return self.context.target_roots
@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 from pants.base.exceptions import TaskError
+from pants.build_graph.owner_index import OwnerIndex
 from pants.build_graph.source_mapper import LazySourceMapper
 from pants.task.console_task import ConsoleTask
 
@@ -18,6 +19,13 @@ class ListOwners(ConsoleTask):
       another/path:target2
   """
 
+  @classmethod
+  def register_options(cls, register):
+    super(ListOwners, cls).register_options(register)
+    register('--owner-index', action='store_true', default=True, advanced=True,
+             help='Look up owners in a persistent index that is updated incrementally as BUILD '
+                  'files and source directories change, rather than re-parsing BUILD files.')
+
   @classmethod
   def supports_passthru_args(cls):
     return True
@@ -28,8 +36,13 @@ class ListOwners(ConsoleTask):
       raise TaskError('No source was specified')
     elif len(sources) > 1:
       raise TaskError('Too many sources specified.')
-    lazy_source_mapper = LazySourceMapper(self.context.address_mapper, self.context.build_graph)
+    if self.get_options().owner_index:
+      source_mapper = OwnerIndex(self.context.address_mapper,
+                                 self.context.build_graph,
+                                 OwnerIndex.index_file(self.get_options().pants_workdir))
+    else:
+      source_mapper = LazySourceMapper(self.context.address_mapper, self.context.build_graph)
     for source in sources:
-      target_addresses_for_source = lazy_source_mapper.target_addresses_for_source(source)
+      target_addresses_for_source = source_mapper.target_addresses_for_source(source)
       for address in target_addresses_for_source:
         yield address.spec
@@ -12,10 +12,12 @@ from contextlib import contextmanager
 
 from pants.backend.jvm.subsystems.jvm_tool_mixin import JvmToolMixin
 from pants.backend.jvm.targets.jar_dependency import JarDependency
+from pants.base.hash_utils import hash_all, hash_file
 from pants.java.distribution.distribution import DistributionLocator
 from pants.java.executor import SubprocessExecutor
 from pants.subsystem.subsystem import Subsystem, SubsystemError
 from pants.util.contextutil import open_zip, temporary_file
+from pants.util.memo import memoized_property
 
 
 class Shading(object):
@@ -336,6 +338,15 @@ class Shader(object):
     self._executor = executor
     self._system_packages = None
 
+  @memoized_property
+  def fingerprint(self):
+    """A fingerprint of the jarjar this shader runs, which changes along with its classpath.
+
+    :rtype: string
+    """
+    return hash_all(hash_file(path) if os.path.isfile(path) else path
+                    for path in self._jarjar_classpath)
+
   def _calculate_system_packages(self):
     system_packages = set()
     boot_classpath = self._executor.distribution.system_properties['sun.boot.class.path']
@@ -6,6 +6,9 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import time
+from hashlib import sha1
+from multiprocessing import cpu_count
 
 from twitter.common.collections import OrderedSet
 
@@ -15,9 +18,12 @@ from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.backend.jvm.tasks.jvm_binary_task import JvmBinaryTask
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
+from pants.base.hash_utils import hash_file
+from pants.base.worker_pool import Work, WorkerPool
 from pants.fs import archive
 from pants.fs.archive import JAR
-from pants.util.dirutil import safe_mkdir
+from pants.util.dirutil import safe_delete, safe_mkdir, safe_rmtree
+from pants.util.fileutil import atomic_copy
 
 
 class BundleCreate(JvmBinaryTask):
@@ -45,6 +51,12 @@ class BundleCreate(JvmBinaryTask):
     register('--use-basename-prefix', action='store_true', default=False,
              help='Use target basename to prefix bundle folder or archive; otherwise a unique '
                   'identifier derived from target will be used.')
+    register('--shading-worker-count', advanced=True, type=int, default=cpu_count(),
+             help='The maximum number of jars to shade concurrently when bundling a binary with '
+                  'shading rules.')
+    register('--shaded-jars-max-age-days', advanced=True, type=int, default=30,
+             help='Cached shaded jars that have not been used by any bundle run for this many '
+                  'days are pruned.')
 
   @classmethod
   def product_types(cls):
@@ -66,6 +78,11 @@ class BundleCreate(JvmBinaryTask):
       self.basename = target.basename if use_basename_prefix else target.id
       self.target = target
 
+  def __init__(self, *args, **kwargs):
+    super(BundleCreate, self).__init__(*args, **kwargs)
+    # The fingerprint of the shading tool, once this run has shaded any jars.
+    self._shader_fingerprint = None
+
   @property
   def cache_target_dirs(self):
     return True
@@ -115,6 +132,9 @@ class BundleCreate(JvmBinaryTask):
         )
         self.context.log.info('created {}'.format(os.path.relpath(archivepath, get_buildroot())))
 
+    if self._shader_fingerprint:
+      self.prune_shaded_jars(self._shader_fingerprint)
+
   class BasenameConflictError(TaskError):
     """Indicates the same basename is used by two targets."""
 
@@ -153,11 +173,8 @@ class BundleCreate(JvmBinaryTask):
       classpath.update([jar.path])
 
     if app.binary.shading_rules:
-      for jar_path in classpath:
-        # In case `jar_path` is a symlink, this is still safe, shaded jar will overwrite jar_path,
-        # original file `jar_path` linked to remains untouched.
-        # TODO run in parallel to speed up
-        self.shade_jar(shading_rules=app.binary.shading_rules, jar_path=jar_path)
+      # The bundle jar is freshly built on every run, so there is no point caching its shading.
+      self.shade_jars(app.binary.shading_rules, classpath, uncached_jar_paths=[bundle_jar])
 
     for bundle in app.bundles:
       for path, relpath in bundle.filemap.items():
@@ -170,6 +187,91 @@ class BundleCreate(JvmBinaryTask):
 
     return bundle_dir
 
+  def shade_jars(self, shading_rules, jar_paths, uncached_jar_paths=()):
+    """Shades the given jars in place, concurrently.
+
+    In case a jar path is a symlink this is still safe: the shaded jar will overwrite the symlink and
+    the original file it linked to remains untouched.
+
+    Shaded jars are cached under the task workdir keyed by a fingerprint of the shading tool, a
+    fingerprint of the shading rules and the digest of the input jar, so that a jar is only shaded
+    once across bundle runs and across apps that share dependencies.
+
+    :param list shading_rules: The rules to shade the jars with.
+    :param list jar_paths: The paths of the jars to shade.
+    :param list uncached_jar_paths: Paths amongst `jar_paths` that should be shaded without
+      consulting or populating the cache.
+    """
+    # Create the shader up front rather than racing to bootstrap it from the workers.
+    shader = self.shader
+
+    self._shader_fingerprint = shader.fingerprint
+
+    rules_fingerprint = sha1()
+    for rule in shading_rules:
+      rules_fingerprint.update(rule.render().encode('utf-8'))
+    cache_dir = os.path.join(self._shaded_jars_dir, shader.fingerprint,
+                             rules_fingerprint.hexdigest())
+
+    def shade(jar_path):
+      if jar_path in uncached_jar_paths:
+        self.shade_jar(shading_rules=shading_rules, jar_path=jar_path)
+        return
+
+      cached_jar = os.path.join(cache_dir, '{}.jar'.format(hash_file(jar_path)))
+      if not os.path.exists(cached_jar):
+        self.shade_jar(shading_rules=shading_rules, jar_path=jar_path)
+        safe_mkdir(cache_dir)
+        atomic_copy(jar_path, cached_jar)
+      else:
+        self.context.log.debug('Using cached shaded jar for {}.'.format(jar_path))
+        atomic_copy(cached_jar, jar_path)
+        # Record the use, so the jar is pruned only once it has gone unused for long enough.
+        os.utime(cached_jar, None)
+
+    jar_paths = list(jar_paths)
+    worker_count = min(self.get_options().shading_worker_count, len(jar_paths))
+    if worker_count <= 1:
+      for jar_path in jar_paths:
+        shade(jar_path)
+      return
+
+    with self.context.new_workunit('shade') as workunit:
+      pool = WorkerPool(workunit, self.context.run_tracker, worker_count)
+      try:
+        pool.submit_work_and_wait(Work(shade, [(jar_path,) for jar_path in jar_paths]))
+      finally:
+        pool.shutdown()
+
+  @property
+  def _shaded_jars_dir(self):
+    return os.path.join(self.workdir, 'shaded')
+
+  def prune_shaded_jars(self, shader_fingerprint):
+    """Removes the cached shaded jars that are stale or have not been used for a while.
+
+    Jars shaded by any tool other than the one with the given fingerprint are stale. Otherwise,
+    jars are kept for --shaded-jars-max-age-days after they were last used by any bundle run, so
+    that apps bundled in separate runs keep their cached jars.
+
+    :param string shader_fingerprint: The fingerprint of the current shading tool.
+    """
+    if not os.path.isdir(self._shaded_jars_dir):
+      return
+    for name in os.listdir(self._shaded_jars_dir):
+      if name != shader_fingerprint:
+        safe_rmtree(os.path.join(self._shaded_jars_dir, name))
+
+    expired = time.time() - self.get_options().shaded_jars_max_age_days * 24 * 60 * 60
+    for root, _, files in os.walk(os.path.join(self._shaded_jars_dir, shader_fingerprint),
+                                  topdown=False):
+      for name in files:
+        path = os.path.join(root, name)
+        if os.path.getmtime(path) < expired:
+          safe_delete(path)
+      if not os.listdir(root):
+        os.rmdir(root)
+
   def consolidate_classpath(self, targets, classpath_products):
     """Convert loose directories in classpath_products into jars. """
 
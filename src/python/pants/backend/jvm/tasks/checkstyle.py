@@ -11,14 +11,16 @@ from twitter.common.collections import OrderedSet
 
 from pants.backend.jvm.subsystems.shader import Shader
 from pants.backend.jvm.targets.jar_dependency import JarDependency
+from pants.backend.jvm.tasks.lint_task_mixin import LintTaskMixin
 from pants.backend.jvm.tasks.nailgun_task import NailgunTask
 from pants.base.exceptions import TaskError
+from pants.build_graph.build_graph import BuildGraph
 from pants.option.custom_types import dict_option, file_option
 from pants.process.xargs import Xargs
 from pants.util.dirutil import safe_open
 
 
-class Checkstyle(NailgunTask):
+class Checkstyle(LintTaskMixin, NailgunTask):
   """Check Java code for style violations."""
 
   _CHECKSTYLE_MAIN = 'com.puppycrawl.tools.checkstyle.Main'
@@ -82,13 +84,18 @@ class Checkstyle(NailgunTask):
       return
     targets = self.context.targets(self._is_checked)
     with self.invalidated(targets) as invalidation_check:
-      invalid_targets = [vt.target for vt in invalidation_check.invalid_vts]
-      sources = self.calculate_sources(invalid_targets)
-      if sources:
-        result = self.checkstyle(invalid_targets, sources)
-        if result != 0:
-          raise TaskError('java {main} ... exited non-zero ({result})'.format(
-            main=self._CHECKSTYLE_MAIN, result=result))
+      invalid_vts = invalidation_check.invalid_vts
+      if not invalid_vts:
+        return
+      check = self.create_checker([vt.target for vt in invalid_vts])
+      failed_targets = self.lint(invalid_vts,
+                                 lambda target: sorted(self.calculate_sources([target])),
+                                 check)
+      if failed_targets:
+        raise TaskError('java {main} ... exited non-zero for {count} target(s):\n  {specs}'.format(
+          main=self._CHECKSTYLE_MAIN,
+          count=len(failed_targets),
+          specs='\n  '.join(target.address.spec for target in failed_targets)))
 
   def calculate_sources(self, targets):
     sources = set()
@@ -98,12 +105,19 @@ class Checkstyle(NailgunTask):
     return sources
 
   def checkstyle(self, targets, sources):
+    return self.create_checker(targets)(sources)
+
+  def create_checker(self, targets):
+    """Returns a function that checkstyles the sources it is passed, returning an exit code.
+
+    :param targets: The targets whose runtime classpath checkstyle should run with.
+    """
+    # The classpath of the combined closure is computed once and shared by all the chunks checked.
     runtime_classpaths = self.context.products.get_data('runtime_classpath')
     union_classpath = OrderedSet(self.tool_classpath('checkstyle'))
-    for target in targets:
-      runtime_classpath = runtime_classpaths.get_for_targets(target.closure(bfs=True))
-      union_classpath.update(jar for conf, jar in runtime_classpath
-                             if conf in self.get_options().confs)
+    runtime_classpath = runtime_classpaths.get_for_targets(BuildGraph.closure(targets, bfs=True))
+    union_classpath.update(jar for conf, jar in runtime_classpath
+                           if conf in self.get_options().confs)
 
     args = [
       '-c', self.get_options().configuration,
@@ -123,6 +137,8 @@ class Checkstyle(NailgunTask):
       return self.runjava(classpath=union_classpath, main=self._CHECKSTYLE_MAIN,
                           jvm_options=self.get_options().jvm_options,
                           args=args + xargs, workunit_name='checkstyle')
-    checks = Xargs(call)
+    checks = Xargs(call, max_args_size=self.runjava_max_args_size(
+      classpath=union_classpath, main=self._CHECKSTYLE_MAIN,
+      jvm_options=self.get_options().jvm_options, args=args))
 
-    return checks.execute(sources)
+    return checks.execute
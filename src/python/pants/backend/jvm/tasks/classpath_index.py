@@ -0,0 +1,163 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import logging
+import os
+import time
+from hashlib import sha1
+
+from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import safe_concurrent_creation
+
+
+logger = logging.getLogger(__name__)
+
+
+class ClasspathIndex(object):
+  """A persistent index of the contents of individual classpath entries.
+
+  The contents of each jar are recorded under the digest of the jar, so identical jars at different
+  paths share an index entry, and a jar is only re-listed when its content changes.  The last seen
+  size and modification time of each jar path are recorded alongside its digest so an unchanged jar
+  does not even need to be re-hashed.
+
+  The contents of each classes directory are recorded along with the modification times of the
+  directory and all of its subdirectories.  Since adding or removing a file or directory changes
+  the modification time of its parent, the recorded contents are known to be current if none of
+  these have changed, and a directory is then validated with one stat per subdirectory rather than
+  a full walk.  A change made within the filesystem's mtime resolution of the walk that recorded
+  the contents would go unnoticed, so, like git's racy index entries, contents are only persisted
+  once every directory is comfortably older than the walk.
+
+  Contents are reported exactly as `ClasspathUtil.classpath_entries_contents` would report them.
+  """
+
+  # Bump this when the persisted format changes to force a full re-index.
+  _VERSION = 1
+
+  # A conservative bound on filesystem mtime resolution; FAT has the coarsest, at 2 seconds.
+  _MTIME_RESOLUTION_SECS = 2
+
+  @staticmethod
+  def index_dir(pants_workdir):
+    """Returns the default location of the classpath index under the given pants workdir."""
+    return os.path.join(pants_workdir, 'jvm', 'classpath_index')
+
+  def __init__(self, index_dir):
+    """
+    :param string index_dir: The directory the index is persisted to.
+    """
+    self._index_dir = index_dir
+    self._contents_by_entry = {}
+
+  def _path_key(self, entry):
+    return sha1(os.path.realpath(entry).encode('utf-8')).hexdigest()
+
+  def _load(self, *components):
+    path = os.path.join(self._index_dir, *components)
+    try:
+      with open(path, 'rb') as fp:
+        index = json.load(fp)
+    except IOError:
+      return None
+    except ValueError as e:
+      logger.debug('Ignoring corrupt classpath index {}: {}'.format(path, e))
+      return None
+    if index.get('version') != self._VERSION:
+      return None
+    return index
+
+  def _store(self, index, *components):
+    index['version'] = self._VERSION
+    with safe_concurrent_creation(os.path.join(self._index_dir, *components)) as tmp_path:
+      with open(tmp_path, 'wb') as fp:
+        json.dump(index, fp)
+
+  @staticmethod
+  def _digest(path):
+    hasher = sha1()
+    with open(path, 'rb') as fp:
+      for chunk in iter(lambda: fp.read(64 * 1024), b''):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+  def _jar_contents(self, jar):
+    stat = os.stat(jar)
+    fingerprint = [stat.st_size, stat.st_mtime]
+    path_key = self._path_key(jar)
+    path_index = self._load('paths', path_key)
+    if path_index and path_index['fingerprint'] == fingerprint:
+      digest = path_index['digest']
+    else:
+      digest = self._digest(jar)
+      self._store({'fingerprint': fingerprint, 'digest': digest}, 'paths', path_key)
+
+    jar_index = self._load('jars', digest)
+    if jar_index is None:
+      with open_zip(jar, 'r') as zf:
+        jar_index = {'contents': zf.namelist()}
+      self._store(jar_index, 'jars', digest)
+    return jar_index['contents']
+
+  def _dir_mtimes(self, classes_dir, subdirs):
+    mtimes = {}
+    for subdir in [''] + subdirs:
+      try:
+        mtimes[subdir] = os.stat(os.path.join(classes_dir, subdir)).st_mtime
+      except OSError:
+        # The subdir was removed, which also changes the mtime of its parent.
+        mtimes[subdir] = None
+    return mtimes
+
+  def _dir_contents(self, classes_dir):
+    path_key = self._path_key(classes_dir)
+    dir_index = self._load('dirs', path_key)
+    if dir_index is not None:
+      subdirs = [name.rstrip('/') for name in dir_index['contents'] if name.endswith('/')]
+      if self._dir_mtimes(classes_dir, subdirs) == dir_index['mtimes']:
+        return dir_index['contents']
+
+    walked_at = time.time()
+    contents = list(ClasspathUtil.classpath_entries_contents([classes_dir]))
+    subdirs = [name.rstrip('/') for name in contents if name.endswith('/')]
+    mtimes = self._dir_mtimes(classes_dir, subdirs)
+    racy = any(mtime is None or mtime >= walked_at - self._MTIME_RESOLUTION_SECS
+               for mtime in mtimes.values())
+    if not racy:
+      self._store({'mtimes': mtimes, 'contents': contents}, 'dirs', path_key)
+    return contents
+
+  def contents(self, entry):
+    """Returns the contents of the given classpath entry.
+
+    :param string entry: The path of a jar or classes directory; other entries are ignored.
+    :returns: The directories, classes and resources in the entry, relative to the entry.
+    :rtype: list of strings
+    """
+    if entry not in self._contents_by_entry:
+      if ClasspathUtil.is_jar(entry):
+        contents = self._jar_contents(entry)
+      elif ClasspathUtil.is_dir(entry):
+        contents = self._dir_contents(entry)
+      else:
+        contents = []
+      self._contents_by_entry[entry] = contents
+    return self._contents_by_entry[entry]
+
+  def entries_contents(self, classpath_entries):
+    """Provide a generator over the contents of a classpath, merged across its indexed entries.
+
+    :param classpath_entries: A sequence of classpath_entries. Non-jars/dirs are ignored.
+    :returns: An iterator over all classpath contents, one directory, class or resource relative
+              path per iteration step.
+    :rtype: :class:`collections.Iterator` of string
+    """
+    for entry in classpath_entries:
+      for name in self.contents(entry):
+        yield name
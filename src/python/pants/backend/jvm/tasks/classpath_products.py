@@ -12,7 +12,6 @@ from twitter.common.collections import OrderedSet
 from pants.backend.jvm.targets.exclude import Exclude
 from pants.backend.jvm.targets.jvm_target import JvmTarget
 from pants.base.exceptions import TaskError
-from pants.build_graph.build_graph import BuildGraph
 from pants.goal.products import UnionProducts
 
 
@@ -123,23 +122,54 @@ def _matches_exclude(coordinate, exclude):
   return False
 
 
+def _index_excludes(excludes):
+  """Indexes excludes by org, mapping each to the set of excluded names or `None` for all names."""
+  names_by_org = {}
+  for exclude in excludes:
+    if not exclude.name:
+      names_by_org[exclude.org] = None
+    elif exclude.org not in names_by_org:
+      names_by_org[exclude.org] = {exclude.name}
+    elif names_by_org[exclude.org] is not None:
+      names_by_org[exclude.org].add(exclude.name)
+  return names_by_org
+
+
 def _not_excluded_filter(excludes):
+  names_by_org = _index_excludes(excludes)
+
   def not_excluded(product_to_target):
     path_tuple = product_to_target[0]
     conf, classpath_entry = path_tuple
-    return not classpath_entry.is_excluded_by(excludes)
+    if not ClasspathEntry.is_artifact_classpath_entry(classpath_entry):
+      return not classpath_entry.is_excluded_by(excludes)
+    coordinate = classpath_entry.coordinate
+    if coordinate.org not in names_by_org:
+      return True
+    names = names_by_org[coordinate.org]
+    return names is not None and coordinate.name not in names
   return not_excluded
 
 
 class ClasspathProducts(object):
-  def __init__(self, pants_workdir, classpaths=None, excludes=None):
+  def __init__(self, pants_workdir, classpaths=None, excludes=None, build_graph=None):
+    """
+    :param string pants_workdir: The pants workdir that classpath entries must live under.
+    :param build_graph: The build graph of the products' targets. When given, the excludes that
+      apply to the classpath of targets are cached for as long as neither the products nor the
+      graph change; otherwise they are recomputed on every request.
+    :type build_graph: :class:`pants.build_graph.build_graph.BuildGraph`
+    """
     self._classpaths = classpaths or UnionProducts()
     self._excludes = excludes or UnionProducts()
     self._pants_workdir = pants_workdir
+    self._build_graph = build_graph
+    self._caches_generation = None
+    self._clear_caches()
 
   @staticmethod
-  def init_func(pants_workdir):
-    return lambda: ClasspathProducts(pants_workdir)
+  def init_func(pants_workdir, build_graph=None):
+    return lambda: ClasspathProducts(pants_workdir, build_graph=build_graph)
 
   def copy(self):
     """Returns a copy of this ClasspathProducts.
@@ -152,7 +182,8 @@ class ClasspathProducts(object):
     """
     return ClasspathProducts(pants_workdir=self._pants_workdir,
                              classpaths=self._classpaths.copy(),
-                             excludes=self._excludes.copy())
+                             excludes=self._excludes.copy(),
+                             build_graph=self._build_graph)
 
   def add_for_targets(self, targets, classpath_elements):
     """Adds classpath path elements to the products of all the provided targets."""
@@ -192,6 +223,7 @@ class ClasspathProducts(object):
   def remove_for_target(self, target, classpath_elements):
     """Removes the given entries for the target."""
     self._classpaths.remove_for_target(target, self._wrap_path_elements(classpath_elements))
+    self._clear_caches()
 
   def get_for_target(self, target):
     """Gets the classpath products for the given target.
@@ -242,11 +274,16 @@ class ClasspathProducts(object):
     :param bool respect_excludes: `True` to respect excludes; `False` to ignore them.
     :returns: The ordered (classpath products, target) tuples.
     """
-    classpath_target_tuples = self._classpaths.get_product_target_mappings_for_targets(targets)
-    if respect_excludes:
-      return self._filter_by_excludes(classpath_target_tuples, targets)
-    else:
-      return classpath_target_tuples
+    targets = tuple(targets)
+    key = (targets, respect_excludes)
+    self._validate_caches()
+    classpath_target_tuples = self._product_target_mappings_cache.get(key)
+    if classpath_target_tuples is None:
+      classpath_target_tuples = self._classpaths.get_product_target_mappings_for_targets(targets)
+      if respect_excludes:
+        classpath_target_tuples = self._filter_by_excludes(classpath_target_tuples, targets)
+      self._product_target_mappings_cache[key] = classpath_target_tuples
+    return list(classpath_target_tuples)
 
   def get_artifact_classpath_entries_for_targets(self, targets, respect_excludes=True):
     """Gets the artifact classpath products for the given targets.
@@ -283,16 +320,58 @@ class ClasspathProducts(object):
   def _filter_by_excludes(self, classpath_target_tuples, root_targets):
     # Excludes are always applied transitively, so regardless of whether a transitive
     # set of targets was included here, their closure must be included.
-    closure = BuildGraph.closure(root_targets, bfs=True)
-    excludes = self._excludes.get_for_targets(closure)
+    excludes = set()
+    for target in root_targets:
+      excludes.update(self._transitive_excludes(target))
+    if not excludes:
+      return list(classpath_target_tuples)
     return filter(_not_excluded_filter(excludes), classpath_target_tuples)
 
+  def _transitive_excludes(self, target):
+    # Memoized per target, the transitive excludes of a target being its own excludes plus those
+    # of its dependencies; this visits each target in the closure of a run at most once. The walk
+    # is iterative, since chains of dependencies can be deeper than the recursion limit.
+    memo = self._transitive_excludes_cache
+    visiting = set()
+    stack = [(target, False)]
+    while stack:
+      current, dependencies_visited = stack.pop()
+      if dependencies_visited:
+        excludes = set(self._excludes.get_for_target(current))
+        for dependency in current.dependencies:
+          # A dependency still being visited is part of an (erroneous) dependency cycle; these are
+          # reported by target sorting elsewhere.
+          excludes.update(memo.get(dependency, ()))
+        memo[current] = frozenset(excludes)
+        visiting.discard(current)
+      elif current not in memo and current not in visiting:
+        visiting.add(current)
+        stack.append((current, True))
+        for dependency in reversed(current.dependencies):
+          if dependency not in memo and dependency not in visiting:
+            stack.append((dependency, False))
+    return memo[target]
+
+  def _validate_caches(self):
+    # The transitive closure of targets, and so the excludes that apply, can change whenever new
+    # (synthetic) targets or dependencies are injected into the build graph. Without the graph to
+    # tell when that happens, nothing is cached across requests.
+    generation = self._build_graph.generation if self._build_graph else None
+    if generation is None or generation != self._caches_generation:
+      self._clear_caches()
+      self._caches_generation = generation
+
+  def _clear_caches(self):
+    self._transitive_excludes_cache = {}
+    self._product_target_mappings_cache = {}
+
   def _add_excludes_for_target(self, target):
     if target.is_exported:
       self._excludes.add_for_target(target, [Exclude(target.provides.org,
                                                      target.provides.name)])
     if isinstance(target, JvmTarget) and target.excludes:
       self._excludes.add_for_target(target, target.excludes)
+    self._clear_caches()
 
   def _wrap_path_elements(self, classpath_elements):
     return [(element[0], ClasspathEntry(element[1])) for element in classpath_elements]
@@ -300,6 +379,7 @@ class ClasspathProducts(object):
   def _add_elements_for_target(self, target, elements):
     self._validate_classpath_tuples(elements, target)
     self._classpaths.add_for_target(target, elements)
+    self._clear_caches()
 
   def _validate_classpath_tuples(self, classpath, target):
     """Validates that all files are located within the working directory, to simplify relativization.
@@ -8,7 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import itertools
 import os
 import re
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 
 from twitter.common.collections import OrderedSet
 
@@ -185,6 +185,19 @@ class ClasspathUtil(object):
     """True if the given path represents an existing directory."""
     return os.path.isdir(path)
 
+  # Matches the symlinks and classpath files `create_canonical_classpath` creates for a target.
+  _CANONICAL_CLASSPATH_FILE_RE = re.compile(
+    r'^(?P<target_id>.+)-(?:[0-9]+(?:\.[^.]+)?|classpath\.txt)$')
+
+  @staticmethod
+  def _write_if_changed(path, content, exists=True):
+    if exists and os.path.isfile(path):
+      with open(path, 'rb') as fp:
+        if fp.read() == content:
+          return
+    with safe_open(path, 'wb') as fp:
+      fp.write(content)
+
   @classmethod
   def create_canonical_classpath(cls, classpath_products, targets, basedir,
                                  save_classpath_file=False,
@@ -203,6 +216,10 @@ class ClasspathUtil(object):
     Caller wants that behavior can make the similar calls for other targets or just remove
     the `basedir` first.
 
+    The refresh is incremental: symlinks that already point at the right classpath entry and
+    classpath files whose content is unchanged are left untouched, so repeated calls against the
+    same `basedir` only pay for what changed.
+
     :param classpath_products: Classpath products.
     :param targets: Targets to create canonical classpath for.
     :param basedir: Directory to create symlinks.
@@ -215,46 +232,32 @@ class ClasspathUtil(object):
     :returns: Converted canonical classpath.
     :rtype: list of strings
     """
-    def delete_old_target_output_files(classpath_prefix):
-      """Delete existing output files or symlinks for target."""
-      directory, basename = os.path.split(classpath_prefix)
-      pattern = re.compile(r'^{basename}(([0-9]+)(\.jar)?|classpath\.txt)$'
-                           .format(basename=re.escape(basename)))
-      files = [filename for filename in os.listdir(directory) if pattern.match(filename)]
-      for rel_path in files:
-        path = os.path.join(directory, rel_path)
-        if os.path.islink(path) or os.path.isfile(path):
-          safe_delete(path)
-
-    def prepare_target_output_folder(basedir, target):
-      """Prepare directory that will contain canonical classpath for the target.
-
-      This includes creating directories if it does not already exist, cleaning up
-      previous classpath output related to the target.
-      """
-      output_dir = basedir
-      # TODO(peiyu) improve readability once we deprecate the old naming style.
-      # For example, `-` is commonly placed in string format as opposed to here.
-      classpath_prefix_for_target = '{basedir}/{target_id}-'.format(basedir=basedir,
-                                                                    target_id=target.id)
-
-      if os.path.exists(output_dir):
-        delete_old_target_output_files(classpath_prefix_for_target)
-      else:
-        os.makedirs(output_dir)
-      return classpath_prefix_for_target
-
     excludes = excludes or set()
     canonical_classpath = []
     target_to_classpath = cls.classpath_by_targets(targets, classpath_products)
 
+    # Index the existing output files under `basedir` by the id of the target that owns them, so
+    # that only the entries that actually changed need to be touched.
+    existing_files_by_target_id = defaultdict(set)
+    if os.path.isdir(basedir):
+      for filename in os.listdir(basedir):
+        match = cls._CANONICAL_CLASSPATH_FILE_RE.match(filename)
+        if match:
+          existing_files_by_target_id[match.group('target_id')].add(filename)
+    else:
+      os.makedirs(basedir)
+
     processed_entries = set()
     for target, classpath_entries_for_target in target_to_classpath.items():
       if internal_classpath_only:
         classpath_entries_for_target = filter(ClasspathEntry.is_internal_classpath_entry,
                                               classpath_entries_for_target)
       if len(classpath_entries_for_target) > 0:
-        classpath_prefix_for_target = prepare_target_output_folder(basedir, target)
+        # TODO(peiyu) improve readability once we deprecate the old naming style.
+        # For example, `-` is commonly placed in string format as opposed to here.
+        classpath_prefix_for_target = '{target_id}-'.format(target_id=target.id)
+        existing_files = existing_files_by_target_id[target.id]
+        expected_files = set()
 
         # Note: for internal targets pants has only one classpath entry, but user plugins
         # might generate additional entries, for example, build.properties for the target.
@@ -274,19 +277,32 @@ class ClasspathUtil(object):
           # Create a unique symlink path by prefixing the base file name with a monotonic
           # increasing `index` to avoid name collisions.
           _, ext = os.path.splitext(entry.path)
-          symlink_path = '{}{}{}'.format(classpath_prefix_for_target, index, ext)
+          symlink_name = '{}{}{}'.format(classpath_prefix_for_target, index, ext)
+          symlink_path = os.path.join(basedir, symlink_name)
           if not os.path.exists(entry.path):
             raise MissingClasspathEntryError('Could not find {src} when attempting to link '
                                              'it into the {dst}'
                                              .format(src=entry.path, dst=symlink_path))
 
-          os.symlink(entry.path, symlink_path)
+          expected_files.add(symlink_name)
+          if not (symlink_name in existing_files and os.path.islink(symlink_path) and
+                  os.readlink(symlink_path) == entry.path):
+            safe_delete(symlink_path)
+            os.symlink(entry.path, symlink_path)
           canonical_classpath.append(symlink_path)
 
         if save_classpath_file:
+          classpath_file_name = '{}classpath.txt'.format(classpath_prefix_for_target)
+          expected_files.add(classpath_file_name)
           classpath = [entry.path for entry in classpath_entries_for_target]
-          with safe_open('{}classpath.txt'.format(classpath_prefix_for_target), 'wb') as classpath_file:
-            classpath_file.write(os.pathsep.join(classpath).encode('utf-8'))
-            classpath_file.write('\n')
+          content = os.pathsep.join(classpath).encode('utf-8') + b'\n'
+          cls._write_if_changed(os.path.join(basedir, classpath_file_name), content,
+                                exists=classpath_file_name in existing_files)
+
+        # Remove any previous output for the target that is no longer part of its classpath.
+        for filename in existing_files - expected_files:
+          path = os.path.join(basedir, filename)
+          if os.path.islink(path) or os.path.isfile(path):
+            safe_delete(path)
 
     return canonical_classpath
@@ -84,7 +84,8 @@ class IvyResolve(IvyTaskMixin, NailgunTask):
     executor = self.create_java_executor()
     targets = self.context.targets()
     compile_classpath = self.context.products.get_data('compile_classpath',
-        init_func=ClasspathProducts.init_func(self.get_options().pants_workdir))
+        init_func=ClasspathProducts.init_func(self.get_options().pants_workdir,
+                                              build_graph=self.context.build_graph))
     resolve_hash_names = self.resolve(executor=executor,
                                       targets=targets,
                                       classpath_products=compile_classpath,
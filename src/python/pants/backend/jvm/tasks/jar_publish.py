@@ -12,6 +12,7 @@ import os
 import pkgutil
 import shutil
 import sys
+import threading
 from collections import OrderedDict, defaultdict, namedtuple
 from copy import copy
 
@@ -21,11 +22,14 @@ from pants.backend.jvm.ossrh_publication_metadata import OSSRHPublicationMetadat
 from pants.backend.jvm.targets.jarable import Jarable
 from pants.backend.jvm.targets.scala_library import ScalaLibrary
 from pants.backend.jvm.tasks.jar_task import JarTask
+from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
+                                                                 Job)
 from pants.backend.jvm.tasks.properties import Properties
 from pants.base.build_environment import get_buildroot, get_scm
 from pants.base.build_file import BuildFile
 from pants.base.exceptions import TaskError
 from pants.base.generator import Generator, TemplateData
+from pants.base.worker_pool import WorkerPool
 from pants.build_graph.address import Address
 from pants.build_graph.address_lookup_error import AddressLookupError
 from pants.build_graph.build_file_parser import BuildFileParser
@@ -145,8 +149,8 @@ class PushDb(object):
 
 
 class PomWriter(object):
-  def __init__(self, get_db, tag):
-    self._get_db = get_db
+  def __init__(self, get_entry, tag):
+    self._get_entry = get_entry
     self._tag = tag
 
   def write(self, target, path):
@@ -173,9 +177,9 @@ class PomWriter(object):
       generator.write(output)
 
   def _as_versioned_jar(self, internal_target):
-    """Fetches the jar representation of the given target, and applies the latest pushdb version."""
+    """Fetches the jar representation of the given target, and applies its latest planned version."""
     jar, _ = internal_target.get_artifact_info()
-    pushdb_entry = self._get_db(internal_target).get_entry(internal_target)
+    pushdb_entry = self._get_entry(internal_target)
     jar.rev = pushdb_entry.version().version()
     return jar
 
@@ -272,6 +276,8 @@ class JarPublish(ScmPublishMixin, JarTask):
   * ``--repos`` - Required dictionary of settings for repos that may be pushed to.
   * ``--jvm-options`` - Optional list of JVM command-line args when invoking Ivy.
   * ``--restrict-push-branches`` - Optional list of branches to restrict publishing to.
+  * ``--worker-count`` - Optional number of artifacts to publish concurrently. An artifact is only
+    published once all the artifacts it depends on have been.
 
   Example repos dictionary: ::
 
@@ -354,6 +360,9 @@ class JarPublish(ScmPublishMixin, JarTask):
                   'artifact published')
     register('--prompt', default=True, action='store_true',
              help='Interactively prompt user before publishing each artifact.')
+    register('--worker-count', advanced=True, type=int, default=1,
+             help='The maximum number of artifacts to stage and publish concurrently. Each '
+                  'artifact is published as soon as the artifacts it depends on have been.')
 
   @classmethod
   def prepare(cls, options, round_manager):
@@ -367,6 +376,7 @@ class JarPublish(ScmPublishMixin, JarTask):
     self.cachedir = os.path.join(self.workdir, 'cache')
 
     self._jvm_options = self.get_options().jvm_options
+    self._bootstrap_lock = threading.Lock()
 
     self.scm = get_scm()
     self.log = self.context.log
@@ -515,12 +525,14 @@ class JarPublish(ScmPublishMixin, JarTask):
     is a list of jars published so far (including this one). entry is a pushdb entry."""
 
     try:
-      ivy = Bootstrapper.default_ivy()
+      # Artifacts may be published concurrently, but ivy need only be bootstrapped once.
+      with self._bootstrap_lock:
+        ivy = Bootstrapper.default_ivy()
     except Bootstrapper.Error as e:
       raise TaskError('Failed to push {0}! {1}'.format(pushdb_coordinate(jar, entry), e))
 
     path = repo.get('path')
-    ivysettings = self.generate_ivysettings(ivy, published, publish_local=path)
+    ivysettings = self.generate_ivysettings(ivy, published, publish_local=path, jar=jar)
 
     version = entry.version().version()
     ivyxml = self.generate_ivy(jar, version, publications)
@@ -591,9 +603,14 @@ class JarPublish(ScmPublishMixin, JarTask):
     def get_pushdb(tgt):
       return get_db(tgt)[0]
 
+    # The entries planned for this publish, which only reach the pushdbs once published.
+    planned_entries = {}
+
+    def get_entry(tgt):
+      return planned_entries.get(tgt) or get_pushdb(tgt).get_entry(tgt)
+
     def fingerprint_internal(tgt):
-      pushdb = get_pushdb(tgt)
-      entry = pushdb.get_entry(tgt)
+      entry = get_entry(tgt)
       return entry.fingerprint or '0.0.0'
 
     def stage_artifacts(tgt, jar, version, tag, changelog):
@@ -667,9 +684,42 @@ class JarPublish(ScmPublishMixin, JarTask):
             publications.add(extra_pub)
 
       pom_path = self.artifact_path(jar, version, extension='pom')
-      PomWriter(get_pushdb, tag).write(tgt, path=pom_path)
+      PomWriter(get_entry, tag).write(tgt, path=pom_path)
       return publications
 
+    def stage_and_publish(tgt, jar, entry, repo, published, tag, changelog):
+      publications = stage_artifacts(tgt, jar, entry.version().version(), tag, changelog)
+      if self.dryrun:
+        print('Skipping publish of {0} in test mode.'.format(pushdb_coordinate(jar, entry)))
+      else:
+        self.publish(publications, jar=jar, entry=entry, repo=repo, published=published)
+
+    def record_published(tgt, entry, pushdb, dbfile, coord, tag_name, forced):
+      pushdb.set_entry(tgt, entry)
+      if not self.commit or self.dryrun:
+        return
+
+      pushdb.dump(dbfile)
+
+      self.publish_pushdb_changes_to_remote_scm(
+        pushdb_file=dbfile,
+        coordinate=coord,
+        tag_name=tag_name,
+        tag_message='Publish of {coordinate} initiated by {user} {cause}'.format(
+          coordinate=coord,
+          user=getpass.getuser(),
+          cause='with forced revision' if forced else '(autoinc)',
+        ),
+        postscript=self.push_postscript
+      )
+
+    def create_job(tgt, fn, on_success=None):
+      # Only published artifacts need be waited on; any other dependencies are already built.
+      dependencies = [dep.address.spec for dep in tgt.closure()
+                      if dep != tgt and dep in exported_targets]
+      return Job(key=tgt.address.spec, fn=fn, dependencies=dependencies, size=1,
+                 on_success=on_success)
+
     if self.overrides:
       print('\nPublishing with revision overrides:')
       for (org, name), rev in self.overrides.items():
@@ -679,6 +729,7 @@ class JarPublish(ScmPublishMixin, JarTask):
 
     safe_rmtree(self.workdir)
     published = []
+    jobs = []
     skip = (self.restart_at is not None)
     for target in exported_targets:
       pushdb, dbfile, repo = get_db(target)
@@ -723,13 +774,15 @@ class JarPublish(ScmPublishMixin, JarTask):
 
       if no_changes and not self.force:
         print('No changes for {0}'.format(pushdb_coordinate(jar, oldentry)))
-        stage_artifacts(target, jar, oldentry.version().version(), tag_name, changelog)
+        jobs.append(create_job(target, functools.partial(
+          stage_artifacts, target, jar, oldentry.version().version(), tag_name, changelog)))
       elif skip:
         print('Skipping {} to resume at {}'.format(
           jar_coordinate(jar, (newentry.version() if self.force else oldentry.version()).version()),
           coordinate(self.restart_at[0], self.restart_at[1])
         ))
-        stage_artifacts(target, jar, oldentry.version().version(), tag_name, changelog)
+        jobs.append(create_job(target, functools.partial(
+          stage_artifacts, target, jar, oldentry.version().version(), tag_name, changelog)))
       else:
         if not self.dryrun:
           # Confirm push looks good
@@ -751,30 +804,42 @@ class JarPublish(ScmPublishMixin, JarTask):
           if not self.confirm_push(coordinate(jar.org, jar.name), newentry.version()):
             raise TaskError('User aborted push')
 
-        pushdb.set_entry(target, newentry)
-        publications = stage_artifacts(target, jar, rev, tag_name, changelog)
+        planned_entries[target] = newentry
 
-        if self.dryrun:
-          print('Skipping publish of {0} in test mode.'.format(pushdb_coordinate(jar, newentry)))
-        else:
-          self.publish(publications, jar=jar, entry=newentry, repo=repo, published=published)
+        # The new entry is recorded, and the pushdb committed, from this thread only once the
+        # artifact is published, so a failed push never records it and can always be resumed with
+        # --restart-at.
+        on_success = functools.partial(record_published, target, newentry, pushdb, dbfile,
+                                       coordinate(org, name, rev), tag_name,
+                                       (org, name) in self.overrides)
+        jobs.append(create_job(target,
+                               functools.partial(stage_and_publish, target, jar, newentry, repo,
+                                                 list(published), tag_name, changelog),
+                               on_success=on_success))
 
-          if self.commit:
-            coord = coordinate(org, name, rev)
+    self.execute_publish_jobs(jobs)
 
-            pushdb.dump(dbfile)
+  def execute_publish_jobs(self, jobs):
+    """Stages and publishes artifacts, each once the artifacts it depends on have been.
 
-            self.publish_pushdb_changes_to_remote_scm(
-              pushdb_file=dbfile,
-              coordinate=coord,
-              tag_name=tag_name,
-              tag_message='Publish of {coordinate} initiated by {user} {cause}'.format(
-                coordinate=coord,
-                user=getpass.getuser(),
-                cause='with forced revision' if (org, name) in self.overrides else '(autoinc)',
-              ),
-              postscript=self.push_postscript
-            )
+    :param jobs: The publish jobs, in dependency order.
+    :type jobs: list of :class:`pants.backend.jvm.tasks.jvm_compile.execution_graph.Job`
+    """
+    worker_count = min(max(1, self.get_options().worker_count), len(jobs))
+    if worker_count <= 1:
+      for job in jobs:
+        job()
+        job.run_success_callback()
+      return
+
+    with self.context.new_workunit('publish-artifacts') as workunit:
+      pool = WorkerPool(workunit, self.context.run_tracker, worker_count)
+      try:
+        ExecutionGraph(jobs).execute(pool, self.context.log)
+      except ExecutionFailure as e:
+        raise TaskError('Publish failure: {}'.format(e))
+      finally:
+        pool.shutdown()
 
   def artifact_path(self, jar, version, name=None, suffix='', extension='jar', artifact_ext=''):
     return os.path.join(self.workdir, jar.org, jar.name + artifact_ext,
@@ -888,11 +953,18 @@ class JarPublish(ScmPublishMixin, JarTask):
     else:
       return ivy.ivy_settings
 
-  def generate_ivysettings(self, ivy, publishedjars, publish_local=None):
+  def _ivy_file_path(self, basename, jar):
+    # Artifacts may be published concurrently, so each gets its own ivy files.
+    if jar is None:
+      return os.path.join(self.workdir, '{}.xml'.format(basename))
+    return os.path.join(self.workdir, '{}-{}-{}.xml'.format(basename, jar.org, jar.name))
+
+  def generate_ivysettings(self, ivy, publishedjars, publish_local=None, jar=None):
     template_relpath = os.path.join(_TEMPLATES_RELPATH, 'ivysettings.mustache')
     template_text = pkgutil.get_data(__name__, template_relpath)
 
-    published = [TemplateData(org=jar.org, name=jar.name) for jar in publishedjars]
+    published = [TemplateData(org=published_jar.org, name=published_jar.name)
+                 for published_jar in publishedjars]
 
     generator = Generator(template_text,
                           ivysettings=self.fetch_ivysettings(ivy),
@@ -901,7 +973,7 @@ class JarPublish(ScmPublishMixin, JarTask):
                           published=published,
                           publish_local=publish_local)
 
-    with safe_open(os.path.join(self.workdir, 'ivysettings.xml'), 'w') as wrapper:
+    with safe_open(self._ivy_file_path('ivysettings', jar), 'w') as wrapper:
       generator.write(wrapper)
       return wrapper.name
 
@@ -919,7 +991,7 @@ class JarPublish(ScmPublishMixin, JarTask):
                           rev=version,
                           publications=pubs)
 
-    with safe_open(os.path.join(self.workdir, 'ivy.xml'), 'w') as ivyxml:
+    with safe_open(self._ivy_file_path('ivy', jar), 'w') as ivyxml:
       generator.write(ivyxml)
       return ivyxml.name
 
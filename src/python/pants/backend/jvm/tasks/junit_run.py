@@ -6,8 +6,11 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import copy
+import json
 import os
 import sys
+import threading
+import time
 from collections import defaultdict
 
 from six.moves import range
@@ -25,12 +28,15 @@ from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TargetDefinitionException, TaskError, TestFailedTaskError
 from pants.base.revision import Revision
+from pants.base.worker_pool import Work, WorkerPool
 from pants.base.workunit import WorkUnitLabel
 from pants.binaries import binary_util
 from pants.java.distribution.distribution import DistributionLocator
 from pants.java.executor import SubprocessExecutor
 from pants.task.testrunner_task_mixin import TestRunnerTaskMixin
 from pants.util.contextutil import environment_as
+from pants.util.dirutil import safe_concurrent_creation, safe_mkdir, safe_rmtree
+from pants.util.memo import memoized_property
 from pants.util.process_handler import ProcessHandler
 from pants.util.strutil import pluralize
 from pants.util.xml_parser import XmlParser
@@ -74,9 +80,28 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
              help='Run classes without @TestParallel or @TestSerial annotations in parallel.')
     register('--parallel-threads', advanced=True, type=int, default=0,
              help='Number of threads to run tests in parallel. 0 for autoset.')
+    register('--batch-concurrency', advanced=True, type=int, default=1,
+             help='Run up to this many test batches concurrently, each in a separate JVM with its '
+                  'own output directory. Unlike --parallel-threads this is safe for tests that use '
+                  'static state. Batches are run one at a time when coverage is enabled, since '
+                  'coverage data is collected in a single file.')
     register('--test-shard', advanced=True,
              help='Subset of tests to run, in the form M/N, 0 <= M < N. '
                   'For example, 1/3 means run tests number 2, 5, 8, 11, ...')
+    register('--balance-by-timings', advanced=True, action='store_true', default=False,
+             help='Split tests into --test-shard shards and --batch-size batches of similar '
+                  'expected run time rather than of similar size. Shards are then made up of whole '
+                  'test classes. Unsharded runs record the duration of each test class from its '
+                  'xml report to test_durations.json in the task workdir, and batches are balanced '
+                  'by the durations recorded by previous runs. Shards are only balanced by '
+                  '--test-durations-file. Test classes with no known duration are assumed to take '
+                  'the mean duration of those that have one, so with no durations tests are split '
+                  'by count.')
+    register('--test-durations-file', advanced=True, metavar='<FILE>',
+             help='A json file mapping test class names to durations in seconds, eg: a copy of '
+                  'the test_durations.json recorded by an unsharded --balance-by-timings run, '
+                  'used to balance --test-shard shards. It is only ever read, so every shard of a '
+                  'series is split using the same durations.')
     register('--suppress-output', action='store_true', default=True,
              deprecated_hint='Use --output-mode instead.', deprecated_version='0.0.64',
              help='Redirect test output to files in .pants.d/test/junit.')
@@ -157,6 +182,9 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
 
     self._tests_to_run = options.test
     self._batch_size = options.batch_size
+    self._batch_concurrency = 1 if self._coverage else max(1, options.batch_concurrency)
+    # The environment is process global, so batches must not interleave setting it up for spawning.
+    self._spawn_lock = threading.Lock()
     self._fail_fast = options.fail_fast
     self._working_dir = options.cwd or get_buildroot()
     self._strict_jvm_version = options.strict_jvm_version
@@ -172,8 +200,6 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
 
     if self._fail_fast:
       self._args.append('-fail-fast')
-    self._args.append('-outdir')
-    self._args.append(self.workdir)
 
     if options.per_test_timer:
       self._args.append('-per-test-timer')
@@ -182,9 +208,25 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     self._args.append('-parallel-threads')
     self._args.append(str(options.parallel_threads))
 
+    self._balance_by_timings = options.balance_by_timings
+    self._test_shard = None
     if options.test_shard:
-      self._args.append('-test-shard')
-      self._args.append(options.test_shard)
+      if self._balance_by_timings:
+        self._test_shard = self._parse_test_shard(options.test_shard)
+      else:
+        self._args.append('-test-shard')
+        self._args.append(options.test_shard)
+
+  @staticmethod
+  def _parse_test_shard(test_shard):
+    shard, _, num_shards = test_shard.partition('/')
+    try:
+      shard, num_shards = int(shard), int(num_shards)
+    except ValueError:
+      raise TaskError('Invalid --test-shard {!r}, expected the form M/N.'.format(test_shard))
+    if not 0 <= shard < num_shards:
+      raise TaskError('Invalid --test-shard {!r}, expected 0 <= M < N.'.format(test_shard))
+    return shard, num_shards
 
   def preferred_jvm_distribution_for_targets(self, targets):
     return self.preferred_jvm_distribution([target.platform for target in targets
@@ -198,19 +240,22 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     max_version = Revision(*(min_version.components + [9999])) if self._strict_jvm_version else None
     return DistributionLocator.cached(minimum_version=min_version, maximum_version=max_version)
 
-  def _spawn(self, distribution, executor=None, *args, **kwargs):
+  def _spawn(self, distribution, executor=None, env_vars=None, *args, **kwargs):
     """Returns a processhandler to a process executing java.
 
     :param Executor executor: the java subprocess executor to use. If not specified, construct
       using the distribution.
     :param Distribution distribution: The JDK or JRE installed.
+    :param dict env_vars: Extra environment variables to spawn the process with.
     :rtype: ProcessHandler
     """
 
     actual_executor = executor or SubprocessExecutor(distribution)
-    return distribution.execute_java_async(*args,
-                                           executor=actual_executor,
-                                           **kwargs)
+    with self._spawn_lock:
+      with environment_as(**(env_vars or {})):
+        return distribution.execute_java_async(*args,
+                                               executor=actual_executor,
+                                               **kwargs)
 
   def execute_java_for_targets(self, targets, *args, **kwargs):
     """Execute java for targets using the test mixin spawn and wait.
@@ -317,6 +362,15 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
 
   def _run_tests(self, tests_to_targets):
 
+    if self._test_shard:
+      shard, num_shards = self._test_shard
+      shard_tests = set(self._balance(sorted(tests_to_targets), num_shards,
+                                      durations=self._shard_durations)[shard])
+      tests_to_targets = {test: target for test, target in tests_to_targets.items()
+                          if test in shard_tests}
+      if not tests_to_targets:
+        return
+
     if self._coverage:
       extra_jvm_options = self._coverage.extra_jvm_options
       classpath_prepend = self._coverage.classpath_prepend
@@ -337,39 +391,57 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     # the below will be None if not set, and we'll default back to runtime_classpath
     classpath_product = self.context.products.get_data('instrument_classpath')
 
-    result = 0
+    # Bootstrap the tool up front rather than racing to do so from concurrent batches.
+    junit_classpath = self.tool_classpath('junit')
+
+    def run_batch(batch, workdir, platform, target_jvm_options, target_env_vars, outdir):
+      # Batches of test classes will likely exist within the same targets: dedupe them.
+      relevant_targets = set(map(tests_to_targets.get, batch))
+      complete_classpath = OrderedSet()
+      complete_classpath.update(classpath_prepend)
+      complete_classpath.update(junit_classpath)
+      complete_classpath.update(self.classpath(relevant_targets,
+                                               classpath_product=classpath_product))
+      complete_classpath.update(classpath_append)
+      distribution = self.preferred_jvm_distribution([platform])
+      with binary_util.safe_args(batch, self.get_options()) as batch_tests:
+        self.context.log.debug('CWD = {}'.format(workdir))
+        self.context.log.debug('platform = {}'.format(platform))
+        return abs(self._spawn_and_wait(
+          executor=SubprocessExecutor(distribution),
+          distribution=distribution,
+          env_vars=dict(target_env_vars),
+          classpath=complete_classpath,
+          main=JUnitRun._MAIN,
+          jvm_options=self.jvm_options + extra_jvm_options + list(target_jvm_options),
+          args=self._args + ['-outdir', outdir] + batch_tests + [u'-xmlreport'],
+          workunit_factory=self.context.new_workunit,
+          workunit_name='run',
+          workunit_labels=[WorkUnitLabel.TEST],
+          cwd=workdir,
+          synthetic_jar_dir=outdir,
+          create_synthetic_jar=self.synthetic_classpath,
+        ))
+
+    batches = []
     for (workdir, platform, target_jvm_options, target_env_vars), tests in tests_by_properties.items():
       for batch in self._partition(tests):
-        # Batches of test classes will likely exist within the same targets: dedupe them.
-        relevant_targets = set(map(tests_to_targets.get, batch))
-        complete_classpath = OrderedSet()
-        complete_classpath.update(classpath_prepend)
-        complete_classpath.update(self.tool_classpath('junit'))
-        complete_classpath.update(self.classpath(relevant_targets,
-                                                 classpath_product=classpath_product))
-        complete_classpath.update(classpath_append)
-        distribution = self.preferred_jvm_distribution([platform])
-        with binary_util.safe_args(batch, self.get_options()) as batch_tests:
-          self.context.log.debug('CWD = {}'.format(workdir))
-          self.context.log.debug('platform = {}'.format(platform))
-          with environment_as(**dict(target_env_vars)):
-            result += abs(self._spawn_and_wait(
-              executor=SubprocessExecutor(distribution),
-              distribution=distribution,
-              classpath=complete_classpath,
-              main=JUnitRun._MAIN,
-              jvm_options=self.jvm_options + extra_jvm_options + list(target_jvm_options),
-              args=self._args + batch_tests + [u'-xmlreport'],
-              workunit_factory=self.context.new_workunit,
-              workunit_name='run',
-              workunit_labels=[WorkUnitLabel.TEST],
-              cwd=workdir,
-              synthetic_jar_dir=self.workdir,
-              create_synthetic_jar=self.synthetic_classpath,
-            ))
-
-          if result != 0 and self._fail_fast:
-            break
+        batches.append((batch, workdir, platform, target_jvm_options, target_env_vars))
+
+    start_time = time.time()
+    if self._batch_concurrency > 1 and len(batches) > 1:
+      result = self._run_batches_concurrently(run_batch, batches)
+    else:
+      result = 0
+      for batch_args in batches:
+        result += run_batch(*(batch_args + (self.workdir,)))
+        if result != 0 and self._fail_fast:
+          break
+
+    if self._balance_by_timings and not self._test_shard:
+      # A sharded run only sees part of the tests, and each shard must be split from the same
+      # durations as every other shard of its series, so only unsharded runs are recorded.
+      self._record_test_durations(tests_to_targets, start_time)
 
     if result != 0:
       failed_targets_and_tests = self._get_failed_targets(tests_to_targets)
@@ -387,6 +459,60 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
       )
       raise TestFailedTaskError('\n'.join(error_message_lines), failed_targets=list(failed_targets))
 
+  @staticmethod
+  def _is_report_file(name):
+    """Returns True if the named file is a report the junit runner writes to its -outdir."""
+    return ((name.startswith('TEST-') and name.endswith('.xml')) or
+            name.endswith('.out.txt') or name.endswith('.err.txt'))
+
+  def _run_batches_concurrently(self, run_batch, batches):
+    """Runs each batch with `run_batch` in a bounded pool of concurrent JVMs.
+
+    Each batch is given its own scratch output directory. Once all batches are done their reports
+    are moved into the task workdir in batch order, so that they are found by `_get_failed_targets`
+    as usual and a report written by more than one batch ends up as it would have running the
+    batches serially. Anything else in the scratch directories, such as synthetic classpath jars,
+    is removed. Once a batch fails under --fail-fast, or a batch raises, no further batches are
+    started.
+
+    :returns: The sum of the absolute exit codes of the batches that ran.
+    """
+    batches_dir = os.path.join(self.workdir, 'batches')
+    stop = threading.Event()
+
+    def outdir_for(index):
+      return os.path.join(batches_dir, str(index))
+
+    def run_isolated_batch(index, batch_args):
+      if stop.is_set():
+        return 0
+      outdir = outdir_for(index)
+      safe_mkdir(outdir, clean=True)
+      try:
+        result = run_batch(*(batch_args + (outdir,)))
+      except Exception:
+        stop.set()
+        raise
+      if result != 0 and self._fail_fast:
+        stop.set()
+      return result
+
+    with self.context.new_workunit('batches') as workunit:
+      pool = WorkerPool(workunit, self.context.run_tracker,
+                        min(self._batch_concurrency, len(batches)))
+      try:
+        results = pool.submit_work_and_wait(Work(run_isolated_batch, list(enumerate(batches))))
+      finally:
+        pool.shutdown()
+        for index in range(len(batches)):
+          outdir = outdir_for(index)
+          if os.path.isdir(outdir):
+            for name in os.listdir(outdir):
+              if self._is_report_file(name):
+                os.rename(os.path.join(outdir, name), os.path.join(self.workdir, name))
+        safe_rmtree(batches_dir)
+    return sum(results)
+
   def _infer_workdir(self, target):
     if target.cwd is not None:
       return target.cwd
@@ -405,10 +531,101 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     return self._tests_by_property(tests_to_targets, combined_property)
 
   def _partition(self, tests):
+    if self._balance_by_timings:
+      num_batches = -(-len(tests) // self._batch_size)
+      for batch in self._balance(tests, num_batches, durations=self._test_durations,
+                                 max_size=self._batch_size):
+        if batch:
+          yield batch
+      return
+
     stride = min(self._batch_size, len(tests))
     for i in range(0, len(tests), stride):
       yield tests[i:i + stride]
 
+  @property
+  def _test_durations_file(self):
+    return os.path.join(self.workdir, 'test_durations.json')
+
+  @staticmethod
+  def _load_test_durations(path):
+    try:
+      with open(path, 'rb') as fp:
+        return json.load(fp)
+    except (IOError, ValueError):
+      return {}
+
+  @memoized_property
+  def _test_durations(self):
+    """Returns the recorded duration in seconds of each test class that has been run."""
+    return self._load_test_durations(self._test_durations_file)
+
+  @memoized_property
+  def _shard_durations(self):
+    """Returns the duration in seconds of each test class to balance shards by."""
+    test_durations_file = self.get_options().test_durations_file
+    if not test_durations_file:
+      return {}
+    if not os.path.isfile(test_durations_file):
+      raise TaskError('The --test-durations-file {} does not exist.'.format(test_durations_file))
+    return self._load_test_durations(test_durations_file)
+
+  def _record_test_durations(self, tests_to_targets, start_time):
+    """Records the durations of the whole test classes reported on since `start_time`."""
+    durations = {}
+    for test in tests_to_targets:
+      if '#' in test:
+        # Only part of the class was run.
+        continue
+      filename = os.path.join(self.workdir, 'TEST-{0}.xml'.format(test))
+      try:
+        if os.path.getmtime(filename) < start_time:
+          continue
+        xml = XmlParser.from_file(filename)
+        durations[test] = float(xml.get_attribute('testsuite', 'time'))
+      except (OSError, XmlParser.XmlError, ValueError) as e:
+        self.context.log.debug('Not recording a duration for {0}: {1}'.format(test, e))
+
+    if durations:
+      self._test_durations.update(durations)
+      with safe_concurrent_creation(self._test_durations_file) as tmp_path:
+        with open(tmp_path, 'wb') as fp:
+          json.dump(self._test_durations, fp)
+
+  @staticmethod
+  def _balance(tests, num_bins, durations=None, max_size=None):
+    """Splits tests into `num_bins` lists of similar expected duration.
+
+    Tests are assigned longest first to the least loaded bin that has room for them, with ties
+    broken by test name and bin index, so the split is deterministic for given durations.
+    Tests with no known duration are assumed to take the mean duration of those that have one.
+
+    :param list tests: The tests to split.
+    :param int num_bins: The number of lists to split the tests into.
+    :param dict durations: The duration in seconds of test classes, if any are known.
+    :param int max_size: The maximum number of tests to put in each list, if any.
+    :rtype: list of lists of strings
+    """
+    durations = durations or {}
+
+    def test_class(test):
+      return test.partition('#')[0]
+
+    known = [durations[test_class(test)] for test in tests if test_class(test) in durations]
+    default_duration = sum(known) / len(known) if known else 1.0
+
+    def duration(test):
+      return durations.get(test_class(test), default_duration)
+
+    bins = [[] for _ in range(num_bins)]
+    loads = [0.0] * num_bins
+    for test in sorted(tests, key=lambda test: (-duration(test), test)):
+      index = min((i for i in range(num_bins) if max_size is None or len(bins[i]) < max_size),
+                  key=lambda i: (loads[i], i))
+      bins[index].append(test)
+      loads[index] += duration(test)
+    return bins
+
   def _get_tests_to_run(self):
     for test_spec in self._tests_to_run:
       src_spec, cls_spec = interpret_test_spec(test_spec)
@@ -7,6 +7,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import re
+import shutil
+import tempfile
 from contextlib import contextmanager
 
 from pants.base.exceptions import TaskError
@@ -131,6 +133,39 @@ class AnalysisParser(object):
       with open(outfile_path, 'wb') as outfile:
         self.rebase(infile, outfile, old_base, new_base, java_home)
 
+  def rebase_all(self, infile, outfile, rebasings, java_home=None):
+    """Apply a sequence of rebasings to an analysis read from infile and write the result to outfile.
+
+    Each (old_base, new_base) pair in rebasings is applied in order, exactly as if by successive
+    calls to rebase().  infile is only read once and outfile only written once; each intermediate
+    result is streamed through an anonymous temporary file, at most two of which exist at a time.
+
+    If java_home is specified then any references to paths under it are scrubbed entirely.
+    """
+    if not rebasings:
+      shutil.copyfileobj(infile, outfile)
+      return
+
+    # TODO: Fuse the stages into one pass when zincutils supports it:
+    # https://github.com/pantsbuild/zincutils/issues/8.
+    stage_in = infile
+    last_stage = len(rebasings) - 1
+    for stage, (old_base, new_base) in enumerate(rebasings):
+      stage_out = outfile if stage == last_stage else tempfile.TemporaryFile()
+      try:
+        # References to the java home only need to be scrubbed once.
+        self.rebase(stage_in, stage_out, old_base, new_base, java_home if stage == 0 else None)
+      except:
+        if stage_out is not outfile:
+          stage_out.close()
+        raise
+      finally:
+        if stage_in is not infile:
+          stage_in.close()
+      stage_in = stage_out
+      if stage != last_stage:
+        stage_in.seek(0)
+
   def rebase(self, infile, outfile, old_base, new_base, java_home=None):
     """Rebase an analysis read from infile and write the result to outfile.
 
@@ -6,9 +6,9 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
-import shutil
+import uuid
 
-from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_delete
 
 
 class AnalysisTools(object):
@@ -55,39 +55,34 @@ class AnalysisTools(object):
   def rebase_from_path(self, infile_path, outfile_path, old_base, new_base):
     self.parser.rebase_from_path(infile_path, outfile_path, old_base, new_base, java_home=None)
 
-  def relativize(self, src_analysis, relativized_analysis):
-    with temporary_dir() as tmp_analysis_dir:
-      tmp_analysis_file1 = os.path.join(tmp_analysis_dir, 'analysis.relativized.1')
-      tmp_analysis_file2 = os.path.join(tmp_analysis_dir, 'analysis.relativized.2')
-
-      # NOTE: We can't port references to deps on the Java home. This is because different JVM
-      # implementations on different systems have different structures, and there's not
-      # necessarily a 1-1 mapping between Java jars on different systems. Instead we simply
-      # drop those references from the analysis file.
-      #
-      # In practice the JVM changes rarely, and it should be fine to require a full rebuild
-      # in those rare cases.
-      # Work on a tmpfile, for safety.
-      # Start with rebasing working directory,
-      # because build root cannot be subdirectory of working directory.
-      # TODO: Change to one call to zincutils when API will be made: https://github.com/pantsbuild/zincutils/issues/8.
-      self.parser.rebase_from_path(src_analysis, tmp_analysis_file1,
-                                   self._pants_workdir, self._PANTS_WORKDIR_PLACEHOLDER, self._java_home)
-      self.parser.rebase_from_path(tmp_analysis_file1, tmp_analysis_file2,
-                                   self._pants_buildroot, self._PANTS_BUILDROOT_PLACEHOLDER, self._java_home)
+  def _rebase_all(self, infile_path, outfile_path, rebasings, java_home=None):
+    # Work on a sibling tmpfile, for safety, and only move it into place once fully written.
+    tmp_outfile_path = '{}.{}.tmp'.format(outfile_path, uuid.uuid4().hex)
+    try:
+      with open(infile_path, 'rb') as infile:
+        with open(tmp_outfile_path, 'wb') as outfile:
+          self.parser.rebase_all(infile, outfile, rebasings, java_home=java_home)
+      os.rename(tmp_outfile_path, outfile_path)
+    finally:
+      safe_delete(tmp_outfile_path)
 
-      shutil.move(tmp_analysis_file2, relativized_analysis)
+  def relativize(self, src_analysis, relativized_analysis):
+    # NOTE: We can't port references to deps on the Java home. This is because different JVM
+    # implementations on different systems have different structures, and there's not
+    # necessarily a 1-1 mapping between Java jars on different systems. Instead we simply
+    # drop those references from the analysis file.
+    #
+    # In practice the JVM changes rarely, and it should be fine to require a full rebuild
+    # in those rare cases.
+    #
+    # Rebase the working directory first, because the build root cannot be a subdirectory of the
+    # working directory.
+    self._rebase_all(src_analysis, relativized_analysis,
+                     [(self._pants_workdir, self._PANTS_WORKDIR_PLACEHOLDER),
+                      (self._pants_buildroot, self._PANTS_BUILDROOT_PLACEHOLDER)],
+                     java_home=self._java_home)
 
   def localize(self, src_analysis, localized_analysis):
-    with temporary_dir() as tmp_analysis_dir:
-      tmp_analysis_file1 = os.path.join(tmp_analysis_dir, 'analysis.1')
-      tmp_analysis_file2 = os.path.join(tmp_analysis_dir, 'analysys.2')
-
-      # Work on a tmpfile, for safety.
-      # TODO: Change to one call to zincutils when API will be made: https://github.com/pantsbuild/zincutils/issues/8.
-      self.parser.rebase_from_path(src_analysis, tmp_analysis_file1,
-                                   self._PANTS_WORKDIR_PLACEHOLDER, self._pants_workdir)
-      self.parser.rebase_from_path(tmp_analysis_file1, tmp_analysis_file2,
-                                   self._PANTS_BUILDROOT_PLACEHOLDER, self._pants_buildroot)
-
-      shutil.move(tmp_analysis_file2, localized_analysis)
+    self._rebase_all(src_analysis, localized_analysis,
+                     [(self._PANTS_WORKDIR_PLACEHOLDER, self._pants_workdir),
+                      (self._PANTS_BUILDROOT_PLACEHOLDER, self._pants_buildroot)])
@@ -9,7 +9,9 @@ import functools
 import hashlib
 import itertools
 import os
-from collections import defaultdict
+import shutil
+import zipfile
+from collections import OrderedDict, defaultdict
 from multiprocessing import cpu_count
 
 from pants.backend.jvm.subsystems.java import Java
@@ -31,6 +33,7 @@ from pants.build_graph.target import Target
 from pants.goal.products import MultipleRootedProducts
 from pants.option.custom_types import list_option
 from pants.reporting.reporting_utils import items_to_report_element
+from pants.util.contextutil import open_zip
 from pants.util.dirutil import fast_relpath, safe_delete, safe_mkdir, safe_walk
 from pants.util.fileutil import create_size_estimators
 
@@ -710,21 +713,68 @@ class JvmCompile(NailgunTaskBase):
                       on_failure=vts.force_invalidate))
     return jobs
 
-  def _create_context_jar(self, compile_context):
+  @staticmethod
+  def _create_context_jar(compile_context):
     """Jar up the compile_context to its output jar location.
 
+    If a jar already exists from a previous (incremental) compile, only the entries for classes
+    that were added, changed or deleted by the compiler are updated, and if nothing changed the jar
+    is left untouched.  Classes are considered changed when they are newer than the jar, which
+    relies on the previous results (including the jar) being copied with their mtimes intact.
+
     TODO(stuhood): In the medium term, we hope to add compiler support for this step, which would
     allow the jars to be used as compile _inputs_ as well. Currently using jar'd compile outputs as
     compile inputs would make the compiler's analysis useless.
       see https://github.com/twitter-forks/sbt/tree/stuhood/output-jars
     """
     root = compile_context.classes_dir
-    with compile_context.open_jar(mode='w') as jar:
-      for abs_sub_dir, dirnames, filenames in safe_walk(root):
-        for name in dirnames + filenames:
-          abs_filename = os.path.join(abs_sub_dir, name)
-          arcname = fast_relpath(abs_filename, root)
+    entries = OrderedDict()
+    for abs_sub_dir, dirnames, filenames in safe_walk(root):
+      for name in dirnames + filenames:
+        abs_filename = os.path.join(abs_sub_dir, name)
+        entries[fast_relpath(abs_filename, root)] = abs_filename
+
+    if not os.path.exists(compile_context.jar_file):
+      with compile_context.open_jar(mode='w') as jar:
+        for arcname, abs_filename in entries.items():
           jar.write(abs_filename, arcname)
+      return
+
+    # Everything the compiler (re-)wrote since the jar was last updated is newer than the jar.
+    jar_mtime = os.path.getmtime(compile_context.jar_file)
+    with compile_context.open_jar(mode='r') as jar:
+      jarred = OrderedDict((info.filename.rstrip('/'), info) for info in jar.infolist())
+    changed = [arcname for arcname, abs_filename in entries.items()
+               if arcname not in jarred or
+               (os.path.isfile(abs_filename) and os.path.getmtime(abs_filename) >= jar_mtime)]
+    deleted = [arcname for arcname in jarred if arcname not in entries]
+
+    if not changed and not deleted:
+      return
+
+    # Update a sibling copy of the jar and only move it into place once complete, so that an
+    # interrupted update never leaves a corrupt jar behind.
+    tmp_jar_file = '{}.tmp'.format(compile_context.jar_file)
+    try:
+      if not deleted and not any(arcname in jarred for arcname in changed):
+        # Only new classes: these can be appended to a copy of the jar.
+        shutil.copyfile(compile_context.jar_file, tmp_jar_file)
+        with open_zip(tmp_jar_file, mode='a', compression=zipfile.ZIP_STORED) as tmp_jar:
+          for arcname in changed:
+            tmp_jar.write(entries[arcname], arcname)
+      else:
+        # Otherwise copy across the unchanged entries and re-jar just the changed classes.
+        changed_set = set(changed)
+        with compile_context.open_jar(mode='r') as jar:
+          with open_zip(tmp_jar_file, mode='w', compression=zipfile.ZIP_STORED) as tmp_jar:
+            for arcname, info in jarred.items():
+              if arcname in entries and arcname not in changed_set:
+                tmp_jar.writestr(info, jar.read(info))
+            for arcname in changed:
+              tmp_jar.write(entries[arcname], arcname)
+      os.rename(tmp_jar_file, compile_context.jar_file)
+    finally:
+      safe_delete(tmp_jar_file)
 
   def validate_analysis(self, path):
     """Throws a TaskError for invalid analysis files."""
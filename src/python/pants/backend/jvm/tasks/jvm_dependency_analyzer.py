@@ -13,12 +13,12 @@ from twitter.common.collections import OrderedSet
 
 from pants.backend.jvm.targets.jvm_target import JvmTarget
 from pants.backend.jvm.targets.scala_library import ScalaLibrary
+from pants.backend.jvm.tasks.classpath_index import ClasspathIndex
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.base.build_environment import get_buildroot
 from pants.build_graph.build_graph import sort_targets
 from pants.java.distribution.distribution import DistributionLocator
 from pants.task.task import Task
-from pants.util.contextutil import open_zip
 from pants.util.memo import memoized_property
 
 
@@ -42,6 +42,11 @@ class JvmDependencyAnalyzer(Task):
       round_manager.require_data('runtime_classpath')
       round_manager.require_data('product_deps_by_src')
 
+  @memoized_property
+  def classpath_index(self):
+    """The persistent index of classpath entry contents shared by dependency analyzers."""
+    return ClasspathIndex(ClasspathIndex.index_dir(self.get_options().pants_workdir))
+
   @memoized_property
   def targets_by_file(self):
     """Returns a map from abs path of source, class or jar file to an OrderedSet of targets.
@@ -71,10 +76,10 @@ class JvmDependencyAnalyzer(Task):
     # Compute classfile -> target and jar -> target.
     self.context.log.debug('Mapping classpath...')
     for target in self.context.targets():
-      # Classpath content.
-      files = ClasspathUtil.classpath_contents((target,), runtime_classpath)
-      # And jars; for binary deps, zinc doesn't emit precise deps (yet).
       cp_entries = ClasspathUtil.classpath((target,), runtime_classpath)
+      # Classpath content, from the index of each entry.
+      files = self.classpath_index.entries_contents(cp_entries)
+      # And jars; for binary deps, zinc doesn't emit precise deps (yet).
       jars = [cpe for cpe in cp_entries if ClasspathUtil.is_jar(cpe)]
       for coll in [files, jars]:
         for f in coll:
@@ -84,10 +89,9 @@ class JvmDependencyAnalyzer(Task):
 
   def _jar_classfiles(self, jar_file):
     """Returns an iterator over the classfiles inside jar_file."""
-    with open_zip(jar_file, 'r') as jar:
-      for cls in jar.namelist():
-        if cls.endswith(b'.class'):
-          yield cls
+    for cls in self.classpath_index.contents(jar_file):
+      if cls.endswith('.class'):
+        yield cls
 
   @memoized_property
   def bootstrap_jar_classfiles(self):
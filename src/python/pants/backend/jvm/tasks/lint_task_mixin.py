@@ -0,0 +1,97 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+from multiprocessing import cpu_count
+
+from pants.base.worker_pool import Work, WorkerPool
+from pants.task.task import TaskBase
+
+
+class LintTaskMixin(TaskBase):
+  """A mixin for lint tasks that records results per target.
+
+  Targets are checked in chunks; when a chunk fails it is bisected, re-checking its halves until
+  the failing targets are found, so that the targets that pass are marked valid and are not checked
+  again on the next run, regardless of any failures amongst the others.
+
+  Chunks are checked concurrently, each in its own process, unless the task runs its checks in a
+  resident nailgun, in which case chunks are checked one after the other.
+  """
+
+  @classmethod
+  def register_options(cls, register):
+    super(LintTaskMixin, cls).register_options(register)
+    register('--worker-count', advanced=True, type=int, default=cpu_count(),
+             help='The maximum number of chunks of targets to check concurrently. Only used when '
+                  'not running in a nailgun.')
+
+  def lint_worker_count(self):
+    """Returns the maximum number of chunks to check concurrently.
+
+    :rtype: int
+    """
+    if self.get_options().use_nailgun:
+      # A single resident nailgun is already cheap to call repeatedly, and the checks it hosts are
+      # not necessarily safe to run concurrently in one JVM.
+      return 1
+    return max(1, self.get_options().worker_count)
+
+  def lint(self, vts, sources_for_target, check):
+    """Checks the sources of the given versioned targets, marking those that pass valid.
+
+    :param vts: The invalid versioned targets to check.
+    :type vts: list of :class:`pants.invalidation.cache_manager.VersionedTarget`
+    :param sources_for_target: A function from a target to the list of its sources to check.
+    :param check: A function that checks the list of sources it is passed, returning an exit code.
+    :returns: The targets that failed their checks, in the order given.
+    :rtype: list of :class:`pants.build_graph.target.Target`
+    """
+    sources_by_vt = {}
+    for vt in vts:
+      sources = sources_for_target(vt.target)
+      if sources:
+        sources_by_vt[vt] = sources
+      else:
+        vt.update()
+    vts = [vt for vt in vts if vt in sources_by_vt]
+    if not vts:
+      return []
+
+    def check_chunk(chunk, known_failing=False):
+      if not known_failing:
+        sources = [source for vt in chunk for source in sources_by_vt[vt]]
+        if check(sources) == 0:
+          return chunk, []
+      if len(chunk) == 1:
+        return [], chunk
+      self.context.log.debug('Bisecting {} failing targets.'.format(len(chunk)))
+      half = len(chunk) // 2
+      passed, failed = check_chunk(chunk[:half])
+      # If the first half passed, the failure must lie in the second, so that need not be re-checked
+      # as a whole.
+      second_passed, second_failed = check_chunk(chunk[half:], known_failing=not failed)
+      return passed + second_passed, failed + second_failed
+
+    worker_count = min(self.lint_worker_count(), len(vts))
+    chunk_size = -(-len(vts) // worker_count)
+    chunks = [vts[i:i + chunk_size] for i in range(0, len(vts), chunk_size)]
+    if len(chunks) == 1:
+      results = [check_chunk(chunks[0])]
+    else:
+      with self.context.new_workunit('lint') as workunit:
+        pool = WorkerPool(workunit, self.context.run_tracker, len(chunks))
+        try:
+          results = pool.submit_work_and_wait(Work(check_chunk, [(chunk,) for chunk in chunks]))
+        finally:
+          pool.shutdown()
+
+    failed = set()
+    for passed_vts, failed_vts in results:
+      for vt in passed_vts:
+        vt.update()
+      failed.update(failed_vts)
+    return [vt.target for vt in vts if vt in failed]
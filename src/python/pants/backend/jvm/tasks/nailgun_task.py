@@ -12,8 +12,9 @@ from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
 from pants.base.exceptions import TaskError
 from pants.java import util
 from pants.java.distribution.distribution import DistributionLocator
-from pants.java.executor import SubprocessExecutor
+from pants.java.executor import CommandLineGrabber, SubprocessExecutor
 from pants.java.nailgun_executor import NailgunExecutor, NailgunProcessGroup
+from pants.process.xargs import Xargs
 from pants.task.task import Task, TaskBase
 
 
@@ -104,6 +105,17 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     except executor.Error as e:
       raise TaskError(e)
 
+  def runjava_max_args_size(self, classpath, main, jvm_options=None, args=None):
+    """Returns the number of bytes of arguments that can safely be appended to a `runjava` call.
+
+    Pass this as the `max_args_size` of an `Xargs` that wraps `runjava`, so that the java command
+    line itself is accounted for.  The classpath is counted as if it were passed on the command
+    line, which overestimates when it is bundled into a synthetic jar.
+    """
+    runner = CommandLineGrabber(self._dist).runner(classpath, main, jvm_options=jvm_options,
+                                                   args=args)
+    return Xargs.max_args_size(cmd=runner.command)
+
 
 # TODO(John Sirois): This just prevents ripple - maybe inline
 class NailgunTask(NailgunTaskBase, Task): pass
@@ -9,6 +9,7 @@ import os
 import re
 
 from pants.backend.jvm.subsystems.scala_platform import ScalaPlatform
+from pants.backend.jvm.tasks.lint_task_mixin import LintTaskMixin
 from pants.backend.jvm.tasks.nailgun_task import NailgunTask
 from pants.base.exceptions import TaskError
 from pants.build_graph.target import Target
@@ -40,7 +41,7 @@ class FileExcluder(object):
     return True
 
 
-class Scalastyle(NailgunTask):
+class Scalastyle(LintTaskMixin, NailgunTask):
   """Checks scala source files to ensure they're stylish.
 
   Scalastyle only checks scala sources in non-synthetic targets.
@@ -148,25 +149,35 @@ class Scalastyle(NailgunTask):
         self.context.log.debug('  {source}'.format(source=source))
 
       if scala_sources:
+        def to_java_boolean(x):
+          return str(x).lower()
+
+        cp = ScalaPlatform.global_instance().style_classpath(self.context.products)
+        scalastyle_args = [
+          '-c', scalastyle_config,
+          '-v', to_java_boolean(scalastyle_verbose),
+          '-q', to_java_boolean(scalastyle_quiet),
+          ]
+
         def call(srcs):
-          def to_java_boolean(x):
-            return str(x).lower()
-
-          cp = ScalaPlatform.global_instance().style_classpath(self.context.products)
-          scalastyle_args = [
-            '-c', scalastyle_config,
-            '-v', to_java_boolean(scalastyle_verbose),
-            '-q', to_java_boolean(scalastyle_quiet),
-            ]
           return self.runjava(classpath=cp,
                               main=self._MAIN,
                               jvm_options=self.get_options().jvm_options,
                               args=scalastyle_args + srcs)
-
-        result = Xargs(call).execute(scala_sources)
-        if result != 0:
-          raise TaskError('java {entry} ... exited non-zero ({exit_code})'.format(
-            entry=Scalastyle._MAIN, exit_code=result))
+        xargs = Xargs(call, max_args_size=self.runjava_max_args_size(
+          classpath=cp, main=self._MAIN, jvm_options=self.get_options().jvm_options,
+          args=scalastyle_args))
+
+        failed_targets = self.lint(
+          invalidation_check.invalid_vts,
+          lambda target: self.get_non_excluded_scala_sources(scalastyle_excluder, [target]),
+          xargs.execute)
+        if failed_targets:
+          raise TaskError('java {entry} ... exited non-zero for {count} target(s):\n  {specs}'
+                          .format(entry=Scalastyle._MAIN,
+                                  count=len(failed_targets),
+                                  specs='\n  '.join(target.address.spec
+                                                    for target in failed_targets)))
 
   def validate_scalastyle_config(self):
     scalastyle_config = self.get_options().config
@@ -5,9 +5,11 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import collections
 import json
 import os
 from collections import defaultdict
+from contextlib import contextmanager
 
 import six
 from pex.pex_info import PexInfo
@@ -27,6 +29,7 @@ from pants.backend.python.targets.python_target import PythonTarget
 from pants.backend.python.tasks.python_task import PythonTask
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
+from pants.base.worker_pool import Work, WorkerPool
 from pants.build_graph.resources import Resources
 from pants.java.distribution.distribution import DistributionLocator
 from pants.java.executor import SubprocessExecutor
@@ -62,6 +65,9 @@ class ExportTask(IvyTaskMixin, PythonTask):
   def subsystem_dependencies(cls):
     return super(ExportTask, cls).subsystem_dependencies() + (DistributionLocator, JvmPlatform)
 
+  # The number of targets whose per-target info is computed concurrently before being emitted.
+  _BATCH_SIZE = 256
+
   class SourceRootTypes(object):
     """Defines SourceRoot Types Constants"""
     SOURCE = 'SOURCE'  # Source Target
@@ -105,6 +111,9 @@ class ExportTask(IvyTaskMixin, PythonTask):
              help='Causes libraries with javadocs to be output.')
     register('--sources', default=False, action='store_true',
              help='Causes sources to be output.')
+    register('--worker-count', advanced=True, type=int, default=1,
+             help='The maximum number of targets to compute globs, sources and source roots for '
+                  'concurrently.')
 
   @classmethod
   def prepare(cls, options, round_manager):
@@ -139,7 +148,8 @@ class ExportTask(IvyTaskMixin, PythonTask):
 
     compile_classpath = None
     if confs:
-      compile_classpath = ClasspathProducts(self.get_options().pants_workdir)
+      compile_classpath = ClasspathProducts(self.get_options().pants_workdir,
+                                            build_graph=self.context.build_graph)
       self.resolve(executor=executor,
                    targets=targets,
                    classpath_products=compile_classpath,
@@ -154,8 +164,21 @@ class ExportTask(IvyTaskMixin, PythonTask):
     :param classpath_products: Optional classpath_products. If not provided when the --libraries
       option is `True`, this task will perform its own jar resolution.
     """
-    targets_map = {}
-    resource_target_map = {}
+    graph_info = {}
+    for key, value in self.iter_targets_map(targets, classpath_products=classpath_products):
+      graph_info[key] = dict(value) if isinstance(value, collections.Iterator) else value
+    return graph_info
+
+  def iter_targets_map(self, targets, classpath_products=None):
+    """Yields the items of the dictionary `generate_targets_map` returns as they are computed.
+
+    The value of the 'targets' item is an iterator over (target spec, target info) pairs that
+    computes the info of each target as it is consumed; it must be consumed fully before the next
+    item is requested.
+    :param targets: The list of targets to generate the map for.
+    :param classpath_products: Optional classpath_products. If not provided when the --libraries
+      option is `True`, this task will perform its own jar resolution.
+    """
     python_interpreter_targets_mapping = defaultdict(list)
 
     if self.get_options().libraries:
@@ -165,23 +188,98 @@ class ExportTask(IvyTaskMixin, PythonTask):
     else:
       classpath_products = None
 
-    def process_target(current_target):
+    yield 'version', self.DEFAULT_EXPORT_VERSION
+
+    yield 'jvm_platforms', {
+      'default_platform' : JvmPlatform.global_instance().default_platform.name,
+      'platforms': {
+        str(platform_name): {
+          'target_level' : str(platform.target_level),
+          'source_level' : str(platform.source_level),
+          'args' : platform.args,
+        } for platform_name, platform in JvmPlatform.global_instance().platforms_by_name.items() }
+    }
+
+    jvm_distributions = DistributionLocator.global_instance().all_jdk_paths()
+    if jvm_distributions:
+      yield 'jvm_distributions', jvm_distributions
+
+    if classpath_products:
+      yield 'libraries', self._resolve_jars_info(targets, classpath_products)
+
+    yield 'targets', self._iter_target_infos(targets, classpath_products,
+                                             python_interpreter_targets_mapping)
+
+    if python_interpreter_targets_mapping:
+      interpreters = self.interpreter_cache.select_interpreter(
+        python_interpreter_targets_mapping.keys())
+      default_interpreter = interpreters[0]
+
+      interpreters_info = {}
+      for interpreter, targets in six.iteritems(python_interpreter_targets_mapping):
+        chroot = self.cached_chroot(
+          interpreter=interpreter,
+          pex_info=PexInfo.default(),
+          targets=targets
+        )
+        interpreters_info[str(interpreter.identity)] = {
+          'binary': interpreter.binary,
+          'chroot': chroot.path()
+        }
+
+      yield 'python_setup', {
+        'default_interpreter': str(default_interpreter.identity),
+        'interpreters': interpreters_info
+      }
+
+  def _iter_target_infos(self, targets, classpath_products, python_interpreter_targets_mapping):
+    # Scala libraries export their java sources as targets too.
+    all_targets = []
+    resource_target_map = {}
+
+    def add_target(current_target):
+      all_targets.append(current_target)
+      for dep in current_target.dependencies:
+        if isinstance(dep, Resources):
+          resource_target_map[dep] = current_target
+      if isinstance(current_target, ScalaLibrary):
+        for dep in current_target.java_sources:
+          add_target(dep)
+
+    for target in targets:
+      add_target(target)
+
+    def get_target_type(target):
+      if target.is_test:
+        return ExportTask.SourceRootTypes.TEST
+      else:
+        if (isinstance(target, Resources) and
+            target in resource_target_map and
+            resource_target_map[target].is_test):
+          return ExportTask.SourceRootTypes.TEST_RESOURCE
+        elif isinstance(target, Resources):
+          return ExportTask.SourceRootTypes.RESOURCE
+        else:
+          return ExportTask.SourceRootTypes.SOURCE
+
+    def iter_transitive_jars(jar_lib):
+      """
+      :type jar_lib: :class:`pants.backend.jvm.targets.jar_library.JarLibrary`
+      :rtype: :class:`collections.Iterator` of
+              :class:`pants.backend.jvm.jar_dependency_utils.M2Coordinate`
+      """
+      if classpath_products:
+        jar_products = classpath_products.get_artifact_classpath_entries_for_targets((jar_lib,))
+        for _, jar_entry in jar_products:
+          coordinate = jar_entry.coordinate
+          # We drop classifier and type_ since those fields are represented in the global
+          # libraries dict and here we just want the key into that dict (see `_jar_id`).
+          yield M2Coordinate(org=coordinate.org, name=coordinate.name, rev=coordinate.rev)
+
+    def target_info(current_target, fragment):
       """
       :type current_target:pants.build_graph.target.Target
       """
-      def get_target_type(target):
-        if target.is_test:
-          return ExportTask.SourceRootTypes.TEST
-        else:
-          if (isinstance(target, Resources) and
-              target in resource_target_map and
-              resource_target_map[target].is_test):
-            return ExportTask.SourceRootTypes.TEST_RESOURCE
-          elif isinstance(target, Resources):
-            return ExportTask.SourceRootTypes.RESOURCE
-          else:
-            return ExportTask.SourceRootTypes.SOURCE
-
       info = {
         'targets': [],
         'libraries': [],
@@ -194,10 +292,10 @@ class ExportTask(IvyTaskMixin, PythonTask):
         'pants_target_type': self._get_pants_target_alias(type(current_target))
       }
 
-      if not current_target.is_synthetic:
-        info['globs'] = current_target.globs_relative_to_buildroot()
-        if self.get_options().sources:
-          info['sources'] = list(current_target.sources_relative_to_buildroot())
+      if 'globs' in fragment:
+        info['globs'] = fragment['globs']
+      if 'sources' in fragment:
+        info['sources'] = fragment['sources']
 
       if isinstance(current_target, PythonRequirementLibrary):
         reqs = current_target.payload.get_field_value('requirements', set())
@@ -212,20 +310,6 @@ class ExportTask(IvyTaskMixin, PythonTask):
         python_interpreter_targets_mapping[interpreter_for_target].append(current_target)
         info['python_interpreter'] = str(interpreter_for_target.identity)
 
-      def iter_transitive_jars(jar_lib):
-        """
-        :type jar_lib: :class:`pants.backend.jvm.targets.jar_library.JarLibrary`
-        :rtype: :class:`collections.Iterator` of
-                :class:`pants.backend.jvm.jar_dependency_utils.M2Coordinate`
-        """
-        if classpath_products:
-          jar_products = classpath_products.get_artifact_classpath_entries_for_targets((jar_lib,))
-          for _, jar_entry in jar_products:
-            coordinate = jar_entry.coordinate
-            # We drop classifier and type_ since those fields are represented in the global
-            # libraries dict and here we just want the key into that dict (see `_jar_id`).
-            yield M2Coordinate(org=coordinate.org, name=coordinate.name, rev=coordinate.rev)
-
       target_libraries = OrderedSet()
       if isinstance(current_target, JarLibrary):
         target_libraries = OrderedSet(iter_transitive_jars(current_target))
@@ -236,75 +320,72 @@ class ExportTask(IvyTaskMixin, PythonTask):
             target_libraries.add(M2Coordinate(jar.org, jar.name, jar.rev))
           # Add all the jars pulled in by this jar_library
           target_libraries.update(iter_transitive_jars(dep))
-        if isinstance(dep, Resources):
-          resource_target_map[dep] = current_target
 
       if isinstance(current_target, ScalaLibrary):
         for dep in current_target.java_sources:
           info['targets'].append(dep.address.spec)
-          process_target(dep)
 
       if isinstance(current_target, JvmTarget):
         info['excludes'] = [self._exclude_id(exclude) for exclude in current_target.excludes]
         info['platform'] = current_target.platform.name
 
-      info['roots'] = map(lambda (source_root, package_prefix): {
-        'source_root': source_root,
-        'package_prefix': package_prefix
-      }, self._source_roots_for_target(current_target))
+      info['roots'] = fragment['roots']
 
       if classpath_products:
         info['libraries'] = [self._jar_id(lib) for lib in target_libraries]
-      targets_map[current_target.address.spec] = info
-
-    for target in targets:
-      process_target(target)
-
-    jvm_platforms_map = {
-      'default_platform' : JvmPlatform.global_instance().default_platform.name,
-      'platforms': {
-        str(platform_name): {
-          'target_level' : str(platform.target_level),
-          'source_level' : str(platform.source_level),
-          'args' : platform.args,
-        } for platform_name, platform in JvmPlatform.global_instance().platforms_by_name.items() }
-    }
-
-    graph_info = {
-      'version': self.DEFAULT_EXPORT_VERSION,
-      'targets': targets_map,
-      'jvm_platforms': jvm_platforms_map,
-    }
-    jvm_distributions = DistributionLocator.global_instance().all_jdk_paths()
-    if jvm_distributions:
-      graph_info['jvm_distributions'] = jvm_distributions
-
-    if classpath_products:
-      graph_info['libraries'] = self._resolve_jars_info(targets, classpath_products)
+      return info
+
+    emitted = set()
+    with self._fragment_pool(len(all_targets)) as pool:
+      for batch_start in range(0, len(all_targets), self._BATCH_SIZE):
+        batch = [target for target in all_targets[batch_start:batch_start + self._BATCH_SIZE]
+                 if target.address.spec not in emitted]
+        for target, fragment in zip(batch, self._target_fragments(batch, pool)):
+          spec = target.address.spec
+          if spec not in emitted:
+            emitted.add(spec)
+            yield spec, target_info(target, fragment)
+
+  def _target_fragment(self, target):
+    """Computes the info for the given target that depends on nothing but the target itself.
 
-    if python_interpreter_targets_mapping:
-      interpreters = self.interpreter_cache.select_interpreter(
-        python_interpreter_targets_mapping.keys())
-      default_interpreter = interpreters[0]
-
-      interpreters_info = {}
-      for interpreter, targets in six.iteritems(python_interpreter_targets_mapping):
-        chroot = self.cached_chroot(
-          interpreter=interpreter,
-          pex_info=PexInfo.default(),
-          targets=targets
-        )
-        interpreters_info[str(interpreter.identity)] = {
-          'binary': interpreter.binary,
-          'chroot': chroot.path()
-        }
-
-      graph_info['python_setup'] = {
-        'default_interpreter': str(default_interpreter.identity),
-        'interpreters': interpreters_info
-      }
-
-    return graph_info
+    :type target:pants.build_graph.target.Target
+    """
+    fragment = {}
+    if not target.is_synthetic:
+      fragment['globs'] = target.globs_relative_to_buildroot()
+      if self.get_options().sources:
+        fragment['sources'] = list(target.sources_relative_to_buildroot())
+    fragment['roots'] = [{
+      'source_root': source_root,
+      'package_prefix': package_prefix
+    } for source_root, package_prefix in self._source_roots_for_target(target)]
+    return fragment
+
+  @contextmanager
+  def _fragment_pool(self, target_count):
+    """Yields a pool to compute the fragments of the given number of targets on, if any is needed.
+
+    The one pool serves every batch of targets exported, and is shut down on exit.
+    """
+    worker_count = min(self.get_options().worker_count, target_count)
+    if worker_count <= 1:
+      yield None
+      return
+    with self.context.new_workunit('export-fragments') as workunit:
+      pool = WorkerPool(workunit, self.context.run_tracker, worker_count)
+      try:
+        yield pool
+      finally:
+        pool.shutdown()
+
+  def _target_fragments(self, targets, pool=None):
+    """Returns the fragment of each of the given targets, in order, computing them on the given
+    pool if any.
+    """
+    if pool is None or len(targets) <= 1:
+      return [self._target_fragment(target) for target in targets]
+    return pool.submit_work_and_wait(Work(self._target_fragment, [(target,) for target in targets]))
 
   def _resolve_jars_info(self, targets, classpath_products):
     """Consults ivy_jar_products to export the external libraries.
@@ -366,9 +447,72 @@ class Export(ExportTask, ConsoleTask):
   def __init__(self, *args, **kwargs):
     super(ExportTask, self).__init__(*args, **kwargs)
 
+  def execute(self):
+    if self.get_options().formatted:
+      return super(Export, self).execute()
+
+    # The unformatted export is a single line, so it is streamed chunk by chunk rather than joined
+    # up in memory to pass through `console_output`.
+    with self._guard_sigpipe():
+      try:
+        items = self.iter_targets_map(self.context.targets())
+        for chunk in self._iter_json_chunks(items):
+          self._outstream.write(str(chunk))
+        self._outstream.write(self._console_separator)
+      finally:
+        self._outstream.flush()
+        if self.get_options().output_file:
+          self._outstream.close()
+
   def console_output(self, targets, classpath_products=None):
-    graph_info = self.generate_targets_map(targets, classpath_products=classpath_products)
+    items = self.iter_targets_map(targets, classpath_products=classpath_products)
     if self.get_options().formatted:
-      return json.dumps(graph_info, indent=4, separators=(',', ': ')).splitlines()
+      return self._iter_json_lines(items)
     else:
-      return [json.dumps(graph_info)]
+      return [''.join(self._iter_json_chunks(items))]
+
+  @classmethod
+  def _iter_json_lines(cls, items, indent=0):
+    """Yields the lines of a JSON object formatted like `json.dumps` does with an indent of 4.
+
+    :param items: The (key, value) pairs of the object.  Values that are iterators of (key, value)
+                  pairs are formatted as nested objects as they are consumed.
+    """
+    yield '{'
+    pending = None
+    item_indent = ' ' * (indent + 4)
+    for index, (key, value) in enumerate(items):
+      if index > 0:
+        pending += ','
+      if isinstance(value, collections.Iterator):
+        lines = cls._iter_json_lines(value, indent=indent + 4)
+      else:
+        value_lines = json.dumps(value, indent=4, separators=(',', ': ')).splitlines()
+        lines = [value_lines[0]] + [item_indent + line for line in value_lines[1:]]
+      for line_index, line in enumerate(lines):
+        if pending is not None:
+          yield pending
+        pending = '{}{}: {}'.format(item_indent, json.dumps(key), line) if line_index == 0 else line
+    if pending is not None:
+      yield pending
+    yield ' ' * indent + '}'
+
+  @classmethod
+  def _iter_json_chunks(cls, items):
+    """Yields the chunks of a JSON object formatted like `json.dumps` does by default.
+
+    :param items: The (key, value) pairs of the object.  Values that are iterators of (key, value)
+                  pairs are formatted as nested objects as they are consumed.
+    """
+    yield '{'
+    for index, (key, value) in enumerate(items):
+      if index > 0:
+        yield ', '
+      yield '{}: '.format(json.dumps(key))
+      if isinstance(value, collections.Iterator):
+        for chunk in cls._iter_json_chunks(value):
+          yield chunk
+      else:
+        yield json.dumps(value)
+    yield '}'
+
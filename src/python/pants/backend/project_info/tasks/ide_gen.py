@@ -167,7 +167,8 @@ class IdeGen(IvyTaskMixin, NailgunTask):
       confs.append('sources')
     if self.get_options().javadoc_jars:
       confs.append('javadoc')
-    compile_classpath = ClasspathProducts(self.get_options().pants_workdir)
+    compile_classpath = ClasspathProducts(self.get_options().pants_workdir,
+                                          build_graph=self.context.build_graph)
     self.resolve(executor=executor,
                  targets=targets,
                  classpath_products=compile_classpath,
@@ -301,7 +302,8 @@ class IdeGen(IvyTaskMixin, NailgunTask):
     external_javadoc_jar_dir = os.path.join(self.gen_project_workdir, 'external-libjavadoc')
     safe_mkdir(external_javadoc_jar_dir, clean=True)
 
-    classpath_products = self.resolve_jars(targets) or ClasspathProducts(self.get_options().pants_workdir)
+    classpath_products = self.resolve_jars(targets) or ClasspathProducts(
+      self.get_options().pants_workdir, build_graph=self.context.build_graph)
     cp_entry_by_classifier_by_orgname = defaultdict(lambda: defaultdict(dict))
     for conf, jar_entry in classpath_products.get_artifact_classpath_entries_for_targets(targets):
       coord = (jar_entry.coordinate.org, jar_entry.coordinate.name)
@@ -447,9 +449,9 @@ class Project(object):
       entries in this list which will be removed by dedup_sources()
     """
     collapsed_source_sets = []
-    for source in source_sets:
-      query = os.path.join(source.source_base, source.path)
-      source_root = source_roots.find_by_path(query)
+    found_source_roots = source_roots.find_many([os.path.join(source.source_base, source.path)
+                                                 for source in source_sets])
+    for source, source_root in zip(source_sets, found_source_roots):
       if not source_root:
         collapsed_source_sets.append(source)
       else:
@@ -0,0 +1,95 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import logging
+import os
+
+from pants.util.dirutil import safe_rmtree
+
+
+logger = logging.getLogger(__name__)
+
+
+# The subdirectory of the chroot cache holding the per-library layers chroots are linked from.
+LAYERS_DIR = 'layers'
+
+
+def _is_tmp(name):
+  return name.endswith('.tmp') or '.tmp.' in name
+
+
+def _cache_entries(chroot_cache_dir):
+  """Yields the path of each chroot and layer in the given chroot cache."""
+  for name in os.listdir(chroot_cache_dir):
+    path = os.path.join(chroot_cache_dir, name)
+    if name == LAYERS_DIR:
+      if os.path.isdir(path):
+        for layer in os.listdir(path):
+          if not _is_tmp(layer):
+            yield os.path.join(path, layer)
+    elif not _is_tmp(name) and os.path.isdir(path):
+      yield path
+
+
+def _disk_usage(path):
+  """Returns the number of bytes the given directory tree is responsible for.
+
+  Chroots and layers share files via hard links, so each file's size is split evenly amongst its
+  links.  The result is an approximation of the space that would eventually be reclaimed were the
+  tree and every other tree linking the same files to be removed.
+  """
+  total = 0
+  for root, _, files in os.walk(path):
+    for name in files:
+      try:
+        stat = os.lstat(os.path.join(root, name))
+      except OSError:
+        continue
+      total += stat.st_size / max(stat.st_nlink, 1)
+  return int(total)
+
+
+def garbage_collect_chroots(chroot_cache_dir, max_size, keep=(), log=None):
+  """Removes the least recently used chroots and layers until the cache fits in `max_size` bytes.
+
+  Recency is taken from the modification time of each chroot and layer directory, which users of
+  the cache must touch whenever they use an entry.
+
+  :param string chroot_cache_dir: The chroot cache to collect.
+  :param int max_size: The number of bytes the cache should occupy at most.
+  :param keep: Paths of entries that must not be removed, eg: because they are in use.
+  :param log: An optional logger; the module logger is used by default.
+  :returns: The paths of the removed entries.
+  :rtype: list of string
+  """
+  log = log or logger
+  if not os.path.isdir(chroot_cache_dir):
+    return []
+
+  keep = {os.path.realpath(path) for path in keep}
+  entries = []
+  total_size = 0
+  for path in _cache_entries(chroot_cache_dir):
+    try:
+      mtime = os.path.getmtime(path)
+    except OSError:
+      continue
+    size = _disk_usage(path)
+    total_size += size
+    entries.append((mtime, path, size))
+
+  removed = []
+  for _, path, size in sorted(entries):
+    if total_size <= max_size:
+      break
+    if os.path.realpath(path) in keep:
+      continue
+    log.debug('Garbage collecting {} ({} bytes).'.format(path, size))
+    safe_rmtree(path)
+    total_size -= size
+    removed.append(path)
+  return removed
@@ -5,29 +5,36 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import errno
 import functools
 import logging
 import os
 import shutil
 import sys
+import threading
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
 from pex.fetcher import Fetcher
 from pex.pex import PEX
 from pex.platforms import Platform
-from pex.resolver import resolve
+from pex.resolvable import resolvables_from_iterable
+from pex.resolver import CachingResolver
+from pex.resolver_options import ResolverOptionsBuilder
 from twitter.common.collections import OrderedSet
 
 from pants.backend.codegen.targets.python_antlr_library import PythonAntlrLibrary
 from pants.backend.codegen.targets.python_thrift_library import PythonThriftLibrary
 from pants.backend.python.antlr_builder import PythonAntlrBuilder
 from pants.backend.python.python_requirement import PythonRequirement
+from pants.backend.python.resolved_requirements_cache import ResolvedRequirementsCache
 from pants.backend.python.targets.python_binary import PythonBinary
 from pants.backend.python.targets.python_library import PythonLibrary
 from pants.backend.python.targets.python_requirement_library import PythonRequirementLibrary
 from pants.backend.python.targets.python_tests import PythonTests
 from pants.backend.python.thrift_builder import PythonThriftBuilder
 from pants.base.build_environment import get_buildroot
+from pants.base.hash_utils import hash_all
 from pants.build_graph.prep_command import PrepCommand
 from pants.build_graph.resources import Resources
 from pants.build_graph.target import Target
@@ -69,7 +76,14 @@ class PythonChroot(object):
                targets,
                platforms,
                extra_requirements=None,
-               log=None):
+               log=None,
+               layer_cache_dir=None):
+    """
+    :param string layer_cache_dir: If specified, the sources and resources of each library are
+      materialized once into an immutable per-library layer under this directory, and added to the
+      chroot from there.  Combined with a `builder` that hard-links rather than copies, this lets
+      chroots for overlapping sets of targets share the bulk of their content on disk.
+    """
     self._python_setup = python_setup
     self._python_repos = python_repos
     self._ivy_bootstrapper = ivy_bootstrapper
@@ -81,6 +95,7 @@ class PythonChroot(object):
     self._platforms = platforms
     self._extra_requirements = list(extra_requirements) if extra_requirements else []
     self._logger = log or logger
+    self._layer_cache_dir = layer_cache_dir
 
     # Note: unrelated to the general pants artifact cache.
     self._artifact_cache_root = os.path.join(
@@ -108,15 +123,67 @@ class PythonChroot(object):
     """
     self._builder.build(filename)
 
-  def _dump_library(self, library):
-    def copy_to_chroot(base, path, add_function):
-      src = os.path.join(get_buildroot(), base, path)
-      add_function(src, path)
+  def _library_layer(self, library):
+    """Returns the layer holding the sources and resources of the given library, creating it if
+    needed.
 
+    Layers are keyed by the fingerprints of the library and its resources, so are never modified
+    once created and may be hard-linked into any number of chroots.
+    """
+    key_components = [library.invalidation_hash(), library.target_base]
+    for resources_tgt in library.resources:
+      key_components.extend([resources_tgt.invalidation_hash(), resources_tgt.target_base])
+    layer = os.path.join(self._layer_cache_dir, hash_all(key_components))
+    if os.path.isdir(layer):
+      # Record the use for LRU garbage collection.
+      os.utime(layer, None)
+      return layer
+
+    self.debug('  Creating layer for library: {}'.format(library))
+    safe_mkdir(self._layer_cache_dir)
+    layer_tmp = safe_mkdtemp(dir=self._layer_cache_dir,
+                             prefix='{}.tmp.'.format(os.path.basename(layer)))
+    try:
+      def copy_to_layer(base, path, kind):
+        dst = os.path.join(layer_tmp, kind, path)
+        safe_mkdir(os.path.dirname(dst))
+        shutil.copy(os.path.join(get_buildroot(), base, path), dst)
+
+      self._add_library_files(library, functools.partial(copy_to_layer, kind='sources'),
+                              functools.partial(copy_to_layer, kind='resources'))
+      try:
+        os.rename(layer_tmp, layer)
+      except OSError as e:
+        # Another process won the race to create an identical layer.
+        if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+          raise
+    finally:
+      safe_rmtree(layer_tmp)
+    return layer
+
+  def _dump_library(self, library):
     self.debug('  Dumping library: {}'.format(library))
+    if self._layer_cache_dir:
+      layer = self._library_layer(library)
+
+      def add_source(base, path):
+        self._builder.add_source(os.path.join(layer, 'sources', path), path)
+
+      def add_resource(base, path):
+        self._builder.add_resource(os.path.join(layer, 'resources', path), path)
+    else:
+      def add_source(base, path):
+        self._builder.add_source(os.path.join(get_buildroot(), base, path), path)
+
+      def add_resource(base, path):
+        self._builder.add_resource(os.path.join(get_buildroot(), base, path), path)
+
+    self._add_library_files(library, add_source, add_resource)
+
+  def _add_library_files(self, library, add_source, add_resource):
     for relpath in library.sources_relative_to_source_root():
       try:
-        copy_to_chroot(library.target_base, relpath, self._builder.add_source)
+        add_source(library.target_base, relpath)
       except OSError:
         logger.error("Failed to copy {path} for library {library}"
                      .format(path=os.path.join(library.target_base, relpath),
@@ -126,8 +193,7 @@ class PythonChroot(object):
     for resources_tgt in library.resources:
       for resource_file_from_source_root in resources_tgt.sources_relative_to_source_root():
         try:
-          copy_to_chroot(resources_tgt.target_base, resource_file_from_source_root,
-                         self._builder.add_resource)
+          add_resource(resources_tgt.target_base, resource_file_from_source_root)
         except OSError:
           logger.error("Failed to copy {path} for resource {resource}"
                        .format(path=os.path.join(resources_tgt.target_base,
@@ -245,24 +311,89 @@ class PythonChroot(object):
        that must be included in order to satisfy them.  That may involve distributions for
        multiple platforms.
 
+       Previously resolved requirement sets are served from a `ResolvedRequirementsCache` without
+       consulting any fetchers, and the remaining platforms are resolved concurrently.
+
        :param requirements: A list of :class:`PythonRequirement` objects to resolve.
        :param find_links: Additional paths to search for source packages during resolution.
     """
     distributions = dict()
     platforms = self.get_platforms(self._platforms or self._python_setup.platforms)
+    reqs = [req.requirement for req in requirements]
+    resolved_requirements_cache = ResolvedRequirementsCache(
+      os.path.join(self._python_setup.resolver_cache_dir, 'resolved_sets'),
+      ttl=self._python_setup.resolver_cache_ttl)
+
+    keys = {}
+    for platform in platforms:
+      keys[platform] = resolved_requirements_cache.key(reqs,
+                                                       self._interpreter,
+                                                       platform,
+                                                       find_links,
+                                                       indexes=self._python_repos.indexes,
+                                                       repos=self._python_repos.repos)
+      cached = resolved_requirements_cache.get(keys[platform], reqs)
+      if cached is not None:
+        self.debug('Using cached resolve of requirements for {}'.format(platform))
+        distributions[platform] = cached
+
+    cold_platforms = [platform for platform in platforms if platform not in distributions]
+    if not cold_platforms:
+      return distributions
+
     fetchers = self._python_repos.get_fetchers()
     fetchers.extend(Fetcher([path]) for path in find_links)
     context = self._python_repos.get_network_context()
+    requirements_cache_dir = os.path.join(self._python_setup.resolver_cache_dir,
+                                          str(self._interpreter.identity))
+
+    def resolve_platform(platform):
+      # NB: This mirrors `pex.resolver.resolve`, but with a resolver that is safe to share its
+      # cache with the resolves of the other platforms running concurrently.
+      builder = ResolverOptionsBuilder(fetchers=fetchers, context=context)
+      resolver = _ConcurrentCachingResolver(requirements_cache_dir,
+                                            self._python_setup.resolver_cache_ttl,
+                                            interpreter=self._interpreter,
+                                            platform=platform)
+      return resolver.resolve(resolvables_from_iterable(reqs, builder))
+
+    if len(cold_platforms) == 1:
+      resolved = [resolve_platform(cold_platforms[0])]
+    else:
+      # NB: A raw ThreadPool rather than a WorkerPool, since a PythonChroot is not given the run
+      # tracker a WorkerPool reports its work to.
+      pool = ThreadPool(processes=len(cold_platforms))
+      try:
+        # We need to specify a timeout explicitly, because otherwise python ignores SIGINT when
+        # waiting on a condition variable, so we won't be able to ctrl-c out.
+        resolved = pool.map_async(resolve_platform, cold_platforms).get(timeout=1000000000)
+      finally:
+        pool.close()
+        pool.join()
 
-    for platform in platforms:
-      requirements_cache_dir = os.path.join(self._python_setup.resolver_cache_dir, str(self._interpreter.identity))
-      distributions[platform] = resolve(
-        requirements=[req.requirement for req in requirements],
-        interpreter=self._interpreter,
-        fetchers=fetchers,
-        platform=platform,
-        context=context,
-        cache=requirements_cache_dir,
-        cache_ttl=self._python_setup.resolver_cache_ttl)
+    for platform, dists in zip(cold_platforms, resolved):
+      resolved_requirements_cache.put(keys[platform], dists)
+      distributions[platform] = dists
 
     return distributions
+
+
+class _ConcurrentCachingResolver(CachingResolver):
+  """A `CachingResolver` that may share its cache with others resolving concurrently.
+
+  Having built a distribution, the pex `CachingResolver` copies it into the cache via a temporary
+  file of a fixed name, so two resolvers building the same package at once could interleave their
+  writes to it. Builds of the same package are serialized across all instances to prevent that.
+  """
+
+  _build_locks_lock = threading.Lock()
+  _build_locks = defaultdict(threading.Lock)
+
+  @classmethod
+  def _build_lock(cls, package):
+    with cls._build_locks_lock:
+      return cls._build_locks[package.filename]
+
+  def build(self, package, options):
+    with self._build_lock(package):
+      return super(_ConcurrentCachingResolver, self).build(package, options)
@@ -36,6 +36,9 @@ class PythonSetup(Subsystem):
     register('--chroot-cache-dir', advanced=True, default=None, metavar='<dir>',
              help='The parent directory for the chroot cache. '
                   'If unspecified, a standard path under the workdir is used.')
+    register('--chroot-cache-max-size', advanced=True, type=int, default=None, metavar='<bytes>',
+             help='If set, the least recently used chroots in the chroot cache are garbage '
+                  'collected whenever it grows beyond this many bytes.')
     register('--resolver-cache-dir', advanced=True, default=None, metavar='<dir>',
              help='The parent directory for the requirement resolver cache. '
                   'If unspecified, a standard path under the workdir is used.')
@@ -73,6 +76,10 @@ class PythonSetup(Subsystem):
     return (self.get_options().chroot_cache_dir or
             os.path.join(self.scratch_dir, 'chroots'))
 
+  @property
+  def chroot_cache_max_size(self):
+    return self.get_options().chroot_cache_max_size
+
   @property
   def resolver_cache_dir(self):
     return (self.get_options().resolver_cache_dir or
@@ -0,0 +1,160 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha1
+
+from pex.base import requirement_is_exact
+from pex.util import DistributionHelper
+
+from pants.util.dirutil import safe_concurrent_creation
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResolvedRequirementsCache(object):
+  """Caches the distributions a set of requirements resolved to.
+
+  A resolve maps a requirement set to a list of distributions in the pex resolver cache.  That
+  mapping is recorded here, keyed by everything that can affect the resolve, so that identical
+  requirement sets (eg: shared by many test targets) can be turned into distributions without
+  consulting any fetchers at all.  The most recently used entries are held in memory for the life
+  of the process and all are persisted under `cache_dir` across runs.
+
+  A resolve in which every distribution is pinned by an exact (`==`) requirement never expires.
+  Any other resolve, including one where exact requirements pulled in distributions via open-ended
+  transitive requirements, is only used within `ttl` seconds of being recorded.
+  """
+
+  # Bump this when the persisted format changes to force re-resolves.
+  _VERSION = 2
+
+  # The most resolved sets held in memory at once.
+  _MEMORY_CACHE_SIZE = 256
+
+  # Resolved sets are shared across all chroots in a run, least recently used first.
+  _memory_cache = OrderedDict()
+  _memory_cache_lock = threading.Lock()
+
+  def __init__(self, cache_dir, ttl=None):
+    """
+    :param string cache_dir: The directory resolved sets are persisted to.
+    :param int ttl: The time in seconds before a resolve including open-ended requirements expires,
+                    or `None` if such resolves should never be reused.
+    """
+    self._cache_dir = cache_dir
+    self._ttl = ttl
+
+  @staticmethod
+  def key(requirements, interpreter, platform, find_links, indexes=(), repos=()):
+    """Returns the key under which the resolve of the given inputs is cached.
+
+    :param requirements: The `pkg_resources.Requirement`s being resolved.
+    :param interpreter: The `PythonInterpreter` the requirements are resolved for.
+    :param string platform: The platform the requirements are resolved for.
+    :param find_links: Paths searched for packages in addition to the indexes and repos.
+    :param indexes: The URLs of the package indexes consulted.
+    :param repos: The URLs of the package repositories consulted.
+    :rtype: string
+    """
+    hasher = sha1()
+    hasher.update(json.dumps({
+      'requirements': sorted(str(req) for req in requirements),
+      'interpreter': str(interpreter.identity),
+      'platform': str(platform),
+      'find_links': sorted(find_links),
+      'indexes': list(indexes),
+      'repos': list(repos),
+    }, sort_keys=True).encode('utf-8'))
+    return hasher.hexdigest()
+
+  def _path(self, key):
+    return os.path.join(self._cache_dir, '{}.json'.format(key))
+
+  def _expired(self, recorded_at, requirements, projects):
+    pinned = {req.key for req in requirements if requirement_is_exact(req)}
+    if all(project in pinned for project in projects):
+      return False
+    return not self._ttl or (time.time() - recorded_at) >= self._ttl
+
+  def _memoize(self, key, recorded_at, distributions):
+    with self._memory_cache_lock:
+      self._memory_cache.pop(self._path(key), None)
+      self._memory_cache[self._path(key)] = (recorded_at, distributions)
+      while len(self._memory_cache) > self._MEMORY_CACHE_SIZE:
+        self._memory_cache.popitem(last=False)
+
+  def _load(self, key):
+    try:
+      with open(self._path(key), 'rb') as fp:
+        entry = json.load(fp)
+    except IOError:
+      return None
+    except ValueError as e:
+      logger.debug('Ignoring corrupt resolved requirements entry {}: {}'.format(key, e))
+      return None
+    return entry if entry.get('version') == self._VERSION else None
+
+  def get(self, key, requirements):
+    """Returns the cached distributions for the given key, or `None` on a miss.
+
+    :param string key: The key returned by `key` for this resolve.
+    :param requirements: The `pkg_resources.Requirement`s being resolved.
+    :rtype: list of `pkg_resources.Distribution`
+    """
+    with self._memory_cache_lock:
+      cached = self._memory_cache.get(self._path(key))
+    if cached is not None:
+      recorded_at, distributions = cached
+      # The pex resolver cache may have been pruned since the entry was memoized.
+      if (not self._expired(recorded_at, requirements, [dist.key for dist in distributions]) and
+          all(os.path.exists(dist.location) for dist in distributions)):
+        self._memoize(key, recorded_at, distributions)
+        return distributions
+
+    entry = self._load(key)
+    if entry is None or self._expired(entry['recorded_at'], requirements, entry['projects']):
+      return None
+
+    distributions = []
+    for location in entry['locations']:
+      dist = None
+      if os.path.exists(location):
+        dist = DistributionHelper.distribution_from_path(location)
+      if dist is None:
+        # The pex resolver cache has been pruned out from under us.
+        return None
+      distributions.append(dist)
+
+    self._memoize(key, entry['recorded_at'], distributions)
+    return distributions
+
+  def put(self, key, distributions):
+    """Records the distributions the resolve identified by key resolved to.
+
+    :param string key: The key returned by `key` for this resolve.
+    :param distributions: The resolved `pkg_resources.Distribution`s.
+    """
+    distributions = list(distributions)
+    recorded_at = time.time()
+    self._memoize(key, recorded_at, distributions)
+
+    entry = {
+      'version': self._VERSION,
+      'recorded_at': recorded_at,
+      'locations': [dist.location for dist in distributions],
+      'projects': [dist.key for dist in distributions],
+    }
+    with safe_concurrent_creation(self._path(key)) as tmp_path:
+      with open(tmp_path, 'wb') as fp:
+        json.dump(entry, fp)
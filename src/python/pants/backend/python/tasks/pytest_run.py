@@ -6,11 +6,13 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import itertools
+import json
 import logging
 import os
 import re
 import shutil
 import subprocess
+import threading
 import time
 import traceback
 from contextlib import contextmanager
@@ -26,14 +28,17 @@ from pants.backend.python.targets.python_tests import PythonTests
 from pants.backend.python.tasks.python_task import PythonTask
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError, TestFailedTaskError
-from pants.base.workunit import WorkUnitLabel
+from pants.base.worker_pool import Work, WorkerPool
+from pants.base.workunit import WorkUnit, WorkUnitLabel
 from pants.build_graph.target import Target
 from pants.task.testrunner_task_mixin import TestRunnerTaskMixin
 from pants.util.contextutil import (environment_as, temporary_dir, temporary_file,
                                     temporary_file_path)
-from pants.util.dirutil import safe_mkdir, safe_open
+from pants.util.dirutil import safe_concurrent_creation, safe_mkdir, safe_open
+from pants.util.memo import memoized_property
 from pants.util.process_handler import SubprocessProcessHandler
 from pants.util.strutil import safe_shlex_split
+from pants.util.xml_parser import XmlParser
 
 
 # Initialize logging, since tests do not run via pants_exe (where it is usually done).
@@ -98,6 +103,10 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
     register('--fail-slow', action='store_true', default=False,
              help='Do not fail fast on the first test failure in a suite; instead run all tests '
                   'and report errors only after all tests complete.')
+    register('--workers', advanced=True, type=int, default=1,
+             help='In --no-fast mode, run the tests of up to this many targets concurrently, each '
+                  'in its own pytest process. Targets are run one at a time when --coverage is '
+                  'enabled, since coverage data is written to the working directory.')
     register('--junit-xml-dir', metavar='<DIR>',
              help='Specifying a directory causes junit xml results files to be emitted under '
                   'that dir for each test run.')
@@ -114,8 +123,15 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
              help='Directory to emit coverage reports to.'
              'If not specified, a default within dist is used.')
     register('--shard',
-             help='Subset of tests to run, in the form M/N, 0 <= M < N. For example, 1/3 means '
-                  'run tests number 2, 5, 8, 11, ...')
+             help='Subset of tests to run, in the form M/N, 0 <= M < N. If --test-durations-file '
+                  'is given, tests are split into shards of similar expected run time, assuming '
+                  'unknown tests take the mean known duration. Otherwise 1/3 means run tests '
+                  'number 2, 5, 8, 11, ...')
+    register('--test-durations-file', advanced=True, metavar='<FILE>',
+             help='A json file mapping test case names to durations in seconds, used to balance '
+                  '--shard runs, eg: a copy of the test_durations.json recorded in the task workdir '
+                  'by unsharded runs with a --junit-xml-dir. The file is only read, so every shard '
+                  'of a series is split using the same durations.')
 
   @classmethod
   def supports_passthru_args(cls):
@@ -123,6 +139,9 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
 
   def __init__(self, *args, **kwargs):
     super(PytestRun, self).__init__(*args, **kwargs)
+    # Interpreter selection and chroot building are not safe to run concurrently.
+    self._chroot_lock = threading.Lock()
+    self._test_durations_lock = threading.Lock()
 
   def _test_target_filter(self):
     def target_filter(target):
@@ -156,11 +175,15 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
       results = {}
       # Coverage often throws errors despite tests succeeding, so force failsoft in that case.
       fail_hard = not self.get_options().fail_slow and not self.get_options().coverage
-      for target in targets:
-        rv = self._do_run_tests([target], workunit)
-        results[target] = rv
-        if not rv.success and fail_hard:
-          break
+      workers = 1 if self.get_options().coverage else self.get_options().workers
+      if workers > 1 and len(targets) > 1:
+        results = self._run_targets_concurrently(targets, workunit, workers, fail_hard)
+      else:
+        for target in targets:
+          rv = self._do_run_tests([target], workunit)
+          results[target] = rv
+          if not rv.success and fail_hard:
+            break
 
       for target in sorted(results):
         self.context.log.info('{0:80}.....{1:>10}'.format(target.id, str(results[target])))
@@ -169,6 +192,54 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
       if failed_targets:
         raise TestFailedTaskError(failed_targets=failed_targets)
 
+  def _run_targets_concurrently(self, targets, workunit, workers, fail_hard):
+    """Runs the tests of each target in its own pytest process, on a bounded pool of workers.
+
+    The output of each process is captured in a workunit of its own, and each process writes its
+    own result log.  If a result log was requested in the pytest options, the per-target logs are
+    concatenated into it in target order once all the tests have run.  When failing hard no more
+    targets are started once one has failed.
+
+    :returns: A mapping from each target that was run to its `PythonTestResult`.
+    """
+    requested_resultlog = self._extract_resultlog_filename(self._pytest_option_args())
+    stop = threading.Event()
+    results = {}
+
+    with temporary_dir() as resultlog_dir:
+      resultlog_paths = [os.path.join(resultlog_dir, '{}.log'.format(i))
+                         for i in range(len(targets))]
+
+      def run_target(target, resultlog_path):
+        if stop.is_set():
+          return
+        with self.context.new_workunit(name=target.address.spec,
+                                       labels=[WorkUnitLabel.TEST]) as target_workunit:
+          try:
+            rv = self._do_run_tests([target], target_workunit, resultlog_path=resultlog_path)
+          except Exception:
+            stop.set()
+            raise
+          target_workunit.set_outcome(WorkUnit.SUCCESS if rv.success else WorkUnit.FAILURE)
+        results[target] = rv
+        if not rv.success and fail_hard:
+          stop.set()
+
+      pool = WorkerPool(workunit, self.context.run_tracker, min(workers, len(targets)))
+      try:
+        pool.submit_work_and_wait(Work(run_target, zip(targets, resultlog_paths)))
+      finally:
+        pool.shutdown()
+
+      if requested_resultlog:
+        with safe_open(requested_resultlog, 'w') as merged:
+          for resultlog_path in resultlog_paths:
+            if os.path.exists(resultlog_path):
+              with open(resultlog_path, 'r') as fp:
+                shutil.copyfileobj(fp, merged)
+
+    return results
+
   class InvalidShardSpecification(TaskError):
     """Indicates an invalid `--shard` option."""
 
@@ -201,37 +272,116 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
       return
 
     with temporary_dir() as tmp:
+      with open(os.path.join(tmp, 'test_durations.json'), 'w') as fp:
+        json.dump(self._shard_durations, fp)
       path = os.path.join(tmp, 'conftest.py')
       with open(path, 'w') as fp:
         fp.write(dedent("""
+          import json
+          import os
+
+
           def pytest_report_header(config):
             return 'shard: {shard} of {total} (0-based shard numbering)'
 
 
+          def duration_key(item):
+            # Mirrors the junitxml plugin's `classname.name` naming of test cases.
+            names = [name.replace('.py', '') for name in item.nodeid.split('::') if name != '()']
+            names[0] = names[0].replace('/', '.')
+            return '.'.join(names)
+
+
           def pytest_collection_modifyitems(session, config, items):
             total_count = len(items)
-            removed = 0
-            for i, item in enumerate(list(items)):
-              if i % {total} != {shard}:
-                del items[i - removed]
-                removed += 1
+            with open(os.path.join(os.path.dirname(__file__), 'test_durations.json')) as fp:
+              durations = json.load(fp)
+            keys = [duration_key(item) for item in items]
+            known = [durations[key] for key in keys if key in durations]
+            if known:
+              # Assign the longest tests first, each to the least loaded shard. Ties are broken by
+              # collection order, so tests of equal duration are dealt out round-robin.
+              default_duration = sum(known) / len(known)
+              loads = [0.0] * {total}
+              shards = [None] * total_count
+              for i in sorted(range(total_count),
+                              key=lambda i: (-durations.get(keys[i], default_duration), i)):
+                shard = min(range({total}), key=lambda shard: (loads[shard], shard))
+                loads[shard] += durations.get(keys[i], default_duration)
+                shards[i] = shard
+              items[:] = [item for i, item in enumerate(items) if shards[i] == {shard}]
+            else:
+              items[:] = [item for i, item in enumerate(items) if i % {total} == {shard}]
             reporter = config.pluginmanager.getplugin('terminalreporter')
             reporter.write_line('Only executing {{}} of {{}} total tests in shard {shard} of '
-                                '{total}'.format(total_count - removed, total_count),
+                                '{total}'.format(len(items), total_count),
                                 bold=True, invert=True, yellow=True)
         """.format(shard=shard, total=total)))
       yield [path]
 
+  @property
+  def _test_durations_file(self):
+    return os.path.join(self.workdir, 'test_durations.json')
+
+  @staticmethod
+  def _load_test_durations(path):
+    try:
+      with open(path, 'r') as fp:
+        return json.load(fp)
+    except (IOError, ValueError):
+      return {}
+
+  @memoized_property
+  def _test_durations(self):
+    """Returns the recorded duration in seconds of each test case, keyed by junit xml name."""
+    return self._load_test_durations(self._test_durations_file)
+
+  @memoized_property
+  def _shard_durations(self):
+    """Returns the durations to balance shards by, which are never updated by this run."""
+    test_durations_file = self.get_options().test_durations_file
+    if not test_durations_file:
+      return {}
+    if not os.path.isfile(test_durations_file):
+      raise TaskError('The --test-durations-file {} does not exist.'.format(test_durations_file))
+    return self._load_test_durations(test_durations_file)
+
+  def _record_test_durations(self, junit_xml_path):
+    """Records the durations of the test cases in the given junit xml report."""
+    durations = {}
+    try:
+      xml = XmlParser.from_file(junit_xml_path)
+      for testcase in xml.parsed.getElementsByTagName('testcase'):
+        name = '{}.{}'.format(testcase.getAttribute('classname'), testcase.getAttribute('name'))
+        durations[name] = float(testcase.getAttribute('time'))
+    except (XmlParser.XmlError, ValueError) as e:
+      self.context.log.debug('Not recording test durations from {}: {}'.format(junit_xml_path, e))
+      return
+
+    if durations:
+      with self._test_durations_lock:
+        self._test_durations.update(durations)
+        with safe_concurrent_creation(self._test_durations_file) as tmp_path:
+          with open(tmp_path, 'w') as fp:
+            json.dump(self._test_durations, fp)
+
   @contextmanager
   def _maybe_emit_junit_xml(self, targets):
-    args = []
     xml_base = self.get_options().junit_xml_dir
-    if xml_base and targets:
-      xml_base = os.path.realpath(xml_base)
-      xml_path = os.path.join(xml_base, Target.maybe_readable_identify(targets) + '.xml')
-      safe_mkdir(os.path.dirname(xml_path))
-      args.append('--junitxml={}'.format(xml_path))
-    yield args
+    if not (xml_base and targets):
+      yield []
+      return
+
+    xml_base = os.path.realpath(xml_base)
+    xml_path = os.path.join(xml_base, Target.maybe_readable_identify(targets) + '.xml')
+    safe_mkdir(os.path.dirname(xml_path))
+    try:
+      yield ['--junitxml={}'.format(xml_path)]
+    finally:
+      # A shard only runs some of the tests it was balanced against, and every shard of a series
+      # must be split using the same durations, so only unsharded runs are recorded.
+      if not self.get_options().shard and os.path.exists(xml_path):
+        self._record_test_durations(xml_path)
 
   DEFAULT_COVERAGE_CONFIG = dedent(b"""
     [run]
@@ -426,16 +576,17 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
 
   @contextmanager
   def _test_runner(self, targets, workunit):
-    interpreter = self.select_interpreter_for_targets(targets)
-    pex_info = PexInfo.default()
-    pex_info.entry_point = 'pytest'
-
-    chroot = self.cached_chroot(interpreter=interpreter,
-                                pex_info=pex_info,
-                                targets=targets,
-                                platforms=('current',),
-                                extra_requirements=self._TESTING_TARGETS)
-    pex = chroot.pex()
+    with self._chroot_lock:
+      interpreter = self.select_interpreter_for_targets(targets)
+      pex_info = PexInfo.default()
+      pex_info.entry_point = 'pytest'
+
+      chroot = self.cached_chroot(interpreter=interpreter,
+                                  pex_info=pex_info,
+                                  targets=targets,
+                                  platforms=('current',),
+                                  extra_requirements=self._TESTING_TARGETS)
+      pex = chroot.pex()
     with self._maybe_shard() as shard_args:
       with self._maybe_emit_junit_xml(targets) as junit_args:
         with self._maybe_emit_coverage_data(targets,
@@ -457,9 +608,8 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
       profile = self.get_options().profile
       if profile:
         env['PEX_PROFILE_FILENAME'] = '{0}.subprocess.{1:.6f}'.format(profile, time.time())
-      with environment_as(**env):
-        rc = self._spawn_and_wait(pex, workunit, args=args, setsid=True)
-        return PythonTestResult.rc(rc)
+      rc = self._spawn_and_wait(pex, workunit, args=args, setsid=True, env=env)
+      return PythonTestResult.rc(rc)
     except TestFailedTaskError:
       # _spawn_and_wait wraps the test runner in a timeout, so it could
       # fail with a TestFailedTaskError. We can't just set PythonTestResult
@@ -500,20 +650,42 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
 
     return list(failed_targets)
 
-  def _do_run_tests(self, targets, workunit):
+  def _pytest_option_args(self):
+    args = []
+    for options in self.get_options().options + self.get_passthru_args():
+      args.extend(safe_shlex_split(options))
+    return args
+
+  def _extract_resultlog_filename(self, args):
+    resultlogs = [arg[arg.find('=') + 1:] for arg in args if arg.startswith('--resultlog=')]
+    if resultlogs:
+      return resultlogs[0]
+    else:
+      try:
+        return args[args.index('--resultlog') + 1]
+      except IndexError:
+        self.context.log.error('--resultlog specified without an argument')
+        return None
+      except ValueError:
+        return None
 
-    def _extract_resultlog_filename(args):
-      resultlogs = [arg[arg.find('=') + 1:] for arg in args if arg.startswith('--resultlog=')]
-      if resultlogs:
-        return resultlogs[0]
-      else:
-        try:
-          return args[args.index('--resultlog') + 1]
-        except IndexError:
-          self.context.log.error('--resultlog specified without an argument')
-          return None
-        except ValueError:
-          return None
+  @staticmethod
+  def _strip_resultlog_args(args):
+    stripped = []
+    args_iter = iter(args)
+    for arg in args_iter:
+      if arg == '--resultlog':
+        next(args_iter, None)
+      elif not arg.startswith('--resultlog='):
+        stripped.append(arg)
+    return stripped
+
+  def _do_run_tests(self, targets, workunit, resultlog_path=None):
+    """Runs the tests in the given targets in a single pytest process.
+
+    :param string resultlog_path: An optional path to write the result log of this run to, in place
+      of any given in the pytest options.
+    """
 
     if not targets:
       return PythonTestResult.rc(0)
@@ -537,13 +709,17 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
         args.extend(['-s'])
       if self.get_options().colors:
         args.extend(['--color', 'yes'])
-      for options in self.get_options().options + self.get_passthru_args():
-        args.extend(safe_shlex_split(options))
+      args.extend(self._pytest_option_args())
       args.extend(test_args)
       args.extend(sources)
 
+      if resultlog_path:
+        args = self._strip_resultlog_args(args)
+        args.insert(0, '--resultlog={0}'.format(resultlog_path))
+        return run_and_analyze(resultlog_path)
+
       # The user might have already specified the resultlog option. In such case, reuse it.
-      resultlog_arg = _extract_resultlog_filename(args)
+      resultlog_arg = self._extract_resultlog_filename(args)
 
       if resultlog_arg:
         return run_and_analyze(resultlog_arg)
@@ -556,13 +732,16 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
     process = self._spawn(pex, workunit, args, setsid=False)
     return process.wait()
 
-  def _spawn(self, pex, workunit, args, setsid=False):
+  def _spawn(self, pex, workunit, args, setsid=False, env=None):
     # NB: We don't use pex.run(...) here since it makes a point of running in a clean environment,
     # scrubbing all `PEX_*` environment overrides and we use overrides when running pexes in this
     # task.
 
+    # NB: Extra env vars are passed to the subprocess directly rather than set on os.environ, since
+    # tests may be spawned concurrently.
     process = subprocess.Popen(pex.cmdline(args),
                                preexec_fn=os.setsid if setsid else None,
+                               env=dict(os.environ, **env) if env else None,
                                stdout=workunit.output('stdout'),
                                stderr=workunit.output('stderr'))
 
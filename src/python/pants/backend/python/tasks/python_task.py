@@ -9,12 +9,14 @@ import json
 import os
 import shutil
 import tempfile
+import threading
 from contextlib import contextmanager
 
 from pex.pex_builder import PEXBuilder
 from pex.pex_info import PexInfo
 from twitter.common.collections import OrderedSet
 
+from pants.backend.python.chroot_cache_gc import LAYERS_DIR, garbage_collect_chroots
 from pants.backend.python.interpreter_cache import PythonInterpreterCache
 from pants.backend.python.python_chroot import PythonChroot
 from pants.backend.python.python_setup import PythonRepos, PythonSetup
@@ -47,6 +49,10 @@ class PythonTask(Task):
     self._compatibilities = self.get_options().interpreter or [b'']
     self._interpreter_cache = None
     self._interpreter = None
+    # Every cached chroot built or used by this run, which garbage collection must not remove even
+    # while other chroots are being built concurrently.
+    self._chroots_in_use = set()
+    self._chroots_in_use_lock = threading.Lock()
 
   @property
   def interpreter_cache(self):
@@ -118,7 +124,8 @@ class PythonTask(Task):
   def thrift_binary_factory(self):
     return ThriftBinary.Factory.scoped_instance(self).create
 
-  def create_chroot(self, interpreter, builder, targets, platforms, extra_requirements):
+  def create_chroot(self, interpreter, builder, targets, platforms, extra_requirements,
+                    layer_cache_dir=None):
     return PythonChroot(python_setup=PythonSetup.global_instance(),
                         python_repos=PythonRepos.global_instance(),
                         ivy_bootstrapper=self.ivy_bootstrapper,
@@ -128,17 +135,21 @@ class PythonTask(Task):
                         targets=targets,
                         platforms=platforms,
                         extra_requirements=extra_requirements,
-                        log=self.context.log)
+                        log=self.context.log,
+                        layer_cache_dir=layer_cache_dir)
 
   def cached_chroot(self, interpreter, pex_info, targets, platforms=None,
                     extra_requirements=None, executable_file_content=None):
     """Returns a cached PythonChroot created with the specified args.
 
-    The returned chroot will be cached for future use.
+    The returned chroot will be cached for future use.  Cached chroots are assembled by
+    hard-linking from per-library layers and the resolver cache, so chroots for overlapping sets of
+    targets share most of their content on disk.  If `--python-setup-chroot-cache-max-size` is set,
+    the least recently used chroots and layers are garbage collected to keep the cache within it,
+    sparing every chroot this task has built or used so far.
 
     :rtype: pants.backend.python.python_chroot.PythonChroot
 
-    TODO: Garbage-collect old chroots, so they don't pile up?
     TODO: Ideally chroots would just be products produced by some other task. But that's
           a bit too complicated to implement right now, as we'd need a way to request
           chroots for a variety of sets of targets.
@@ -149,22 +160,39 @@ class PythonTask(Task):
 
     path = self._chroot_path(interpreter, pex_info, targets, platforms, extra_requirements,
                              executable_file_content)
+    layer_cache_dir = os.path.join(self.chroot_cache_dir, LAYERS_DIR)
+    with self._chroots_in_use_lock:
+      self._chroots_in_use.add(path)
     if not os.path.exists(path):
       path_tmp = path + '.tmp'
       self._build_chroot(path_tmp, interpreter, pex_info, targets, platforms,
-                         extra_requirements, executable_file_content)
+                         extra_requirements, executable_file_content,
+                         layer_cache_dir=layer_cache_dir)
       shutil.move(path_tmp, path)
+      self._garbage_collect_chroots()
+    else:
+      # Record the use for LRU garbage collection.
+      os.utime(path, None)
 
     # We must read the PexInfo that was frozen into the pex, so we get the modifications
     # created when that pex was built.
     pex_info = PexInfo.from_pex(path)
-    # Now create a PythonChroot wrapper without dumping it.
-    builder = PEXBuilder(path=path, interpreter=interpreter, pex_info=pex_info, copy=True)
+    # Now create a PythonChroot wrapper without dumping it.  Since the chroot shares files with
+    # other chroots via hard links, any re-dump must link rather than copy over them.
+    builder = PEXBuilder(path=path, interpreter=interpreter, pex_info=pex_info, copy=False)
     return self.create_chroot(interpreter=interpreter,
                               builder=builder,
                               targets=targets,
                               platforms=platforms,
-                              extra_requirements=extra_requirements)
+                              extra_requirements=extra_requirements,
+                              layer_cache_dir=layer_cache_dir)
+
+  def _garbage_collect_chroots(self):
+    max_size = PythonSetup.global_instance().chroot_cache_max_size
+    if max_size is not None:
+      with self._chroots_in_use_lock:
+        keep = list(self._chroots_in_use)
+      garbage_collect_chroots(self.chroot_cache_dir, max_size, keep=keep, log=self.context.log)
 
   @contextmanager
   def temporary_chroot(self, interpreter, pex_info, targets, platforms,
@@ -177,16 +205,22 @@ class PythonTask(Task):
     chroot.delete()
 
   def _build_chroot(self, path, interpreter, pex_info, targets, platforms,
-                     extra_requirements=None, executable_file_content=None):
-    """Create a PythonChroot with the specified args."""
-    builder = PEXBuilder(path=path, interpreter=interpreter, pex_info=pex_info, copy=True)
+                     extra_requirements=None, executable_file_content=None, layer_cache_dir=None):
+    """Create a PythonChroot with the specified args.
+
+    If a `layer_cache_dir` is given the chroot is hard-linked together from immutable layers,
+    otherwise all of its content is copied in.
+    """
+    builder = PEXBuilder(path=path, interpreter=interpreter, pex_info=pex_info,
+                         copy=layer_cache_dir is None)
     with self.context.new_workunit('chroot'):
       chroot = self.create_chroot(
         interpreter=interpreter,
         builder=builder,
         targets=targets,
         platforms=platforms,
-        extra_requirements=extra_requirements)
+        extra_requirements=extra_requirements,
+        layer_cache_dir=layer_cache_dir)
       chroot.dump()
       if executable_file_content is not None:
         with open(os.path.join(path, '{}.py'.format(self.CHROOT_EXECUTABLE_NAME)), 'w') as outfile:
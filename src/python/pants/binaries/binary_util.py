@@ -8,17 +8,20 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import logging
 import os
 import posixpath
+import Queue as queue
 import subprocess
+import threading
 from contextlib import closing, contextmanager
 
 from twitter.common.collections import OrderedSet
 
 from pants.base.exceptions import TaskError
+from pants.base.hash_utils import hash_all
 from pants.net.http.fetcher import Fetcher
 from pants.option.custom_types import dict_option, list_option
 from pants.subsystem.subsystem import Subsystem
-from pants.util.contextutil import temporary_file
-from pants.util.dirutil import chmod_plus_x, safe_delete, safe_open
+from pants.util.contextutil import temporary_dir, temporary_file
+from pants.util.dirutil import chmod_plus_x, safe_delete, safe_mkdir_for, safe_open
 from pants.util.osutil import get_os_id
 
 
@@ -55,6 +58,10 @@ class BinaryUtil(object):
       register('--fetch-timeout-secs', type=int, default=30, advanced=True,
                help='Timeout in seconds for url reads when fetching binary tools from the '
                     'repos specified by --baseurls')
+      register('--fetch-hedge-delay-secs', type=float, advanced=True,
+               help='If set, the number of seconds to wait on a fetch from one of the --baseurls '
+                    'before racing it against a fetch from the next; the first to complete wins. '
+                    'By default the urls are tried one after the other.')
       register("--path-by-id", type=dict_option, advanced=True,
                help='Maps output of uname for a machine to a binary search path.  e.g. '
                '{ ("darwin", "15"): ["mac", "10.11"]), ("linux", "arm32"): ["linux", "arm32"] }')
@@ -64,7 +71,8 @@ class BinaryUtil(object):
       # NB: create is a class method to ~force binary fetch location to be global.
       options = cls.global_instance().get_options()
       return BinaryUtil(options.baseurls, options.fetch_timeout_secs, options.pants_bootstrapdir,
-                        options.path_by_id)
+                        options.path_by_id,
+                        hedge_delay_secs=options.fetch_hedge_delay_secs)
 
   class MissingMachineInfo(TaskError):
     """Indicates that pants was unable to map this machine's OS to a binary path prefix."""
@@ -81,6 +89,17 @@ class BinaryUtil(object):
     """Indicates that no urls were specified in pants.ini."""
     pass
 
+  class _Cancelled(Exception):
+    """Indicates a fetch was abandoned because a fetch from another url won the race."""
+
+  class _CancelListener(Fetcher.Listener):
+    def __init__(self, cancelled):
+      self._cancelled = cancelled
+
+    def recv_chunk(self, data):
+      if self._cancelled.is_set():
+        raise BinaryUtil._Cancelled()
+
   def _select_binary_base_path(self, supportdir, version, name, uname_func=None):
     """Calculate the base path.
 
@@ -109,7 +128,7 @@ class BinaryUtil(object):
           sysname=sysname, release=release, machine=machine))
     return os.path.join(supportdir, *(middle_path + [version, name]))
 
-  def __init__(self, baseurls, timeout_secs, bootstrapdir, path_by_id=None):
+  def __init__(self, baseurls, timeout_secs, bootstrapdir, path_by_id=None, hedge_delay_secs=None):
     """Creates a BinaryUtil with the given settings to define binary lookup behavior.
 
     This constructor is primarily used for testing.  Production code will usually initialize
@@ -122,9 +141,12 @@ class BinaryUtil(object):
       search for binaries in, or download binaries to if needed.
     :param dict path_by_id: Additional mapping from (sysname, id) -> (os, arch) for tool
       directory naming
+    :param float hedge_delay_secs: If not `None`, the seconds to wait on a fetch from one baseurl
+      before racing it against a fetch from the next.
     """
     self._baseurls = baseurls
     self._timeout_secs = timeout_secs
+    self._hedge_delay_secs = hedge_delay_secs
     self._pants_bootstrapdir = bootstrapdir
     self._path_by_id = _DEFAULT_PATH_BY_ID.copy()
     if path_by_id:
@@ -141,29 +163,129 @@ class BinaryUtil(object):
     :raises: :class:`pants.binary_util.BinaryUtil.BinaryNotFound` if no binary of the given version
       and name could be found for the current platform.
     """
+    with temporary_dir() as tmpdir:
+      dest = os.path.join(tmpdir, name)
+      self._download(name, binary_path, dest, fetcher=fetcher)
+      with open(dest, 'rb') as fp:
+        yield lambda: fp.read()
+
+  def _download(self, name, binary_path, dest, fetcher=None):
+    """Downloads the binary at `binary_path` from the first of the baseurls that has it to `dest`.
 
+    Each url is downloaded to its own partial file next to `dest`; the partial file is kept when
+    the download is interrupted so that the next attempt can resume where this one left off.
+
+    :raises: :class:`pants.binary_util.BinaryUtil.BinaryNotFound` if no url could provide the
+      binary.
+    """
     if not self._baseurls:
       raise self.NoBaseUrlsError(
           'No urls are defined for the --pants-support-baseurls option.')
-    downloaded_successfully = False
-    accumulated_errors = []
-    for baseurl in OrderedSet(self._baseurls):  # Wrap in OrderedSet because duplicates are wasteful.
-      url = posixpath.join(baseurl, binary_path)
-      logger.info('Attempting to fetch {name} binary from: {url} ...'.format(name=name, url=url))
-      try:
-        with temporary_file() as dest:
-          fetcher = fetcher or Fetcher()
-          fetcher.download(url, listener=Fetcher.ProgressListener(), path_or_fd=dest)
-          logger.info('Fetched {name} binary from: {url} .'.format(name=name, url=url))
-          downloaded_successfully = True
-          dest.seek(0)
-          yield lambda: dest.read()
+    fetcher = fetcher or Fetcher()
+    # Wrap in OrderedSet because duplicates are wasteful.
+    urls = [posixpath.join(baseurl, binary_path) for baseurl in OrderedSet(self._baseurls)]
+    if self._hedge_delay_secs is None:
+      accumulated_errors = []
+      for url in urls:
+        try:
+          self._download_url(fetcher, name, url, dest)
           break
-      except (IOError, Fetcher.Error, ValueError) as e:
+        except (IOError, Fetcher.Error, ValueError) as e:
+          accumulated_errors.append('Failed to fetch binary from {url}: {error}'
+                                    .format(url=url, error=e))
+      else:
+        raise self.BinaryNotFound(binary_path, accumulated_errors)
+    else:
+      accumulated_errors = self._race(fetcher, name, urls, dest)
+      if accumulated_errors is not None:
+        raise self.BinaryNotFound(binary_path, accumulated_errors)
+    # Partial downloads from other urls are of no further use.
+    for url in urls:
+      Fetcher.delete_download(self._partial_path(dest, url))
+
+  @staticmethod
+  def _partial_path(dest, url):
+    return '{}.{}.part'.format(dest, hash_all([url])[:12])
+
+  def _race(self, fetcher, name, urls, dest):
+    """Downloads from each of the urls in turn, starting on the next whenever the current downloads
+    have not completed within the hedge delay.
+
+    :returns: `None` if a download succeeded, otherwise the list of errors encountered.
+    """
+    cancelled = threading.Event()
+    lock = threading.Lock()
+    results = queue.Queue()
+
+    def claim():
+      with lock:
+        if cancelled.is_set():
+          return False
+        cancelled.set()
+        return True
+
+    def download(url):
+      try:
+        self._download_url(fetcher, name, url, dest, cancelled=cancelled, claim=claim,
+                           progress=False)
+        results.put((url, None))
+      except BaseException as e:
+        results.put((url, e))
+
+    pending = list(urls)
+    threads = []
+    accumulated_errors = []
+    try:
+      while pending or len(accumulated_errors) < len(threads):
+        running = len(threads) - len(accumulated_errors)
+        if pending and running == 0:
+          timeout = 0
+        elif pending:
+          timeout = self._hedge_delay_secs
+        else:
+          # NB: A timeout keeps the wait interruptible.
+          timeout = 1000000000
+        try:
+          url, error = results.get(timeout=timeout) if timeout else results.get_nowait()
+        except queue.Empty:
+          url = pending.pop(0)
+          if threads:
+            logger.info('Hedging fetch of {name} binary with: {url} ...'.format(name=name, url=url))
+          thread = threading.Thread(target=download, args=(url,), name='fetch {}'.format(url))
+          thread.daemon = True
+          thread.start()
+          threads.append(thread)
+          continue
+        if error is None:
+          return None
         accumulated_errors.append('Failed to fetch binary from {url}: {error}'
-                                  .format(url=url, error=e))
-    if not downloaded_successfully:
-      raise self.BinaryNotFound(binary_path, accumulated_errors)
+                                  .format(url=url, error=error))
+      return accumulated_errors
+    finally:
+      cancelled.set()
+      for thread in threads:
+        thread.join()
+
+  def _download_url(self, fetcher, name, url, dest, cancelled=None, claim=None, progress=True):
+    partial = self._partial_path(dest, url)
+    logger.info('Attempting to fetch {name} binary from: {url} ...'.format(name=name, url=url))
+    listener = Fetcher.ProgressListener() if progress else None
+    if cancelled:
+      listener = self._CancelListener(cancelled).wrap(listener)
+    safe_mkdir_for(partial)
+    try:
+      fetcher.download(url, listener=listener, path_or_fd=partial, timeout_secs=self._timeout_secs,
+                       resume=True)
+      if claim and not claim():
+        raise self._Cancelled()
+      os.rename(partial, dest)
+      logger.info('Fetched {name} binary from: {url} .'.format(name=name, url=url))
+    except Fetcher.TransientError:
+      # Keep what was downloaded so far for the next attempt to resume from.
+      raise
+    except BaseException:
+      Fetcher.delete_download(partial)
+      raise
 
   def select_binary(self, supportdir, version, name):
     """Selects a binary matching the current os and architecture.
@@ -196,11 +318,9 @@ class BinaryUtil(object):
     if not os.path.exists(bootstrapped_binary_path):
       downloadpath = bootstrapped_binary_path + '~'
       try:
-        with self._select_binary_stream(name, binary_path) as stream:
-          with safe_open(downloadpath, 'wb') as bootstrapped_binary:
-            bootstrapped_binary.write(stream())
-          os.rename(downloadpath, bootstrapped_binary_path)
-          chmod_plus_x(bootstrapped_binary_path)
+        self._download(name, binary_path, downloadpath)
+        os.rename(downloadpath, bootstrapped_binary_path)
+        chmod_plus_x(bootstrapped_binary_path)
       finally:
         safe_delete(downloadpath)
 
@@ -133,8 +133,7 @@ class BuildFileAddressMapper(object):
     """
     if spec_path not in self._spec_path_to_address_map_map:
       try:
-        build_files = list(BuildFile.get_build_files_family(self._project_tree, spec_path,
-                                                            self._build_ignore_patterns))
+        build_files = self.build_files_in_spec_path(spec_path)
         if not build_files:
           raise self.BuildFileScanError("{spec_path} does not contain any BUILD files."
                                         .format(spec_path=os.path.join(self.root_dir, spec_path)))
@@ -147,6 +146,14 @@ class BuildFileAddressMapper(object):
       self._spec_path_to_address_map_map[spec_path] = address_map
     return self._spec_path_to_address_map_map[spec_path]
 
+  def build_files_in_spec_path(self, spec_path):
+    """Returns the family of BUILD files in a "directory" of the virtual address space.
+
+    :rtype: list of :class:`pants.base.build_file.BuildFile`
+    """
+    return list(BuildFile.get_build_files_family(self._project_tree, spec_path,
+                                                 self._build_ignore_patterns))
+
   def addresses_in_spec_path(self, spec_path):
     """Returns only the addresses gathered by `address_map_from_spec_path`, with no values."""
     return self._address_map_from_spec_path(spec_path).keys()
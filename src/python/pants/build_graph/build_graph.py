@@ -46,14 +46,27 @@ class BuildGraph(object):
 
   def __init__(self, address_mapper):
     self._address_mapper = address_mapper
+    self._generation = 0
     self.reset()
 
   @property
   def address_mapper(self):
     return self._address_mapper
 
+  @property
+  def generation(self):
+    """A counter that is bumped every time Targets or dependencies are added to the BuildGraph.
+
+    Callers that derive data from the shape of the graph can record the generation they computed
+    it at and safely reuse it for as long as the generation remains unchanged.
+
+    :rtype: int
+    """
+    return self._generation
+
   def reset(self):
     """Clear out the state of the BuildGraph, in particular Target mappings and dependencies."""
+    self._generation += 1
     self._addresses_already_closed = set()
     self._target_by_address = OrderedDict()
     self._target_dependencies_by_address = defaultdict(OrderedSet)
@@ -151,6 +164,7 @@ class BuildGraph(object):
       self.synthetic_addresses.add(address)
 
     self._target_by_address[address] = target
+    self._generation += 1
 
     for dependency_address in dependencies:
       self.inject_dependency(dependent=address, dependency=dependency_address)
@@ -191,6 +205,7 @@ class BuildGraph(object):
     else:
       self._target_dependencies_by_address[dependent].add(dependency)
       self._target_dependees_by_address[dependency].add(dependent)
+      self._generation += 1
 
   def targets(self, predicate=None):
     """Returns all the targets in the graph in no particular order.
@@ -342,6 +357,30 @@ class BuildGraph(object):
                        derived_from=derived_from,
                        synthetic=True)
 
+  def inject_synthetic_dependencies(self, derived_addresses):
+    """Wires synthetic Targets into the BuildGraph in the place of the Targets they derive from.
+
+    For each `(original, synthetic)` pair, in order, every dependent of `original` is made to depend
+    on `synthetic`, and `synthetic` is made to depend on every dependency of `original`.  The
+    transitive dependees of all affected Targets are then marked dirty in a single walk of the
+    graph, rather than one (largely overlapping) walk per pair.
+
+    :param list derived_addresses: A list of `(original, synthetic)` Address pairs, each naming an
+      already injected Target and a synthetic Target injected to represent it.
+    """
+    invalidation_roots = OrderedSet()
+    for original, synthetic in derived_addresses:
+      for dependent_address in self.dependents_of(original):
+        self.inject_dependency(dependent=dependent_address, dependency=synthetic)
+      for dependency_address in self.dependencies_of(original):
+        self.inject_dependency(dependent=synthetic, dependency=dependency_address)
+        invalidation_roots.add(dependency_address)
+
+    self.walk_transitive_dependee_graph(
+      invalidation_roots,
+      work=lambda t: t.mark_transitive_invalidation_hash_dirty(),
+    )
+
   def inject_address_closure(self, address):
     """Resolves, constructs and injects a Target and its transitive closure of dependencies.
 
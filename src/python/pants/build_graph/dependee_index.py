@@ -0,0 +1,150 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import logging
+import os
+from collections import defaultdict, deque
+from hashlib import sha1
+
+from pants.build_graph.address import Address
+from pants.util.dirutil import safe_concurrent_creation
+
+
+logger = logging.getLogger(__name__)
+
+
+class DependeeIndex(object):
+  """A persistent index of the dependees of every addressable target in the repo.
+
+  The forward dependency edges of each BUILD file family are recorded along with a digest of the
+  family's BUILD files and persisted between runs.  When the index is updated only the families
+  whose BUILD files were added or changed since the last run are parsed and injected into the
+  build graph, and dependee queries then walk just the affected portion of the reverse graph.
+  """
+
+  # Bump this when the persisted format changes to force a full re-index.
+  _VERSION = 1
+
+  @staticmethod
+  def index_file(pants_workdir):
+    """Returns the default location of the dependee index under the given pants workdir."""
+    return os.path.join(pants_workdir, 'build_graph', 'dependee_index.json')
+
+  def __init__(self, address_mapper, build_graph, index_file, spec_excludes=None):
+    """
+    :param address_mapper: The address mapper used to scan for and resolve BUILD file families.
+    :type address_mapper: :class:`pants.build_graph.build_file_address_mapper.BuildFileAddressMapper`
+    :param build_graph: The build graph stale BUILD file families are injected into.
+    :type build_graph: :class:`pants.build_graph.build_graph.BuildGraph`
+    :param string index_file: The path the index is persisted to.
+    :param list spec_excludes: Deprecated spec excludes to pass along when scanning for BUILD files.
+    """
+    self._address_mapper = address_mapper
+    self._build_graph = build_graph
+    self._index_file = index_file
+    self._spec_excludes = spec_excludes
+    self._dependees_by_spec = None
+
+  def _load(self):
+    try:
+      with open(self._index_file, 'rb') as fp:
+        index = json.load(fp)
+    except (IOError, ValueError) as e:
+      logger.debug('Re-indexing dependees, could not load {}: {}'.format(self._index_file, e))
+      return {}
+    if index.get('version') != self._VERSION:
+      return {}
+    return index['families']
+
+  def _store(self, families):
+    with safe_concurrent_creation(self._index_file) as tmp_path:
+      with open(tmp_path, 'wb') as fp:
+        json.dump({'version': self._VERSION, 'families': families}, fp)
+
+  @staticmethod
+  def _family_digest(build_files):
+    hasher = sha1()
+    for build_file in sorted(build_files, key=lambda build_file: build_file.relpath):
+      hasher.update(build_file.relpath.encode('utf-8'))
+      hasher.update(build_file.source())
+    return hasher.hexdigest()
+
+  def _family_dependencies(self, spec_path):
+    dependencies = {}
+    for address in self._address_mapper.addresses_in_spec_path(spec_path):
+      self._build_graph.inject_address_closure(address)
+      target = self._build_graph.get_target(address)
+      # NB: Edges are recorded between concrete targets only since synthetic targets do not appear
+      # in BUILD files and so cannot be invalidated by BUILD file changes.
+      dependency_specs = set(dependency.concrete_derived_from.address.spec
+                             for dependency in target.dependencies)
+      dependencies[address.spec] = sorted(dependency_specs)
+    return dependencies
+
+  def update(self):
+    """Brings the index up to date with the BUILD files currently present in the repo.
+
+    This is called lazily by the query methods and only needs to be called directly to force an
+    update.
+
+    :returns: The number of BUILD file families that had to be (re-)indexed.
+    :rtype: int
+    """
+    previous_families = self._load()
+
+    build_files_by_spec_path = defaultdict(list)
+    for build_file in self._address_mapper.scan_build_files(base_path=None,
+                                                            spec_excludes=self._spec_excludes):
+      build_files_by_spec_path[build_file.spec_path].append(build_file)
+
+    families = {}
+    reindexed = 0
+    for spec_path, build_files in build_files_by_spec_path.items():
+      digest = self._family_digest(build_files)
+      family = previous_families.get(spec_path)
+      if family is None or family['digest'] != digest:
+        family = {'digest': digest, 'dependencies': self._family_dependencies(spec_path)}
+        reindexed += 1
+      families[spec_path] = family
+
+    if reindexed or len(families) != len(previous_families):
+      self._store(families)
+
+    dependees_by_spec = defaultdict(set)
+    for family in families.values():
+      for spec, dependency_specs in family['dependencies'].items():
+        for dependency_spec in dependency_specs:
+          dependees_by_spec[dependency_spec].add(spec)
+    self._dependees_by_spec = dependees_by_spec
+
+    return reindexed
+
+  def dependees_of(self, addresses, transitive=False):
+    """Returns the addresses of the targets that depend on any of the given addresses.
+
+    The given addresses are only included in the result if they are themselves dependees of
+    another of the given addresses.
+
+    :param addresses: The addresses to find dependees of.
+    :type addresses: list of :class:`pants.build_graph.address.Address`
+    :param bool transitive: `True` to find transitive dependees, `False` for just direct dependees.
+    :rtype: set of :class:`pants.build_graph.address.Address`
+    """
+    if self._dependees_by_spec is None:
+      self.update()
+
+    dependee_specs = set()
+    to_walk = deque(address.spec for address in addresses)
+    while to_walk:
+      spec = to_walk.popleft()
+      for dependee_spec in self._dependees_by_spec.get(spec, ()):
+        if dependee_spec not in dependee_specs:
+          dependee_specs.add(dependee_spec)
+          if transitive:
+            to_walk.append(dependee_spec)
+    return set(Address.parse(spec) for spec in dependee_specs)
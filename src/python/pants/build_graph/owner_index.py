@@ -0,0 +1,268 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import logging
+import os
+from collections import defaultdict
+from hashlib import sha1
+
+from pants.build_graph.address import Address
+from pants.build_graph.address_lookup_error import AddressLookupError
+from pants.build_graph.source_mapper import SourceMapper
+from pants.source.payload_fields import DeferredSourcesField
+from pants.source.wrapped_globs import matches_filespec
+from pants.util.dirutil import safe_concurrent_creation
+
+
+logger = logging.getLogger(__name__)
+
+
+class OwnerIndex(SourceMapper):
+  """A persistent index of the targets that own each source file in the repo.
+
+  For each BUILD file family searched, the sources owned by each of its targets are recorded along
+  with the digests of the BUILD files they were derived from and the modification times of the
+  directories any `globs`, `rglobs` or `zglobs` were expanded in.  Families are only re-parsed and
+  injected into the build graph when one of these changes, so repeated owner lookups across runs
+  only pay for stat-ing directories and reading BUILD files.
+
+  Like the other source mappers the index searches the BUILD files adjacent to and in the parent
+  directories of each source.  In `match_filespecs` mode sources are matched against the globs the
+  owning target declared rather than the files those globs expanded to; this can map files that
+  no longer exist, like the `SpecSourceMapper`, and does not need to be invalidated by directory
+  changes.
+  """
+
+  # Bump this when the persisted format changes to force a full re-index.
+  _VERSION = 1
+
+  @staticmethod
+  def index_file(pants_workdir):
+    """Returns the default location of the owner index under the given pants workdir."""
+    return os.path.join(pants_workdir, 'build_graph', 'owner_index.json')
+
+  def __init__(self, address_mapper, build_graph, index_file, stop_after_match=False,
+               match_filespecs=False):
+    """
+    :param address_mapper: The address mapper used to find and resolve BUILD file families.
+    :type address_mapper: :class:`pants.build_graph.build_file_address_mapper.BuildFileAddressMapper`
+    :param build_graph: The build graph stale BUILD file families are injected into.
+    :type build_graph: :class:`pants.build_graph.build_graph.BuildGraph`
+    :param string index_file: The path the index is persisted to.
+    :param bool stop_after_match: If `True` a search will not traverse into parent directories once
+      an owner is identified.
+    :param bool match_filespecs: If `True` match sources against the globs of the owning targets
+      instead of the files those globs currently expand to.
+    """
+    self._address_mapper = address_mapper
+    self._build_graph = build_graph
+    self._index_file = index_file
+    self._stop_after_match = stop_after_match
+    self._match_filespecs = match_filespecs
+
+    self._families = None
+    self._dirty = False
+    self._validated_spec_paths = {}  # {spec_path: bool has_family}
+    self._owners_by_spec_path = {}  # {spec_path: {source: [spec]}}
+
+  @property
+  def _root_dir(self):
+    return self._address_mapper.root_dir
+
+  def _load(self):
+    try:
+      with open(self._index_file, 'rb') as fp:
+        index = json.load(fp)
+    except (IOError, ValueError) as e:
+      logger.debug('Re-indexing owners, could not load {}: {}'.format(self._index_file, e))
+      return {}
+    if index.get('version') != self._VERSION:
+      return {}
+    return index['families']
+
+  def _flush(self):
+    if self._dirty:
+      with safe_concurrent_creation(self._index_file) as tmp_path:
+        with open(tmp_path, 'wb') as fp:
+          json.dump({'version': self._VERSION, 'families': self._families}, fp)
+      self._dirty = False
+
+  def _digest(self, relpath):
+    try:
+      with open(os.path.join(self._root_dir, relpath), 'rb') as fp:
+        return sha1(fp.read()).hexdigest()
+    except IOError:
+      return None
+
+  def _mtime(self, relpath):
+    try:
+      return os.stat(os.path.join(self._root_dir, relpath)).st_mtime
+    except OSError:
+      return None
+
+  def _watched_dirs(self, filespec):
+    """Yields the directories whose listings the given filespec's globs depend on."""
+    for pattern in filespec.get('globs', []):
+      components = pattern.split(os.sep)
+      for index, component in enumerate(components):
+        if any(wildcard in component for wildcard in '*?['):
+          break
+      else:
+        # A literal source does not depend on any directory listing.
+        continue
+
+      static_dir = os.path.join(*components[:index]) if index else ''
+      yield static_dir
+      if index < len(components) - 1:
+        # A wildcard in a directory component, including `**`, depends on the listing of every
+        # directory below the static prefix.
+        for root, dirs, _ in os.walk(os.path.join(self._root_dir, static_dir), followlinks=True):
+          for d in dirs:
+            yield os.path.relpath(os.path.join(root, d), self._root_dir)
+
+  def _is_valid(self, family, build_files):
+    if sorted(build_file.relpath for build_file in build_files) != family['family']:
+      return False
+    for relpath, digest in family['build_files'].items():
+      if self._digest(relpath) != digest:
+        return False
+    if not self._match_filespecs:
+      for relpath, mtime in family['dirs'].items():
+        if self._mtime(relpath) != mtime:
+          return False
+    return True
+
+  def _index_family(self, spec_path, build_files):
+    build_file_relpaths = set(build_file.relpath for build_file in build_files)
+    watched_dirs = set()
+    targets = {}
+
+    for address in self._address_mapper.addresses_in_spec_path(spec_path):
+      self._build_graph.inject_address_closure(address)
+      target = self._build_graph.get_target(address)
+
+      sources = []
+      filespecs = []
+      sources_field = target.payload.get_field('sources')
+      if sources_field and not isinstance(sources_field, DeferredSourcesField):
+        sources.extend(target.sources_relative_to_buildroot())
+        if sources_field.filespec:
+          filespecs.append(sources_field.filespec)
+
+      resource_sources = []
+      if target.has_resources:
+        for resource in target.resources:
+          resource_sources.extend(resource.sources_relative_to_buildroot())
+          if resource.payload.sources.filespec:
+            filespecs.append(resource.payload.sources.filespec)
+          if not resource.is_synthetic:
+            build_file_relpaths.add(resource.address.build_file.relpath)
+
+      for filespec in filespecs:
+        watched_dirs.update(self._watched_dirs(filespec))
+
+      targets[address.spec] = {
+        'build_file': address.build_file.relpath,
+        'sources': sources,
+        'resource_sources': resource_sources,
+        'filespecs': filespecs,
+      }
+
+    return {
+      'family': sorted(build_file.relpath for build_file in build_files),
+      'build_files': {relpath: self._digest(relpath) for relpath in build_file_relpaths},
+      'dirs': {relpath: self._mtime(relpath) for relpath in watched_dirs},
+      'targets': targets,
+    }
+
+  def _family(self, spec_path):
+    """Returns the up to date index entry for the BUILD file family at `spec_path`, if any."""
+    if self._families is None:
+      self._families = self._load()
+
+    if spec_path not in self._validated_spec_paths:
+      build_files = self._address_mapper.build_files_in_spec_path(spec_path)
+      family = self._families.get(spec_path)
+      if not build_files:
+        if family is not None:
+          del self._families[spec_path]
+          self._dirty = True
+      elif family is None or not self._is_valid(family, build_files):
+        self._families[spec_path] = self._index_family(spec_path, build_files)
+        self._dirty = True
+      self._validated_spec_paths[spec_path] = bool(build_files)
+
+    if self._validated_spec_paths[spec_path]:
+      return self._families[spec_path]
+    return None
+
+  def _owners_in_spec_path(self, spec_path, source):
+    family = self._family(spec_path)
+    if family is None:
+      return []
+
+    if self._match_filespecs:
+      return [spec for spec, target in family['targets'].items()
+              if target['build_file'] == source or
+              any(matches_filespec(source, filespec) for filespec in target['filespecs'])]
+
+    if spec_path not in self._owners_by_spec_path:
+      owners = defaultdict(list)
+      for spec, target in family['targets'].items():
+        owners[target['build_file']].append(spec)
+        for owned in set(target['sources'] + target['resource_sources']):
+          owners[owned].append(spec)
+      self._owners_by_spec_path[spec_path] = owners
+    return self._owners_by_spec_path[spec_path].get(source, [])
+
+  def target_addresses_for_sources(self, sources):
+    owner_specs_by_source = {}
+    try:
+      for source in sources:
+        if source in owner_specs_by_source:
+          continue
+        owner_specs = set()
+        path = source
+        # a top-level source has empty dirname, so do/while instead of straight while loop.
+        while path:
+          path = os.path.dirname(path)
+          try:
+            owner_specs.update(self._owners_in_spec_path(path, source))
+          except AddressLookupError:
+            pass
+          if self._stop_after_match and owner_specs:
+            break
+        owner_specs_by_source[source] = owner_specs
+    finally:
+      self._flush()
+
+    return {source: set(Address.parse(spec) for spec in owner_specs)
+            for source, owner_specs in owner_specs_by_source.items()}
+
+  def target_addresses_for_source(self, source):
+    return self.target_addresses_for_sources([source])[source]
+
+  def sources_in_spec_paths(self, spec_paths):
+    """Returns the sources owned by each target in the BUILD file families at `spec_paths`.
+
+    Only the sources of the targets themselves are returned, not the sources of their resources
+    or the BUILD files that define them.
+
+    :param spec_paths: The spec paths of the BUILD file families to look up.
+    :rtype: dict of :class:`pants.build_graph.address.Address` to list of strings.
+    """
+    sources_by_address = {}
+    try:
+      for spec_path in spec_paths:
+        family = self._family(spec_path)
+        if family is not None:
+          for spec, target in family['targets'].items():
+            sources_by_address[Address.parse(spec)] = target['sources']
+    finally:
+      self._flush()
+    return sources_by_address
@@ -18,6 +18,16 @@ class SourceMapper(object):
   def target_addresses_for_source(self, source):
     raise NotImplementedError
 
+  def target_addresses_for_sources(self, sources):
+    """Maps each of the given sources to the addresses of the targets that own it.
+
+    Subclasses may override this to share work across a bulk lookup.
+
+    :param sources: The sources to look up.
+    :rtype: dict of string to iterable of :class:`pants.build_graph.address.Address`
+    """
+    return {source: self.target_addresses_for_source(source) for source in sources}
+
 
 class SpecSourceMapper(SourceMapper):
   """
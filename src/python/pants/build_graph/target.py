@@ -23,7 +23,7 @@ from pants.option.custom_types import dict_option
 from pants.source.payload_fields import DeferredSourcesField, SourcesField
 from pants.source.wrapped_globs import FilesetWithSpec
 from pants.subsystem.subsystem import Subsystem
-from pants.util.memo import memoized_property
+from pants.util.memo import memoized_property, weak_per_instance
 
 
 logger = logging.getLogger(__name__)
@@ -179,7 +179,7 @@ class Target(AbstractTarget):
         return target_cls
     return ConcreteTargetAddressable
 
-  @memoized_property
+  @memoized_property(key_factory=weak_per_instance)
   def target_base(self):
     """:returns: the source root path for this target."""
     source_root = self._sources_field.source_root
@@ -460,7 +460,7 @@ class Target(AbstractTarget):
     """Returns ``True`` if this target is derived from no other."""
     return self.derived_from == self
 
-  @memoized_property
+  @memoized_property(key_factory=weak_per_instance)
   def id(self):
     """A unique and unix safe identifier for the Target.
     Since other classes use this id to generate new file names and unix system has 255 character
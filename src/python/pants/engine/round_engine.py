@@ -11,6 +11,7 @@ from collections import OrderedDict, namedtuple
 from twitter.common.collections.orderedset import OrderedSet
 
 from pants.base.exceptions import TaskError
+from pants.base.worker_pool import Work, WorkerPool
 from pants.base.workunit import WorkUnit, WorkUnitLabel
 from pants.engine.engine import Engine
 from pants.engine.round_manager import RoundManager
@@ -21,13 +22,20 @@ class GoalExecutor(object):
   :API: public
   """
 
-  def __init__(self, context, goal, tasktypes_by_name):
+  def __init__(self, context, goal, tasktypes_by_name, required_products_by_name=None):
     """
     :API: public
+
+    :param context: The pants run context.
+    :param goal: The goal to execute.
+    :param tasktypes_by_name: The goal's task types, keyed by name, in reverse installed order.
+    :param required_products_by_name: The product types each task requires, keyed by task name;
+                                      tasks without an entry are assumed to require none.
     """
     self._context = context
     self._goal = goal
     self._tasktypes_by_name = tasktypes_by_name
+    self._required_products_by_name = required_products_by_name or {}
 
   @property
   def goal(self):
@@ -44,18 +52,25 @@ class GoalExecutor(object):
     :param bool explain: If ``True`` then the goal plan will be explained instead of being
                          executed.
     """
-    goal_workdir = os.path.join(self._context.options.for_global_scope().pants_workdir,
-                                self._goal.name)
-    with self._context.new_workunit(name=self._goal.name, labels=[WorkUnitLabel.GOAL]):
-      for name, task_type in reversed(self._tasktypes_by_name.items()):
-        task_workdir = os.path.join(goal_workdir, name)
-        task = task_type(self._context, task_workdir)
-        log_config = WorkUnit.LogConfig(level=task.get_options().level, colors=task.get_options().colors)
-        with self._context.new_workunit(name=name, labels=[WorkUnitLabel.TASK], log_config=log_config):
-          if explain:
-            self._context.log.debug('Skipping execution of {} in explain mode'.format(name))
+    worker_count = self._context.options.for_global_scope().task_worker_count
+    with self._context.new_workunit(name=self._goal.name,
+                                    labels=[WorkUnitLabel.GOAL]) as goal_workunit:
+      if explain or worker_count <= 1:
+        for name in reversed(self._tasktypes_by_name.keys()):
+          self._execute_task(name, self._create_task(name), explain)
+      else:
+        for wave in self._schedule():
+          # Tasks are constructed in installed order on this thread; only execution is concurrent.
+          tasks = [(name, self._create_task(name), explain) for name in wave]
+          if len(tasks) == 1:
+            self._execute_task(*tasks[0])
           else:
-            task.execute()
+            pool = WorkerPool(goal_workunit, self._context.run_tracker,
+                              min(worker_count, len(tasks)))
+            try:
+              pool.submit_work_and_wait(Work(self._execute_task, tasks))
+            finally:
+              pool.shutdown()
 
       if explain:
         reversed_tasktypes_by_name = reversed(self._tasktypes_by_name.items())
@@ -63,6 +78,65 @@ class GoalExecutor(object):
             '{}->{}'.format(name, task_type.__name__) for name, task_type in reversed_tasktypes_by_name)
         print('{goal} [{goal_to_task}]'.format(goal=self._goal.name, goal_to_task=goal_to_task))
 
+  def _create_task(self, name):
+    goal_workdir = os.path.join(self._context.options.for_global_scope().pants_workdir,
+                                self._goal.name)
+    task_workdir = os.path.join(goal_workdir, name)
+    return self._tasktypes_by_name[name](self._context, task_workdir)
+
+  def _execute_task(self, name, task, explain):
+    log_config = WorkUnit.LogConfig(level=task.get_options().level,
+                                    colors=task.get_options().colors)
+    with self._context.new_workunit(name=name, labels=[WorkUnitLabel.TASK], log_config=log_config):
+      if explain:
+        self._context.log.debug('Skipping execution of {} in explain mode'.format(name))
+      else:
+        task.execute()
+
+  def _is_barrier(self, name):
+    # A task explicitly ordered relative to others, or one that neither produces nor requires any
+    # products, may depend on side-effects of the tasks installed around it that the product graph
+    # cannot see, so it must run alone in installed order.
+    if self._goal.is_explicitly_ordered(name):
+      return True
+    return not (self._tasktypes_by_name[name].product_types() or
+                self._required_products_by_name.get(name))
+
+  def _conflicts(self, name1, name2):
+    if self._is_barrier(name1) or self._is_barrier(name2):
+      return True
+    produced1 = set(self._tasktypes_by_name[name1].product_types())
+    produced2 = set(self._tasktypes_by_name[name2].product_types())
+    required1 = self._required_products_by_name.get(name1, frozenset())
+    required2 = self._required_products_by_name.get(name2, frozenset())
+    return bool(produced1 & produced2 or produced1 & required2 or produced2 & required1)
+
+  def _schedule(self):
+    """Groups the goal's tasks into waves of tasks that may be executed concurrently.
+
+    A task is placed in the wave after the latest wave holding a task installed before it that it
+    conflicts with, ie: that produces a product the other requires or that produces a product in
+    common with it.  Tasks installed with `first`, `before` or `after`, and tasks that neither
+    produce nor require products, conflict with every other task and so run in a wave of their
+    own, after every task installed before them and before every task installed after them.
+    Tasks within a wave are listed in installed order.
+
+    :returns: A list of waves, each a list of task names.
+    """
+    names = list(reversed(self._tasktypes_by_name.keys()))
+    wave_by_name = {}
+    waves = []
+    for index, name in enumerate(names):
+      wave = 0
+      for earlier in names[:index]:
+        if self._conflicts(earlier, name):
+          wave = max(wave, wave_by_name[earlier] + 1)
+      wave_by_name[name] = wave
+      if wave == len(waves):
+        waves.append([])
+      waves[wave].append(name)
+    return waves
+
 
 class RoundEngine(Engine):
   """
@@ -82,7 +156,8 @@ class RoundEngine(Engine):
   class MissingProductError(DependencyError):
     """Indicates an expressed data dependency if not provided by any installed task."""
 
-  GoalInfo = namedtuple('GoalInfo', ['goal', 'tasktypes_by_name', 'goal_dependencies'])
+  GoalInfo = namedtuple('GoalInfo', ['goal', 'tasktypes_by_name', 'goal_dependencies',
+                                     'required_products_by_name'])
 
   def _topological_sort(self, goal_info_by_goal):
     dependees_by_goal = OrderedDict()
@@ -147,6 +222,7 @@ class RoundEngine(Engine):
       return
 
     tasktypes_by_name = OrderedDict()
+    required_products_by_name = {}
     goal_dependencies = set()
     visited_task_types = set()
     for task_name in reversed(goal.ordered_task_names()):
@@ -161,6 +237,7 @@ class RoundEngine(Engine):
 
       round_manager = RoundManager(context)
       task_type._prepare(context.options, round_manager)
+      required_products_by_name[task_name] = round_manager.required_product_types
       try:
         dependencies = round_manager.get_dependencies()
         for producer_info in dependencies:
@@ -193,7 +270,8 @@ class RoundEngine(Engine):
             "Could not satisfy data dependencies for goal '{name}' with action {action}: {error}"
             .format(name=task_name, action=task_type.__name__, error=e))
 
-    goal_info = self.GoalInfo(goal, tasktypes_by_name, goal_dependencies)
+    goal_info = self.GoalInfo(goal, tasktypes_by_name, goal_dependencies,
+                              required_products_by_name)
     goal_info_by_goal[goal] = goal_info
 
     for goal_dependency in goal_dependencies:
@@ -210,7 +288,8 @@ class RoundEngine(Engine):
     target_roots_replacement.apply(context)
 
     for goal_info in reversed(list(self._topological_sort(goal_info_by_goal))):
-      yield GoalExecutor(context, goal_info.goal, goal_info.tasktypes_by_name)
+      yield GoalExecutor(context, goal_info.goal, goal_info.tasktypes_by_name,
+                         required_products_by_name=goal_info.required_products_by_name)
 
   def attempt(self, context, goals):
     """
@@ -56,6 +56,16 @@ class RoundManager(object):
     self._dependencies.add(product_type)
     self._context.products.require_data(product_type)
 
+  @property
+  def required_product_types(self):
+    """Returns the product types required so far via `require` or `require_data`.
+
+    :API: public
+
+    :rtype: frozenset
+    """
+    return frozenset(self._dependencies)
+
   def get_dependencies(self):
     """Returns the set of data dependencies as producer infos corresponding to data requirements.
 
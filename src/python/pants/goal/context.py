@@ -274,6 +274,7 @@ class Context(object):
     # only 1 remaining known use case in the Foursquare codebase that will be able to go away with
     # the post RoundEngine engine - kill the method at that time.
     self._target_roots = list(target_roots)
+    self._targets_cache = {}
 
   def add_new_target(self, address, target_type, target_base=None, dependencies=None,
                      derived_from=None, **kwargs):
@@ -318,6 +319,16 @@ class Context(object):
                           `False` or preorder by default.
     :returns: A list of matching targets.
     """
+    return filter(predicate, self._unfiltered_targets(postorder=postorder))
+
+  def _unfiltered_targets(self, postorder=False):
+    # The selection is re-used across calls until the build graph is mutated or the target roots
+    # are replaced; the latter resets the cache wholesale.
+    generation = self.build_graph.generation
+    cached = self._targets_cache.get(postorder)
+    if cached is not None and cached[0] == generation:
+      return cached[1]
+
     target_set = self._collect_targets(self.target_roots, postorder=postorder)
 
     synthetics = OrderedSet()
@@ -329,7 +340,9 @@ class Context(object):
 
     target_set.update(synthetic_set)
 
-    return filter(predicate, target_set)
+    targets = list(target_set)
+    self._targets_cache[postorder] = (generation, targets)
+    return targets
 
   def _collect_targets(self, root_targets, postorder=False):
     addresses = [target.address for target in root_targets]
@@ -96,6 +96,7 @@ class _Goal(object):
     self.serialize = False
     self._task_type_by_name = {}  # name -> Task subclass.
     self._ordered_task_names = []  # The task names, in the order imposed by registration.
+    self._explicitly_ordered_task_names = set()  # Names installed with first, before or after.
 
   @property
   def description(self):
@@ -155,6 +156,11 @@ class _Goal(object):
         tt.options_scope = None
       del otn[:]
       self._task_type_by_name = {}
+      self._explicitly_ordered_task_names.clear()
+    if first or before or after:
+      self._explicitly_ordered_task_names.add(task_name)
+    else:
+      self._explicitly_ordered_task_names.discard(task_name)
     if first:
       otn.insert(0, task_name)
     elif before in otn:
@@ -183,6 +189,7 @@ class _Goal(object):
       self._task_type_by_name[name].options_scope = None
       del self._task_type_by_name[name]
       self._ordered_task_names = [x for x in self._ordered_task_names if x != name]
+      self._explicitly_ordered_task_names.discard(name)
     else:
       raise GoalError('Cannot uninstall unknown task: {0}'.format(name))
 
@@ -206,6 +213,10 @@ class _Goal(object):
     """The task names in this goal, in registration order."""
     return self._ordered_task_names
 
+  def is_explicitly_ordered(self, name):
+    """Returns True if the named task was installed with first, before or after."""
+    return name in self._explicitly_ordered_task_names
+
   def task_type_by_name(self, name):
     """The task type registered under the given name."""
     return self._task_type_by_name[name]
@@ -26,6 +26,7 @@ from pants.reporting.report import Report
 from pants.stats.statsdb import StatsDBFactory
 from pants.subsystem.subsystem import Subsystem
 from pants.util.dirutil import relative_symlink, safe_file_dump
+from pants.util.memo import memo_stats
 
 
 class RunTracker(Subsystem):
@@ -310,6 +311,7 @@ class RunTracker(Subsystem):
       'cumulative_timings': self.cumulative_timings.get_all(),
       'self_timings': self.self_timings.get_all(),
       'artifact_cache_stats': self.artifact_cache_stats.get_all(),
+      'memo_stats': memo_stats(),
       'outcomes': self.outcomes
     }
     # Dump individual stat file.
@@ -15,7 +15,7 @@ from contextlib import closing, contextmanager
 import requests
 import six
 
-from pants.util.dirutil import safe_open
+from pants.util.dirutil import safe_delete, safe_file_dump, safe_open
 
 
 class Fetcher(object):
@@ -199,13 +199,22 @@ class Fetcher(object):
     """
     self._requests = requests_api or requests
 
-  def fetch(self, url, listener, chunk_size_bytes=None, timeout_secs=None):
+  def fetch(self, url, listener, chunk_size_bytes=None, timeout_secs=None, offset=None,
+            validator=None, on_validator=None):
     """Fetches data from the given URL notifying listener of all lifecycle events.
 
     :param string url: the url to GET data from
     :param listener: the listener to notify of all download lifecycle events
     :param chunk_size_bytes: the chunk size to use for buffering data, 10 KB by default
     :param timeout_secs: the maximum time to wait for data to be available, 1 second by default
+    :param int offset: an optional byte offset to fetch data from; if the server honors the range
+                       request the listener is notified of a 206 (partial content) status and
+                       receives only the data from the offset on, otherwise it is notified of a
+                       200 status and receives all the data.
+    :param string validator: the validator of the content the data before `offset` came from; the
+                             range is only honored if the content is unchanged since.
+    :param on_validator: an optional function called, before any data is received, with the
+                         validator of the response content or else `None` if it has none.
     :raises: Fetcher.Error if there was a problem fetching all data from the given url
     """
     chunk_size_bytes = chunk_size_bytes or 10 * 1024
@@ -214,10 +223,18 @@ class Fetcher(object):
     if not isinstance(listener, self.Listener):
       raise ValueError('listener must be a Listener instance, given {}'.format(listener))
 
+    kwargs = {}
+    ok_codes = (requests.codes.ok,)
+    if offset:
+      kwargs['headers'] = {'Range': 'bytes={}-'.format(offset)}
+      if validator:
+        kwargs['headers']['If-Range'] = validator
+      ok_codes += (requests.codes.partial_content,)
+
     try:
       with closing(self._requests.get(url, stream=True, timeout=timeout_secs,
-                                      allow_redirects=True)) as resp:
-        if resp.status_code != requests.codes.ok:
+                                      allow_redirects=True, **kwargs)) as resp:
+        if resp.status_code not in ok_codes:
           listener.status(resp.status_code)
           raise self.PermanentError('GET request to {} failed with status code {}'
                                     .format(url, resp.status_code),
@@ -225,6 +242,8 @@ class Fetcher(object):
 
         size = resp.headers.get('content-length')
         listener.status(resp.status_code, content_length=int(size) if size else None)
+        if on_validator:
+          on_validator(self._validator(resp.headers))
 
         read_bytes = 0
         for data in resp.iter_content(chunk_size=chunk_size_bytes):
@@ -238,7 +257,29 @@ class Fetcher(object):
                            else self.PermanentError)
       raise exception_factory('Problem GETing data from {}: {}'.format(url, e))
 
-  def download(self, url, listener=None, path_or_fd=None, chunk_size_bytes=None, timeout_secs=None):
+  @staticmethod
+  def _validator(headers):
+    # Only a strong ETag may be used in an If-Range header.
+    etag = headers.get('etag')
+    if etag and not etag.startswith('W/'):
+      return etag
+    return headers.get('last-modified')
+
+  @staticmethod
+  def _validator_path(path):
+    return '{}.validator'.format(path)
+
+  @classmethod
+  def delete_download(cls, path):
+    """Deletes the file at `path` along with any record kept to resume downloading it.
+
+    :param string path: the path of a file passed to `download`
+    """
+    safe_delete(path)
+    safe_delete(cls._validator_path(path))
+
+  def download(self, url, listener=None, path_or_fd=None, chunk_size_bytes=None, timeout_secs=None,
+               resume=False):
     """Downloads data from the given URL.
 
     By default data is downloaded to a temporary file.
@@ -248,9 +289,24 @@ class Fetcher(object):
     :param path_or_fd: an optional file path or open file descriptor to write data to
     :param chunk_size_bytes: the chunk size to use for buffering data
     :param timeout_secs: the maximum time to wait for data to be available
+    :param bool resume: `True` to resume a previously interrupted download to the file path given
+                        by `path_or_fd` using an HTTP range request; the download starts over if
+                        the server does not support range requests, if the content has changed
+                        since the interrupted download started or if the server gave no validator
+                        (ETag or Last-Modified date) to tell.
     :returns: the path to the file data was downloaded to.
     :raises: Fetcher.Error if there was a problem downloading all data from the given url.
     """
+    offset = 0
+    validator = None
+    validator_path = None
+    if resume and isinstance(path_or_fd, six.string_types):
+      validator_path = self._validator_path(path_or_fd)
+      if os.path.isfile(path_or_fd) and os.path.isfile(validator_path):
+        offset = os.path.getsize(path_or_fd)
+        with open(validator_path, 'rb') as fp:
+          validator = fp.read().decode('utf-8')
+
     @contextmanager
     def download_fp(_path_or_fd):
       if _path_or_fd and not isinstance(_path_or_fd, six.string_types):
@@ -259,10 +315,50 @@ class Fetcher(object):
         if not _path_or_fd:
           fd, _path_or_fd = tempfile.mkstemp()
           os.close(fd)
-        with safe_open(_path_or_fd, 'w') as fp:
+        with safe_open(_path_or_fd, 'a' if offset else 'w') as fp:
           yield fp, _path_or_fd
 
     with download_fp(path_or_fd) as (fp, path):
-      listener = self.DownloadListener(fp).wrap(listener)
-      self.fetch(url, listener, chunk_size_bytes=chunk_size_bytes, timeout_secs=timeout_secs)
+      download_listener = self.DownloadListener(fp)
+      on_validator = None
+      if validator_path:
+        download_listener = self._ResumeListener(fp, validator_path, download_listener)
+        on_validator = download_listener.record_validator
+      listener = download_listener.wrap(listener)
+      self.fetch(url, listener, chunk_size_bytes=chunk_size_bytes, timeout_secs=timeout_secs,
+                 offset=offset, validator=validator, on_validator=on_validator)
       return path
+
+  class _ResumeListener(Listener):
+    """Records the validator a resumable download started from, and discards partially
+    downloaded data when the server does not honor a range request.
+    """
+
+    def __init__(self, fh, validator_path, listener):
+      self._fh = fh
+      self._validator_path = validator_path
+      self._listener = listener
+      self._restarted = False
+
+    def status(self, code, content_length=None):
+      self._restarted = code == requests.codes.ok
+      if self._restarted:
+        self._fh.seek(0)
+        self._fh.truncate()
+      self._listener.status(code, content_length=content_length)
+
+    def record_validator(self, validator):
+      if not self._restarted:
+        return
+      if validator:
+        safe_file_dump(self._validator_path, validator.encode('utf-8'))
+      else:
+        # Without a validator an interrupted download cannot safely be resumed.
+        safe_delete(self._validator_path)
+
+    def recv_chunk(self, data):
+      self._listener.recv_chunk(data)
+
+    def finished(self):
+      safe_delete(self._validator_path)
+      self._listener.finished()
@@ -149,6 +149,12 @@ class GlobalOptionsRegistrar(Optionable):
                   'to process the non-erroneous subset of the input.')
     register('--cache-key-gen-version', advanced=True, default='200', recursive=True,
              help='The cache key generation. Bump this to invalidate every artifact for a scope.')
+    register('--task-worker-count', advanced=True, type=int, default=1,
+             help='The maximum number of tasks within a goal to execute concurrently. Tasks only '
+                  'execute concurrently when neither requires a product the other produces and '
+                  'they produce no products in common. Tasks installed first, before or after '
+                  'another task, and tasks that neither produce nor require products, always '
+                  'execute alone.')
     register('--max-subprocess-args', advanced=True, type=int, default=100, recursive=True,
              help='Used to limit the number of arguments passed to some subprocesses by breaking '
              'the command up into multiple invocations')
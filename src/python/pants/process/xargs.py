@@ -6,7 +6,9 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import errno
+import os
 import subprocess
+from multiprocessing.pool import ThreadPool
 
 
 class Xargs(object):
@@ -17,41 +19,123 @@ class Xargs(object):
   chunk in turn.
   """
 
+  # The POSIX minimum for ARG_MAX, used when the system does not report its own.
+  _DEFAULT_ARG_MAX = 4096
+
+  # Like xargs, leave some headroom for the exec machinery rather than relying on an exact count.
+  _HEADROOM = 2048
+
+  # Each argument and environment entry costs a pointer in the exec'd process' argv or envp.
+  _POINTER_SIZE = 8
+
+  @classmethod
+  def _arg_max(cls):
+    try:
+      arg_max = os.sysconf(str('SC_ARG_MAX'))
+    except (AttributeError, ValueError, OSError):
+      arg_max = -1
+    return arg_max if arg_max > 0 else cls._DEFAULT_ARG_MAX
+
+  @classmethod
+  def _args_size(cls, args):
+    return sum(len(arg) + 1 + cls._POINTER_SIZE for arg in args)
+
   @classmethod
-  def subprocess(cls, cmd, **kwargs):
+  def max_args_size(cls, cmd=(), env=None):
+    """Returns the number of bytes of arguments that can safely be appended to a command line.
+
+    :param list cmd: The command line arguments will be appended to.
+    :param dict env: The environment the command will execute in; `os.environ` by default.
+    :rtype: int
+    """
+    env = os.environ if env is None else env
+    env_size = cls._args_size('{}={}'.format(key, value) for key, value in env.items())
+    return cls._arg_max() - env_size - cls._args_size(cmd) - cls._HEADROOM
+
+  @classmethod
+  def subprocess(cls, cmd, worker_count=1, **kwargs):
     """Creates an xargs engine that uses subprocess.call to execute the given cmd array with extra
     arg chunks.
     """
     def call(args):
       return subprocess.call(cmd + args, **kwargs)
-    return cls(call)
+    return cls(call,
+               max_args_size=cls.max_args_size(cmd, env=kwargs.get('env')),
+               worker_count=worker_count)
 
-  def __init__(self, cmd):
+  def __init__(self, cmd, max_args_size=None, worker_count=1):
     """Creates an xargs engine that calls cmd with argument chunks.
 
     :param cmd: A function that can execute a command line in the form of a list of strings
       passed as its sole argument.
+    :param int max_args_size: The number of bytes of arguments to pass to cmd in a single chunk;
+      by default computed from the system ARG_MAX and the size of the current environment.  Chunks
+      that still turn out to be too big are split further.
+    :param int worker_count: The maximum number of chunks to execute concurrently.  Only pass more
+      than 1 when cmd is safe to call concurrently against independent chunks.
     """
     self._cmd = cmd
+    self._max_args_size = self.max_args_size() if max_args_size is None else max_args_size
+    self._worker_count = max(1, worker_count)
 
   def _split_args(self, args):
     half = len(args) // 2
     return args[:half], args[half:]
 
+  def _chunk_args(self, args):
+    chunks = []
+    chunk = []
+    chunk_size = 0
+    for arg in args:
+      arg_size = self._args_size([arg])
+      if chunk and chunk_size + arg_size > self._max_args_size:
+        chunks.append(chunk)
+        chunk = []
+        chunk_size = 0
+      chunk.append(arg)
+      chunk_size += arg_size
+    chunks.append(chunk)
+    return chunks
+
+  def _execute_chunk(self, args):
+    try:
+      return self._cmd(args)
+    except OSError as e:
+      if errno.E2BIG == e.errno and len(args) > 1:
+        args1, args2 = self._split_args(args)
+        result = self._execute_chunk(args1)
+        if result != 0:
+          return result
+        return self._execute_chunk(args2)
+      else:
+        raise e
+
   def execute(self, args):
     """Executes the configured cmd passing args in one or more rounds xargs style.
 
+    When executing chunks concurrently all chunks are executed and the result is that of the first
+    chunk, in argument order, to fail; otherwise execution stops at the first failing chunk.
+
     :param list args: Extra arguments to pass to cmd.
     """
-    all_args = list(args)
+    chunks = self._chunk_args(list(args))
+    worker_count = min(self._worker_count, len(chunks))
+    if worker_count == 1:
+      for chunk in chunks:
+        result = self._execute_chunk(chunk)
+        if result != 0:
+          return result
+      return 0
+
+    pool = ThreadPool(processes=worker_count)
     try:
-      return self._cmd(all_args)
-    except OSError as e:
-      if errno.E2BIG == e.errno:
-        args1, args2 = self._split_args(all_args)
-        result = self.execute(args1)
+      async_results = [pool.apply_async(self._execute_chunk, (chunk,)) for chunk in chunks]
+      for async_result in async_results:
+        # NB: A timeout keeps the wait interruptible.
+        result = async_result.get(timeout=1000000000)
         if result != 0:
           return result
-        return self.execute(args2)
-      else:
-        raise e
+      return 0
+    finally:
+      pool.close()
+      pool.join()
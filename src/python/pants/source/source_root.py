@@ -5,12 +5,15 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import copy
+import json
 import os
 from collections import namedtuple
 
 from six.moves import range
 
 from pants.base.build_environment import get_buildroot
+from pants.base.hash_utils import hash_all
 from pants.option.custom_types import dict_option, list_option
 from pants.subsystem.subsystem import Subsystem
 from pants.util.memo import memoized_method
@@ -30,7 +33,11 @@ class SourceRoots(object):
     Non-test code should not instantiate directly. See SourceRootConfig.get_source_roots().
     """
     self._trie = source_root_config.create_trie()
+    # The trie is shared with other SourceRoots created from the same options, so we copy it before
+    # adding to it.
+    self._owns_trie = False
     self._options = source_root_config.get_options()
+    self._roots_by_path = {}
 
   def add_source_root(self, path, langs=tuple()):
     """Add the specified fixed source root.
@@ -41,7 +48,11 @@ class SourceRoots(object):
     """
     if os.path.isabs(path):
       path = os.path.relpath(path, get_buildroot())
+    if not self._owns_trie:
+      self._trie = copy.deepcopy(self._trie)
+      self._owns_trie = True
     self._trie.add_fixed(path, langs)
+    self._roots_by_path.clear()
 
   def find(self, target):
     """Find the source root for the given target, or None.
@@ -60,7 +71,9 @@ class SourceRoots(object):
     """
     if os.path.isabs(path):
       path = os.path.relpath(path, get_buildroot())
-    matched = self._trie.find(path)
+    matched = self._roots_by_path.get(path, self)
+    if matched is self:
+      matched = self._roots_by_path[path] = self._trie.find(path)
     if matched:
       return matched
     elif self._options.unmatched == 'fail':
@@ -70,6 +83,21 @@ class SourceRoots(object):
       # TODO: Remove this logic. It should be an error to have no matching source root.
       return SourceRoot(path, [])
 
+  def find_many(self, paths):
+    """Find the source roots for the given paths.
+
+    Prefer this to calling `find_by_path` for each path when looking up many paths at once, eg:
+    the sources of all the targets in a build graph.
+
+    :param paths: The paths to find source roots for.
+    :return: A list holding the SourceRoot (or None) for each path, in the order given.
+    """
+    roots_by_path = {}
+    for path in paths:
+      if path not in roots_by_path:
+        roots_by_path[path] = self.find_by_path(path)
+    return [roots_by_path[path] for path in paths]
+
   def all_roots(self):
     """Return all known source roots.
 
@@ -196,13 +224,32 @@ class SourceRootConfig(Subsystem):
              help='A map of test roots to list of languages.  Useful when you want to enumerate '
                   'fixed test roots explicitly, instead of relying on patterns.')
 
+  # Tries of source root patterns keyed by the fingerprint of the options they were created from.
+  _tries_by_fingerprint = {}
+
   @memoized_method
   def get_source_roots(self):
     return SourceRoots(self)
 
   def create_trie(self):
-    """Create a trie of source root patterns from options."""
+    """Create a trie of source root patterns from options.
+
+    The trie is shared by all callers with the same source root options and must not be mutated.
+    """
     options = self.get_options()
+    fingerprint = hash_all([json.dumps([options.lang_canonicalizations,
+                                        sorted(options.source_root_patterns or []),
+                                        sorted(options.test_root_patterns or []),
+                                        options.source_roots,
+                                        options.test_roots],
+                                       sort_keys=True)])
+    trie = self._tries_by_fingerprint.get(fingerprint)
+    if trie is None:
+      trie = self._tries_by_fingerprint[fingerprint] = self._create_trie(options)
+    return trie
+
+  @staticmethod
+  def _create_trie(options):
     trie = SourceRootTrie(options.lang_canonicalizations)
 
     # Add patterns.
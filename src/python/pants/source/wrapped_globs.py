@@ -12,7 +12,7 @@ from six import string_types
 from twitter.common.dirutil.fileset import Fileset
 
 from pants.base.build_environment import get_buildroot
-from pants.util.memo import memoized_property
+from pants.util.memo import memoized_property, weak_per_instance
 
 
 def globs_matches(path, patterns):
@@ -41,7 +41,7 @@ class FilesetWithSpec(object):
     self.filespec = filespec
     self._files_calculator = files_calculator
 
-  @memoized_property
+  @memoized_property(key_factory=weak_per_instance)
   def files(self):
     return self._files_calculator()
 
@@ -10,6 +10,8 @@ import re
 from pants.base.build_environment import get_scm
 from pants.base.deprecated import deprecated_conditional
 from pants.base.exceptions import TaskError
+from pants.build_graph.dependee_index import DependeeIndex
+from pants.build_graph.owner_index import OwnerIndex
 from pants.build_graph.source_mapper import SpecSourceMapper
 from pants.goal.workspace import ScmWorkspace
 
@@ -27,7 +29,9 @@ class ChangeCalculator(object):
                changes_since=None,
                diffspec=None,
                exclude_target_regexp=None,
-               spec_excludes=None):
+               spec_excludes=None,
+               dependee_index=None,
+               source_mapper=None):
     deprecated_conditional(lambda: spec_excludes is not None,
                            '0.0.75',
                            'Use address_mapper#build_ignore_patterns instead.')
@@ -43,8 +47,9 @@ class ChangeCalculator(object):
     self._diffspec = diffspec
     self._exclude_target_regexp = exclude_target_regexp
     self._spec_excludes = spec_excludes
+    self._dependee_index = dependee_index
 
-    self._mapper_cache = None
+    self._mapper_cache = source_mapper
 
   @property
   def _mapper(self):
@@ -62,10 +67,12 @@ class ChangeCalculator(object):
 
   def _directly_changed_targets(self):
     # Internal helper to find target addresses containing SCM changes.
-    targets_for_source = self._mapper.target_addresses_for_source
     result = set()
-    for src in self.changed_files():
-      result.update(set(targets_for_source(src)))
+    for owners in self._mapper.target_addresses_for_sources(self.changed_files()).values():
+      result.update(owners)
+    # Ensure the owners are available from the build graph even if the mapper did not inject them.
+    for address in result:
+      self._build_graph.inject_address_closure(address)
     return result
 
   def _find_changed_targets(self):
@@ -79,6 +86,15 @@ class ChangeCalculator(object):
     if self._include_dependees == 'none':
       return changed
 
+    if self._dependee_index is not None and self._include_dependees in ('direct', 'transitive'):
+      # The index lets us avoid loading the whole build graph; we only inject the dependees found
+      # so that callers can resolve targets for all returned addresses as before.
+      transitive = self._include_dependees == 'transitive'
+      dependees = self._dependee_index.dependees_of(changed, transitive=transitive)
+      for address in dependees:
+        self._build_graph.inject_address_closure(address)
+      return changed.union(dependees)
+
     # Load the whole build graph since we need it for dependee finding in either remaining case.
     for address in self._address_mapper.scan_addresses(spec_excludes=self._spec_excludes):
       self._build_graph.inject_address_closure(address)
@@ -131,6 +147,14 @@ class ChangedFileTaskMixin(object):
              help='Calculate changes contained within given scm spec (commit range/sha/ref/etc).')
     register('--include-dependees', choices=['none', 'direct', 'transitive'], default='none',
              help='Include direct or transitive dependees of changed targets.')
+    register('--dependee-index', action='store_true', default=True, advanced=True,
+             help='Find dependees of changed targets using a persistent index that is updated '
+                  'incrementally as BUILD files change, rather than loading every target in the '
+                  'repo.')
+    register('--owner-index', action='store_true', default=True, advanced=True,
+             help='Map changed files to their owning targets using a persistent index that is '
+                  'updated incrementally as BUILD files change, rather than re-parsing BUILD '
+                  'files on every run.')
 
   @classmethod
   def change_calculator(cls, options, address_mapper, build_graph, scm=None, workspace=None, spec_excludes=None):
@@ -143,6 +167,21 @@ class ChangedFileTaskMixin(object):
       raise TaskError('No SCM available.')
     workspace = workspace or ScmWorkspace(scm)
 
+    dependee_index = None
+    if options.dependee_index:
+      dependee_index = DependeeIndex(address_mapper,
+                                     build_graph,
+                                     DependeeIndex.index_file(options.pants_workdir),
+                                     spec_excludes=spec_excludes)
+
+    source_mapper = None
+    if options.owner_index:
+      source_mapper = OwnerIndex(address_mapper,
+                                 build_graph,
+                                 OwnerIndex.index_file(options.pants_workdir),
+                                 stop_after_match=options.fast,
+                                 match_filespecs=True)
+
     return ChangeCalculator(scm,
                             workspace,
                             address_mapper,
@@ -154,4 +193,6 @@ class ChangedFileTaskMixin(object):
                             # NB: exclude_target_regexp is a global scope option registered
                             # elsewhere
                             exclude_target_regexp=options.exclude_target_regexp,
-                            spec_excludes=spec_excludes)
+                            spec_excludes=spec_excludes,
+                            dependee_index=dependee_index,
+                            source_mapper=source_mapper)
@@ -7,6 +7,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import functools
 import inspect
+import weakref
+from collections import OrderedDict, defaultdict
 
 
 # Used as a sentinel that disambiguates tuples passed in *args from coincidentally matching tuples
@@ -40,6 +42,115 @@ def per_instance(*args, **kwargs):
   return equal_args(*instance_and_rest, **kwargs)
 
 
+class _InstanceRef(weakref.ref):
+  """A weak reference to an instance that compares equal only to references to the same instance."""
+
+  __slots__ = ('_id',)
+
+  def __init__(self, instance):
+    super(_InstanceRef, self).__init__(instance)
+    self._id = id(instance)
+
+  def __hash__(self):
+    return self._id
+
+  def __eq__(self, other):
+    if not isinstance(other, _InstanceRef) or self._id != other._id:
+      return False
+    instance = self()
+    return instance is not None and instance is other()
+
+  def __ne__(self, other):
+    return not self == other
+
+
+def weak_per_instance(*args, **kwargs):
+  """A memoized key factory that works like `per_instance` except that the first parameter is only
+  weakly referenced by the key.
+
+  Memoized results keyed this way are dropped when the instance they were computed for is garbage
+  collected, so this is a useful key factory for instance methods of objects that come and go in
+  long-lived processes.  The first parameter must support weak references.
+  """
+  instance_and_rest = (_InstanceRef(args[0]),) + args[1:]
+  return equal_args(*instance_and_rest, **kwargs)
+
+
+class LRUCache(object):
+  """A mapping that holds at most `maxsize` entries, evicting the least recently used as needed.
+
+  Suitable as the cache for `memoized` when the set of unique call parameters is unbounded; see
+  `lru_cache`.
+  """
+
+  def __init__(self, maxsize):
+    """
+    :param int maxsize: The maximum number of entries to hold.
+    """
+    if maxsize < 1:
+      raise ValueError('The maxsize must be positive, given {}'.format(maxsize))
+    self._maxsize = maxsize
+    self._entries = OrderedDict()
+
+  def __contains__(self, key):
+    return key in self._entries
+
+  def __getitem__(self, key):
+    value = self._entries.pop(key)
+    self._entries[key] = value
+    return value
+
+  def __setitem__(self, key, value):
+    self._entries.pop(key, None)
+    self._entries[key] = value
+    if len(self._entries) > self._maxsize:
+      self._entries.popitem(last=False)
+
+  def __delitem__(self, key):
+    del self._entries[key]
+
+  def __len__(self):
+    return len(self._entries)
+
+  def clear(self):
+    self._entries.clear()
+
+
+def lru_cache(maxsize):
+  """Returns a `cache_factory` for `memoized` that produces caches of at most `maxsize` entries.
+
+  Applied like so:
+
+  >>> @memoized(cache_factory=lru_cache(1000))
+  ... def expensive_operation(user):
+  ...   pass
+  """
+  return functools.partial(LRUCache, maxsize)
+
+
+# All memoized functions, for the reporting of their statistics.
+_memoized_functions = weakref.WeakSet()
+
+
+def memo_stats():
+  """Returns the statistics of all memoized functions that have been called.
+
+  :returns: A dict from the qualified name of each memoized function to a dict holding its number
+            of cache `hits` and `misses` and the current `size` of its cache.  The statistics of
+            functions sharing a name, eg: methods of the same name in different classes of a
+            module, are summed.
+  :rtype: dict
+  """
+  stats_by_name = defaultdict(lambda: dict(hits=0, misses=0, size=0))
+  for function in list(_memoized_functions):
+    stats = function.stats()
+    if stats['hits'] or stats['misses']:
+      totals = stats_by_name['{}.{}'.format(function.__module__, function.__name__)]
+      for stat, value in stats.items():
+        totals[stat] += value
+  return dict(stats_by_name)
+
+
 def memoized(func=None, key_factory=equal_args, cache_factory=dict):
   """Memoizes the results of a function call.
 
@@ -49,12 +160,14 @@ def memoized(func=None, key_factory=equal_args, cache_factory=dict):
   so care must be taken to only apply this decorator to functions with single threaded access and
   an expected reasonably small set of unique call parameters.
 
-  Note that the wrapped function comes equipped with 2 helper function attributes:
+  Note that the wrapped function comes equipped with 3 helper function attributes:
 
   + `forget(*args, **kwargs)`: Takes the same arguments as the memoized function and causes the
                                memoization cache to forget the computed value, if any, for those
                                arguments.
   + `clear()`: Causes the memoization cache to be fully cleared.
+  + `stats()`: Returns a dict holding the number of cache `hits` and `misses` and the current
+               `size` of the cache.
 
   :param func: The function to wrap.  Only generally passed by the python runtime and should be
                omitted when passing a custom `key_factory` or `cache_factory`.
@@ -63,7 +176,7 @@ def memoized(func=None, key_factory=equal_args, cache_factory=dict):
                       ie `equal_args`.
   :param cache_factory: A no-arg callable that produces a mapping object to use for the memoized
                         method's value cache.  By default the `dict` constructor, but could be a
-                        a factory for an LRU cache for example.
+                        a factory for an LRU cache for example; see `lru_cache`.
   :raises: `ValueError` if the wrapper is applied to anything other than a function.
   :returns: A wrapped function that memoizes its results or else a function wrapper that does this.
   """
@@ -86,26 +199,60 @@ def memoized(func=None, key_factory=equal_args, cache_factory=dict):
 
   key_func = key_factory or equal_args
   memoized_results = cache_factory() if cache_factory else {}
+  # Hits and misses.
+  counts = [0, 0]
+
+  # For keys formed by `weak_per_instance`, the keys memoized for each live instance and the weak
+  # references that purge those keys when their instance is garbage collected.
+  keys_by_instance_id = {}
+  purgers_by_instance_id = {}
+
+  def forget_key(key):
+    if key in memoized_results:
+      del memoized_results[key]
+
+  def watch(key):
+    instance_ref = key[0]
+    instance_id = hash(instance_ref)
+    keys = keys_by_instance_id.get(instance_id)
+    if keys is None:
+      keys = keys_by_instance_id[instance_id] = set()
+
+      def purge(_):
+        purgers_by_instance_id.pop(instance_id, None)
+        for purged_key in keys_by_instance_id.pop(instance_id, ()):
+          forget_key(purged_key)
+      purgers_by_instance_id[instance_id] = weakref.ref(instance_ref(), purge)
+    keys.add(key)
 
   @functools.wraps(func)
   def memoize(*args, **kwargs):
     key = key_func(*args, **kwargs)
     if key in memoized_results:
+      counts[0] += 1
       return memoized_results[key]
+    counts[1] += 1
     result = func(*args, **kwargs)
     memoized_results[key] = result
+    if isinstance(key, tuple) and key and isinstance(key[0], _InstanceRef):
+      watch(key)
     return result
 
   def forget(*args, **kwargs):
-    key = key_func(*args, **kwargs)
-    if key in memoized_results:
-      del memoized_results[key]
+    forget_key(key_func(*args, **kwargs))
   memoize.forget = forget
 
   def clear():
     memoized_results.clear()
+    keys_by_instance_id.clear()
+    purgers_by_instance_id.clear()
   memoize.clear = clear
 
+  def stats():
+    return dict(hits=counts[0], misses=counts[1], size=len(memoized_results))
+  memoize.stats = stats
+
+  _memoized_functions.add(memoize)
   return memoize
 
 
@@ -203,5 +350,8 @@ def memoized_property(func=None, key_factory=per_instance, **kwargs):
   :returns: A read-only property that memoizes its calculated value and un-caches its value when
             `del`ed.
   """
+  if func is None:
+    # We're being applied as a decorator factory; see `memoized`.
+    return functools.partial(memoized_property, key_factory=key_factory, **kwargs)
   getter = memoized_method(func=func, key_factory=key_factory, **kwargs)
   return property(fget=getter, fdel=lambda self: getter.forget(self))
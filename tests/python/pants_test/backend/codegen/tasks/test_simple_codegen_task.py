@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import threading
 from textwrap import dedent
 
 from pants.backend.codegen.register import build_file_aliases as register_codegen
@@ -109,6 +110,28 @@ class DummyGen(SimpleCodegenTask):
     return ['copied']
 
 
+class ParallelDummyGen(DummyGen):
+  """A DummyGen which declares itself safe to run concurrently and records its threads."""
+
+  def __init__(self, *vargs, **kwargs):
+    super(ParallelDummyGen, self).__init__(*vargs, **kwargs)
+    self._lock = threading.Lock()
+    self.codegen_threads = set()
+    self.prepared = None
+
+  @property
+  def supports_parallel_codegen(self):
+    return True
+
+  def prepare_parallel_codegen(self):
+    self.prepared = (threading.current_thread(), self.execution_counts)
+
+  def execute_codegen(self, target, target_workdir):
+    with self._lock:
+      self.codegen_threads.add(threading.current_thread())
+      super(ParallelDummyGen, self).execute_codegen(target, target_workdir)
+
+
 class SimpleCodegenTaskTest(TaskTestBase):
 
   @classmethod
@@ -137,9 +160,7 @@ class SimpleCodegenTaskTest(TaskTestBase):
         '''.format(name=spec_name)))
     return set([self.target(spec) for spec in target_specs])
 
-  def _test_execute_strategy(self, strategy, expected_execution_count):
-    dummy_suffixes = ['a', 'b', 'c']
-
+  def _create_gen_lib_targets(self, dummy_suffixes):
     self.add_to_build_file('gen-lib', '\n'.join(dedent('''
       dummy_library(name='{suffix}',
         sources=['org/pantsbuild/example/foo{suffix}.dummy'],
@@ -150,7 +171,10 @@ class SimpleCodegenTaskTest(TaskTestBase):
       self.create_file('gen-lib/org/pantsbuild/example/foo{suffix}.dummy'.format(suffix=suffix),
                        'org.pantsbuild.example Foo{0}'.format(suffix))
 
-    targets = [self.target('gen-lib:{suffix}'.format(suffix=suffix)) for suffix in dummy_suffixes]
+    return [self.target('gen-lib:{suffix}'.format(suffix=suffix)) for suffix in dummy_suffixes]
+
+  def _test_execute_strategy(self, strategy, expected_execution_count):
+    targets = self._create_gen_lib_targets(['a', 'b', 'c'])
     task = self._create_dummy_task(target_roots=targets, strategy=strategy)
     expected_targets = set(targets)
     found_targets = set(task.codegen_targets())
@@ -262,3 +286,30 @@ class SimpleCodegenTaskTest(TaskTestBase):
     task = self._create_dummy_task(target_roots=targets, strategy='isolated')
     task.execute()
     self.assertEqual('copythis', task.codegen_targets()[0].copied)
+
+
+class ParallelSimpleCodegenTaskTest(SimpleCodegenTaskTest):
+  """Runs the SimpleCodegenTask tests against a generator which supports parallel codegen."""
+
+  @classmethod
+  def task_type(cls):
+    return ParallelDummyGen
+
+  @ensure_cached(ParallelDummyGen)
+  def test_execute_isolated(self):
+    self._test_execute_strategy('isolated', 3)
+
+  def test_execute_parallel(self):
+    targets = self._create_gen_lib_targets(['a', 'b', 'c', 'd'])
+    task = self._create_dummy_task(target_roots=targets, worker_count=2)
+    task.execute()
+
+    self.assertEqual(4, task.execution_counts)
+    self.assertNotIn(threading.current_thread(), task.codegen_threads)
+    # Preparation happens on the main thread before any code is generated.
+    self.assertEqual((threading.current_thread(), 0), task.prepared)
+    for target in targets:
+      synthetic_targets = [t for t in task.context.targets()
+                           if t.derived_from == target and t != target]
+      self.assertEqual(1, len(synthetic_targets))
+      self.assertEqual(1, len(list(synthetic_targets[0].sources_relative_to_source_root())))
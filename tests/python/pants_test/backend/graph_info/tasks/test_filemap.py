@@ -54,6 +54,15 @@ class FilemapTest(ConsoleTaskTestBase):
       'common/src/py/c/four.py common/src/py/c:c',
     )
 
+  def test_all_with_deprecated_spec_excludes(self):
+    # Can be removed while `spec_excludes` removal.
+    context = self.context()
+    context._spec_excludes = ['common/src/py/c']
+    self.assertEqual(sorted(['common/src/py/a/one.py common/src/py/a:a',
+                             'common/src/py/b/two.py common/src/py/b:b',
+                             'common/src/py/b/three.py common/src/py/b:b']),
+                     sorted(self.execute_console_task_given_context(context)))
+
   def test_one(self):
     self.assert_console_output(
       'common/src/py/b/two.py common/src/py/b:b',
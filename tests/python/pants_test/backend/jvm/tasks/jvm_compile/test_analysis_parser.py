@@ -0,0 +1,72 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import io
+import unittest
+
+from pants.backend.jvm.tasks.jvm_compile.analysis_parser import AnalysisParser
+
+
+class LineRebasingParser(AnalysisParser):
+  """Rebases every line of an analysis, recording each call to rebase."""
+
+  def __init__(self):
+    self.rebase_calls = []
+    self.outfiles = []
+
+  def rebase(self, infile, outfile, old_base, new_base, java_home=None):
+    self.rebase_calls.append((old_base, new_base, java_home))
+    self.outfiles.append(outfile)
+    for line in infile:
+      if java_home and java_home in line:
+        continue
+      outfile.write(line.replace(old_base, new_base))
+
+
+class AnalysisParserTest(unittest.TestCase):
+
+  def rebase_all(self, analysis, rebasings, java_home=None):
+    parser = LineRebasingParser()
+    outfile = io.BytesIO()
+    parser.rebase_all(io.BytesIO(analysis), outfile, rebasings, java_home=java_home)
+    return outfile.getvalue(), parser.rebase_calls
+
+  def test_rebase_all_applies_rebasings_in_order(self):
+    analysis = b'/buildroot/.pants.d/classes/A.class\n/buildroot/src/A.java\n/jdk/rt.jar\n'
+    rebased, calls = self.rebase_all(analysis,
+                                     [(b'/buildroot/.pants.d', b'/WORKDIR'),
+                                      (b'/buildroot', b'/BUILDROOT')],
+                                     java_home=b'/jdk')
+    self.assertEqual(b'/WORKDIR/classes/A.class\n/BUILDROOT/src/A.java\n', rebased)
+    # The java home is only scrubbed by the first stage.
+    self.assertEqual([(b'/buildroot/.pants.d', b'/WORKDIR', b'/jdk'),
+                      (b'/buildroot', b'/BUILDROOT', None)],
+                     calls)
+
+  def test_rebase_all_single_rebasing(self):
+    rebased, calls = self.rebase_all(b'/a/A.java\n', [(b'/a', b'/b')])
+    self.assertEqual(b'/b/A.java\n', rebased)
+    self.assertEqual(1, len(calls))
+
+  def test_rebase_all_no_rebasings(self):
+    rebased, calls = self.rebase_all(b'/a/A.java\n', [])
+    self.assertEqual(b'/a/A.java\n', rebased)
+    self.assertEqual([], calls)
+
+  def test_rebase_all_streams_intermediate_stages_through_temporary_files(self):
+    parser = LineRebasingParser()
+    outfile = io.BytesIO()
+    parser.rebase_all(io.BytesIO(b'/a/A.java\n'), outfile, [(b'/a', b'/b'), (b'/b', b'/c'),
+                                                            (b'/c', b'/d')])
+    self.assertEqual(b'/d/A.java\n', outfile.getvalue())
+    intermediates = parser.outfiles[:-1]
+    self.assertEqual(2, len(intermediates))
+    for stage_file in intermediates:
+      self.assertNotIsInstance(stage_file, io.BytesIO)
+      self.assertTrue(stage_file.closed)
+    self.assertIs(outfile, parser.outfiles[-1])
+    self.assertFalse(outfile.closed)
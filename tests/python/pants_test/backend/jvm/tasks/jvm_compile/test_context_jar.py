@@ -0,0 +1,130 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import time
+import unittest
+import zipfile
+
+from mock import patch
+
+from pants.backend.jvm.tasks.jvm_compile.compile_context import CompileContext
+from pants.backend.jvm.tasks.jvm_compile.jvm_compile import JvmCompile
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_delete, safe_file_dump
+
+
+class ContextJarTest(unittest.TestCase):
+
+  # Class files written before the jar, the jar itself, and classes (re-)written by a compile.
+  OLD = int(time.time()) - 3000
+  JARRED = OLD + 1000
+  NEW = OLD + 2000
+
+  def setUp(self):
+    self._tmpdir_context = temporary_dir()
+    tmpdir = self._tmpdir_context.__enter__()
+    self.classes_dir = os.path.join(tmpdir, 'classes')
+    self.jar_file = os.path.join(tmpdir, 'z.jar')
+    self.compile_context = CompileContext(target=None,
+                                          analysis_file=None,
+                                          portable_analysis_file=None,
+                                          classes_dir=self.classes_dir,
+                                          jar_file=self.jar_file,
+                                          log_file=None,
+                                          sources=[],
+                                          strict_deps=False)
+
+  def tearDown(self):
+    self._tmpdir_context.__exit__(None, None, None)
+
+  def write_class(self, relpath, content, mtime=None):
+    path = os.path.join(self.classes_dir, relpath)
+    safe_file_dump(path, content)
+    mtime = mtime or self.OLD
+    os.utime(path, (mtime, mtime))
+
+  def create_jar(self):
+    JvmCompile._create_context_jar(self.compile_context)
+    # Mark the jar as older than any class the "compiler" writes from here on.
+    os.utime(self.jar_file, (self.JARRED, self.JARRED))
+
+  def jar_contents(self):
+    with open_zip(self.jar_file) as jar:
+      return {info.filename: jar.read(info) for info in jar.infolist()
+              if not info.filename.endswith('/')}
+
+  def test_create(self):
+    self.write_class('org/pantsbuild/A.class', 'a')
+    self.create_jar()
+    self.assertEqual({'org/pantsbuild/A.class': 'a'}, self.jar_contents())
+
+  def test_unchanged_jar_untouched(self):
+    self.write_class('org/pantsbuild/A.class', 'a')
+    self.create_jar()
+
+    JvmCompile._create_context_jar(self.compile_context)
+    self.assertEqual(self.JARRED, os.path.getmtime(self.jar_file))
+    self.assertEqual({'org/pantsbuild/A.class': 'a'}, self.jar_contents())
+
+  def test_new_classes_appended(self):
+    self.write_class('org/pantsbuild/A.class', 'a')
+    self.create_jar()
+    self.write_class('org/pantsbuild/B.class', 'b', mtime=self.NEW)
+
+    with patch.object(zipfile.ZipFile, 'writestr') as writestr:
+      JvmCompile._create_context_jar(self.compile_context)
+      # Existing entries are not re-written when only appending.
+      self.assertFalse(writestr.called)
+    self.assertEqual({'org/pantsbuild/A.class': 'a', 'org/pantsbuild/B.class': 'b'},
+                     self.jar_contents())
+    self.assertFalse(os.path.exists(self.jar_file + '.tmp'))
+
+  def test_changed_class_rewritten(self):
+    self.write_class('org/pantsbuild/A.class', 'a')
+    self.write_class('org/pantsbuild/B.class', 'b')
+    self.create_jar()
+    self.write_class('org/pantsbuild/A.class', 'a2', mtime=self.NEW)
+
+    JvmCompile._create_context_jar(self.compile_context)
+    self.assertEqual({'org/pantsbuild/A.class': 'a2', 'org/pantsbuild/B.class': 'b'},
+                     self.jar_contents())
+    self.assertFalse(os.path.exists(self.jar_file + '.tmp'))
+
+  def test_deleted_class_removed(self):
+    self.write_class('org/pantsbuild/A.class', 'a')
+    self.write_class('org/pantsbuild/B.class', 'b')
+    self.create_jar()
+    safe_delete(os.path.join(self.classes_dir, 'org/pantsbuild/B.class'))
+
+    JvmCompile._create_context_jar(self.compile_context)
+    self.assertEqual({'org/pantsbuild/A.class': 'a'}, self.jar_contents())
+
+  def assert_interrupted_update_leaves_jar_intact(self):
+    with patch.object(zipfile.ZipFile, 'write', side_effect=KeyboardInterrupt):
+      with self.assertRaises(KeyboardInterrupt):
+        JvmCompile._create_context_jar(self.compile_context)
+    self.assertEqual({'org/pantsbuild/A.class': 'a', 'org/pantsbuild/B.class': 'b'},
+                     self.jar_contents())
+    self.assertEqual(self.JARRED, os.path.getmtime(self.jar_file))
+    self.assertFalse(os.path.exists(self.jar_file + '.tmp'))
+
+  def test_interrupted_rewrite(self):
+    self.write_class('org/pantsbuild/A.class', 'a')
+    self.write_class('org/pantsbuild/B.class', 'b')
+    self.create_jar()
+    self.write_class('org/pantsbuild/B.class', 'b2', mtime=self.NEW)
+
+    self.assert_interrupted_update_leaves_jar_intact()
+
+  def test_interrupted_append(self):
+    self.write_class('org/pantsbuild/A.class', 'a')
+    self.write_class('org/pantsbuild/B.class', 'b')
+    self.create_jar()
+    self.write_class('org/pantsbuild/C.class', 'c', mtime=self.NEW)
+
+    self.assert_interrupted_update_leaves_jar_intact()
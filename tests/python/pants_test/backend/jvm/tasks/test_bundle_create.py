@@ -6,7 +6,11 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import time
 
+from mock import patch
+
+from pants.backend.jvm.subsystems.shader import Shading
 from pants.backend.jvm.targets.jar_dependency import JarDependency
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.targets.java_library import JavaLibrary
@@ -130,6 +134,107 @@ class TestBundleCreate(JvmBinaryTaskTestBase):
     with self.assertRaises(BundleCreate.BasenameConflictError):
       self.execute(self.task_context)
 
+  def test_shade_jars_cached(self):
+    """Test jars are shaded concurrently and shaded results are reused across runs."""
+    self.set_options(shading_worker_count=2)
+    task = self.create_task(self.task_context)
+
+    jar_dir = os.path.join(self.build_root, 'jars')
+    a_jar = os.path.join(jar_dir, 'a.jar')
+    b_jar = os.path.join(jar_dir, 'b.jar')
+    bundle_jar = os.path.join(jar_dir, 'bundle.jar')
+
+    def dump_jars():
+      for path in (a_jar, b_jar, bundle_jar):
+        safe_file_dump(path, os.path.basename(path))
+
+    shaded = []
+
+    def shade_jar(shading_rules, jar_path):
+      shaded.append(jar_path)
+      with open(jar_path, 'a') as fp:
+        fp.write('-shaded')
+
+    rules = [Shading.create_relocate('org.foo.**')]
+    with patch.object(BundleCreate, 'shader') as shader, \
+         patch.object(BundleCreate, 'shade_jar', side_effect=shade_jar):
+      shader.fingerprint = 'jarjar-1'
+      dump_jars()
+      task.shade_jars(rules, [a_jar, b_jar, bundle_jar], uncached_jar_paths=[bundle_jar])
+      self.assertEqual(sorted([a_jar, b_jar, bundle_jar]), sorted(shaded))
+
+      del shaded[:]
+      dump_jars()
+      task.shade_jars(rules, [a_jar, b_jar, bundle_jar], uncached_jar_paths=[bundle_jar])
+      self.assertEqual([bundle_jar], shaded)
+
+      for path in (a_jar, b_jar, bundle_jar):
+        with open(path) as fp:
+          self.assertEqual('{}-shaded'.format(os.path.basename(path)), fp.read())
+
+      # Different rules must not reuse jars shaded under the old ones.
+      del shaded[:]
+      dump_jars()
+      task.shade_jars([Shading.create_relocate('org.bar.**')], [a_jar])
+      self.assertEqual([a_jar], shaded)
+
+      # Nor must a different shading tool.
+      del shaded[:]
+      dump_jars()
+      shader.fingerprint = 'jarjar-2'
+      task.shade_jars(rules, [a_jar])
+      self.assertEqual([a_jar], shaded)
+
+  def test_prune_shaded_jars(self):
+    jar_dir = os.path.join(self.build_root, 'jars')
+    a_jar = os.path.join(jar_dir, 'a.jar')
+    b_jar = os.path.join(jar_dir, 'b.jar')
+    self.set_options(shaded_jars_max_age_days=1)
+    context = self.context()
+    shaded_dir = os.path.join(self.create_task(context).workdir, 'shaded')
+
+    def bundle_run(rules, jar_paths):
+      """Shades the jars like a bundle run with a fresh task, pruning the cache once done."""
+      task = self.create_task(context)
+      for path in jar_paths:
+        safe_file_dump(path, os.path.basename(path))
+      task.shade_jars(rules, jar_paths)
+      task.prune_shaded_jars(shader.fingerprint)
+
+    def cached_jars():
+      return sorted(os.path.relpath(os.path.join(root, name), shaded_dir)
+                    for root, _, files in os.walk(shaded_dir)
+                    for name in files)
+
+    a_rules = [Shading.create_relocate('org.foo.**')]
+    b_rules = [Shading.create_relocate('org.bar.**')]
+    with patch.object(BundleCreate, 'shader') as shader, \
+         patch.object(BundleCreate, 'shade_jar') as shade_jar:
+      shader.fingerprint = 'jarjar-1'
+
+      # Apps bundled in separate runs keep each other's cached jars.
+      bundle_run(a_rules, [a_jar])
+      a_cached = cached_jars()
+      bundle_run(b_rules, [b_jar])
+      self.assertEqual(2, len(cached_jars()))
+      shade_jar.reset_mock()
+      bundle_run(a_rules, [a_jar])
+      self.assertFalse(shade_jar.called)
+      self.assertEqual(2, len(cached_jars()))
+
+      # Jars unused for longer than the max age are pruned.
+      expired = time.time() - 2 * 24 * 60 * 60
+      for cached_jar in cached_jars():
+        os.utime(os.path.join(shaded_dir, cached_jar), (expired, expired))
+      bundle_run(a_rules, [a_jar])
+      self.assertEqual(a_cached, cached_jars())
+
+      # Jars shaded by an old shading tool are stale.
+      shader.fingerprint = 'jarjar-2'
+      bundle_run(b_rules, [b_jar])
+      self.assertEqual(['jarjar-2'], os.listdir(shaded_dir))
+      self.assertEqual(1, len(cached_jars()))
+
   def _check_bundle_products(self, bundle_basename):
     products = self.task_context.products.get('jvm_bundles')
     self.assertIsNotNone(products)
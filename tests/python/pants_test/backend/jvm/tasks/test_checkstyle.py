@@ -12,6 +12,7 @@ from pants.backend.jvm.targets.java_library import JavaLibrary
 from pants.backend.jvm.tasks.checkstyle import Checkstyle
 from pants.base.exceptions import TaskError
 from pants.build_graph.address import Address
+from pants.process.xargs import Xargs
 from pants_test.jvm.nailgun_task_test_base import NailgunTaskTestBase
 from pants_test.tasks.task_test_base import ensure_cached
 
@@ -144,3 +145,11 @@ class CheckstyleTest(NailgunTaskTestBase):
 
     self.populate_runtime_classpath(context=context)
     self.execute(context)
+
+  def test_runjava_max_args_size(self):
+    task = self.create_task(self._create_context())
+    max_args_size = task.runjava_max_args_size(classpath=['a.jar'], main='Main')
+    # The classpath, jvm options and fixed args all take room from the args xargs may append.
+    self.assertEqual(max_args_size - len(':b.jar') - Xargs._args_size(['-Xmx1g', '-c', 'x']),
+                     task.runjava_max_args_size(classpath=['a.jar', 'b.jar'], main='Main',
+                                                jvm_options=['-Xmx1g'], args=['-c', 'x']))
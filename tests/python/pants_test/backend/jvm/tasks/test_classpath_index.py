@@ -0,0 +1,116 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import time
+import unittest
+
+from mock import patch
+
+from pants.backend.jvm.tasks.classpath_index import ClasspathIndex
+from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_delete, safe_rmtree, touch
+
+
+class ClasspathIndexTest(unittest.TestCase):
+
+  def setUp(self):
+    self._tmpdir_context = temporary_dir()
+    self.tmpdir = self._tmpdir_context.__enter__()
+    self.index_dir = os.path.join(self.tmpdir, 'index')
+
+  def tearDown(self):
+    self._tmpdir_context.__exit__(None, None, None)
+
+  def index(self):
+    return ClasspathIndex(self.index_dir)
+
+  def create_jar(self, path, *names):
+    with open_zip(path, 'w') as jar:
+      for name in names:
+        jar.writestr(name, b'')
+    return path
+
+  def assert_contents(self, entry):
+    expected = list(ClasspathUtil.classpath_entries_contents([entry]))
+    self.assertEqual(sorted(expected), sorted(self.index().contents(entry)))
+
+  def test_jar(self):
+    jar = self.create_jar(os.path.join(self.tmpdir, 'a.jar'), 'a/', 'a/A.class')
+    self.assertEqual(['a/', 'a/A.class'], self.index().contents(jar))
+
+    self.create_jar(jar, 'b/', 'b/B.class')
+    # Force a changed fingerprint even if the rewrite happened within the mtime resolution.
+    os.utime(jar, (0, 0))
+    self.assertEqual(['b/', 'b/B.class'], self.index().contents(jar))
+
+  def test_jar_indexed_by_digest(self):
+    jar = self.create_jar(os.path.join(self.tmpdir, 'a.jar'), 'a/A.class')
+    self.index().contents(jar)
+    copy = os.path.join(self.tmpdir, 'copy.jar')
+    with open(jar, 'rb') as src, open(copy, 'wb') as dst:
+      dst.write(src.read())
+
+    self.assertEqual(1, len(os.listdir(os.path.join(self.index_dir, 'jars'))))
+    self.assertEqual(['a/A.class'], self.index().contents(copy))
+    self.assertEqual(1, len(os.listdir(os.path.join(self.index_dir, 'jars'))))
+
+  def test_classes_dir(self):
+    classes_dir = os.path.join(self.tmpdir, 'classes')
+    touch(os.path.join(classes_dir, 'a', 'A.class'))
+    touch(os.path.join(classes_dir, 'a', 'b', 'B.class'))
+    self.assert_contents(classes_dir)
+
+    touch(os.path.join(classes_dir, 'a', 'b', 'C.class'))
+    os.utime(os.path.join(classes_dir, 'a', 'b'), (0, 0))
+    self.assert_contents(classes_dir)
+
+    safe_delete(os.path.join(classes_dir, 'a', 'A.class'))
+    os.utime(os.path.join(classes_dir, 'a'), (1, 1))
+    self.assert_contents(classes_dir)
+
+    safe_rmtree(os.path.join(classes_dir, 'a', 'b'))
+    self.assert_contents(classes_dir)
+
+  def age_dirs(self, classes_dir, mtime=1):
+    for root, _, _ in os.walk(classes_dir):
+      os.utime(root, (mtime, mtime))
+
+  def test_unchanged_classes_dir_is_not_walked(self):
+    classes_dir = os.path.join(self.tmpdir, 'classes')
+    touch(os.path.join(classes_dir, 'a', 'A.class'))
+    self.age_dirs(classes_dir)
+    self.index().contents(classes_dir)
+
+    # Overwriting a file in place does not change the directory listing, so is not re-indexed.
+    touch(os.path.join(classes_dir, 'a', 'A.class'))
+    with patch.object(ClasspathUtil, 'classpath_entries_contents') as walk:
+      self.assertEqual(['a/', 'a/A.class'], sorted(self.index().contents(classes_dir)))
+      self.assertFalse(walk.called)
+
+  def test_recently_modified_classes_dir_is_not_persisted(self):
+    classes_dir = os.path.join(self.tmpdir, 'classes')
+    touch(os.path.join(classes_dir, 'a', 'A.class'))
+    now = int(time.time())
+    self.age_dirs(classes_dir, mtime=now)
+    self.index().contents(classes_dir)
+
+    # A change within the mtime resolution of the first walk leaves the dir mtimes unchanged.
+    touch(os.path.join(classes_dir, 'a', 'B.class'))
+    self.age_dirs(classes_dir, mtime=now)
+    self.assertEqual(['a/', 'a/A.class', 'a/B.class'], sorted(self.index().contents(classes_dir)))
+
+  def test_entries_contents(self):
+    jar = self.create_jar(os.path.join(self.tmpdir, 'a.jar'), 'a/A.class')
+    classes_dir = os.path.join(self.tmpdir, 'classes')
+    touch(os.path.join(classes_dir, 'B.class'))
+
+    self.assertEqual(['a/A.class', 'B.class'],
+                     list(self.index().entries_contents([jar,
+                                                         classes_dir,
+                                                         os.path.join(self.tmpdir, 'nope.jar')])))
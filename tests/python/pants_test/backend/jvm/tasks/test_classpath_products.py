@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import sys
 
 from pants.backend.jvm.artifact import Artifact
 from pants.backend.jvm.jar_dependency_utils import M2Coordinate, ResolvedJar
@@ -399,6 +400,59 @@ class ClasspathProductsTest(BaseTest):
                       ('default', ClasspathEntry(self.path('b/loose/classes/dir')))],
                      classpath)
 
+  def test_excludes_refreshed_when_products_change(self):
+    b = self.make_target('b', JvmTarget, excludes=[Exclude('com.example', 'lib')])
+    a = self.make_target('a', JvmTarget, dependencies=[b])
+
+    classpath_product = ClasspathProducts(self.pants_workdir)
+    example_jar_path = self._example_jar_path()
+    self.add_example_jar_classpath_element_for(classpath_product, a)
+    self.assertEqual([('default', example_jar_path)], classpath_product.get_for_target(a))
+
+    self.add_excludes_for_targets(classpath_product, b)
+    self.assertEqual([], classpath_product.get_for_target(a))
+
+    other_jar_path = self.path('ivy/jars/com.example/other/jars/123.4.jar')
+    classpath_product.add_jars_for_targets([a], 'default',
+                                           [resolved_example_jar_at(other_jar_path, name='other')])
+    self.assertEqual([('default', other_jar_path)], classpath_product.get_for_target(a))
+
+  def test_excludes_refreshed_when_build_graph_changes(self):
+    a = self.make_target('a', JvmTarget)
+
+    classpath_product = ClasspathProducts(self.pants_workdir, build_graph=self.build_graph)
+    self.add_example_jar_classpath_element_for(classpath_product, a)
+    self.assertEqual([('default', self._example_jar_path())], classpath_product.get_for_target(a))
+
+    # A dependency carrying an exclude is injected after the classpath was first requested.
+    b = self.make_target('b', JvmTarget, excludes=[Exclude('com.example')])
+    self.add_excludes_for_targets(classpath_product, b)
+    self.assertEqual([('default', self._example_jar_path())], classpath_product.get_for_target(a))
+    a.inject_dependency(b.address)
+    self.assertEqual([], classpath_product.get_for_target(a))
+
+  def test_excludes_of_deep_dependency_chain(self):
+    # A chain of dependencies deeper than the recursion limit.
+    depth = sys.getrecursionlimit() + 100
+    dependency = self.make_target('chain:0', JvmTarget, excludes=[Exclude('com.example', 'lib')])
+    for index in range(1, depth):
+      dependency = self.make_target('chain:{}'.format(index), JvmTarget, dependencies=[dependency])
+
+    classpath_product = ClasspathProducts(self.pants_workdir, build_graph=self.build_graph)
+    self.add_example_jar_classpath_element_for(classpath_product, dependency)
+    self.add_excludes_for_targets(classpath_product, *self.build_graph.targets())
+    self.assertEqual([], classpath_product.get_for_target(dependency))
+
+  def test_excludes_of_dependency_cycle(self):
+    b = self.make_target('b', JvmTarget, excludes=[Exclude('com.example', 'lib')])
+    a = self.make_target('a', JvmTarget, dependencies=[b])
+    b.inject_dependency(a.address)
+
+    classpath_product = ClasspathProducts(self.pants_workdir, build_graph=self.build_graph)
+    self.add_example_jar_classpath_element_for(classpath_product, a)
+    self.add_excludes_for_targets(classpath_product, a, b)
+    self.assertEqual([], classpath_product.get_for_target(a))
+
   def _example_jar_path(self):
     return self.path('ivy/jars/com.example/lib/jars/123.4.jar')
 
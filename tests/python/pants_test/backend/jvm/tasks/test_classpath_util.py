@@ -225,6 +225,45 @@ class ClasspathUtilTest(BaseTest):
                                                 '{}/{}\n'.format(self.pants_workdir, jar_path),
                                             })
 
+  def test_create_canonical_classpath_incremental(self):
+    """Test unchanged symlinks and classpath files are left untouched on subsequent calls."""
+    a = self.make_target('a/b', JvmTarget)
+
+    classpath_products = ClasspathProducts(self.pants_workdir)
+    classpath_products.add_for_target(a, [('default', self._path('a.jar')),
+                                          ('default', self._path('b.jar'))])
+
+    with temporary_dir() as base_dir:
+      def create_canonical_classpath():
+        return ClasspathUtil.create_canonical_classpath(classpath_products, [a], base_dir,
+                                                        save_classpath_file=True)
+
+      def inodes():
+        return {name: os.lstat(os.path.join(base_dir, name)).st_ino
+                for name in os.listdir(base_dir)}
+
+      create_canonical_classpath()
+      before = inodes()
+      self.assertEqual(['a.b.b-0.jar', 'a.b.b-1.jar', 'a.b.b-classpath.txt'], sorted(before))
+
+      # A repeated call with the same classpath is a no-op.
+      classpath_file = os.path.join(base_dir, 'a.b.b-classpath.txt')
+      os.utime(classpath_file, (0, 0))
+      create_canonical_classpath()
+      self.assertEqual(before, inodes())
+      self.assertEqual(0, os.path.getmtime(classpath_file))
+
+      # Only the entry that changed is re-linked.
+      classpath_products = ClasspathProducts(self.pants_workdir)
+      classpath_products.add_for_target(a, [('default', self._path('a.jar')),
+                                            ('default', self._path('c.jar'))])
+      create_canonical_classpath()
+      after = inodes()
+      self.assertEqual(before['a.b.b-0.jar'], after['a.b.b-0.jar'])
+      self.assertEqual(self._path('c.jar'), os.readlink(os.path.join(base_dir, 'a.b.b-1.jar')))
+      self.assertTrue(check_file_content(classpath_file,
+                                         '{0}/a.jar:{0}/c.jar\n'.format(self.pants_workdir)))
+
   def _test_canonical_classpath_helper(self,
                                        classpath_products,
                                        targets,
@@ -6,16 +6,17 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import threading
 import unittest
 
-from mock import Mock
+from mock import Mock, patch
 
 from pants.backend.jvm.artifact import Artifact
 from pants.backend.jvm.repository import Repository
 from pants.backend.jvm.scala_artifact import ScalaArtifact
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.targets.java_library import JavaLibrary
-from pants.backend.jvm.tasks.jar_publish import JarPublish
+from pants.backend.jvm.tasks.jar_publish import JarPublish, PushDb
 from pants.base.exceptions import TaskError
 from pants.build_graph.build_file_aliases import BuildFileAliases
 from pants.build_graph.target import Target
@@ -203,6 +204,66 @@ class JarPublishTest(TaskTestBase):
                     'Expected at least one tag message line in addition to the post script.')
     self.assertEquals('PS', tag_message_splitlines[-1])
 
+  def test_publish_concurrently(self):
+    targets = self._prepare_for_publishing()
+    self.set_options(dryrun=False, repos=self._get_repos(), worker_count=3)
+    task = self.create_task(self.context(target_roots=targets))
+    self._prepare_mocks(task)
+
+    publish_order = []
+    lock = threading.Lock()
+
+    def publish(publications, jar, entry, repo, published):
+      with lock:
+        # The artifacts form a chain, so each one's dependencies must all be published already.
+        self.assertEqual([dep.name for dep in published[:-1]], publish_order)
+        publish_order.append(jar.name)
+    task.publish = Mock(side_effect=publish)
+    task.execute()
+
+    self.assertEqual(['nail', 'shoe', 'horse'], publish_order)
+    self.assertEquals(len(targets), task.scm.commit.call_count,
+                      'Expected one call to scm.commit per artifact')
+    self.assertEquals(len(targets), task.scm.tag.call_count,
+                      'Expected one call to scm.tag per artifact')
+
+  def test_publish_failure_records_only_published_artifacts(self):
+    targets = self._prepare_for_publishing()
+    self.set_options(dryrun=False, repos=self._get_repos(), worker_count=3)
+    task = self.create_task(self.context(target_roots=targets))
+    self._prepare_mocks(task)
+
+    def publish(publications, jar, entry, repo, published):
+      if jar.name == 'shoe':
+        raise TaskError('Failed to publish shoe.')
+    task.publish = Mock(side_effect=publish)
+
+    # All the artifacts share one pushdb, so each commit of it must hold only published entries.
+    dbfile = os.path.join(self.push_db_basedir, 'publish.properties')
+    with patch.object(Repository, 'push_db', return_value=dbfile):
+      with self.assertRaises(TaskError):
+        task.execute()
+
+    # Every push is confirmed before any publish starts.
+    self.assertEquals(len(targets), task.confirm_push.call_count)
+    self.assertEquals(1, task.scm.commit.call_count)
+    pushdb = PushDb.load(dbfile)
+    published = {target.provides.name: pushdb.get_entry(target).sha is not None
+                 for target in targets}
+    self.assertEqual({'nail': True, 'shoe': False, 'horse': False}, published)
+
+  def test_publish_concurrently_restart_at(self):
+    targets = self._prepare_for_publishing()
+    with temporary_dir() as publish_dir:
+      self.set_options(dryrun=False, local=publish_dir, worker_count=3,
+                       restart_at='com.example#shoe')
+      task = self.create_task(self.context(target_roots=targets))
+      self._prepare_mocks(task)
+      task.execute()
+
+      published = [kwargs['jar'].name for _, kwargs in task.publish.call_args_list]
+      self.assertEqual(['shoe', 'horse'], published)
+
   def test_publish_retry_works(self):
     targets = self._prepare_for_publishing()
     self.set_options(dryrun=False, scm_push_attempts=3, repos=self._get_repos())
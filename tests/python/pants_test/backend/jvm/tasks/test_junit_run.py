@@ -5,11 +5,12 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import json
 import os
 import subprocess
 from textwrap import dedent
 
-from mock import patch
+from mock import Mock, patch
 
 from pants.backend.jvm.targets.java_tests import JavaTests
 from pants.backend.jvm.tasks.junit_run import JUnitRun
@@ -376,3 +377,129 @@ class JUnitRunnerTest(JvmToolTaskTestBase):
             }
           }
         """), target_name='foo:foo_test')
+
+  def test_run_batches_concurrently(self):
+    self.set_options(batch_concurrency=2)
+    task = self.create_task(self.context())
+
+    def run_batch(batch, outdir):
+      for test in batch:
+        safe_file_dump(os.path.join(outdir, 'TEST-{}.xml'.format(test.partition('#')[0])), test)
+        safe_file_dump(os.path.join(outdir, '{}.out.txt'.format(test)), test)
+      safe_file_dump(os.path.join(outdir, 'synthetic-classpath.jar'), '')
+      return 1 if 'Fails' in batch else 0
+
+    batches = [(['A#one'],), (['B', 'Fails'],), (['C', 'A#two'],)]
+    self.assertEqual(1, task._run_batches_concurrently(run_batch, batches))
+    for test in ['B', 'Fails', 'C']:
+      with open(os.path.join(task.workdir, 'TEST-{}.xml'.format(test))) as fp:
+        self.assertEqual(test, fp.read())
+      with open(os.path.join(task.workdir, '{}.out.txt'.format(test))) as fp:
+        self.assertEqual(test, fp.read())
+    # A report written by several batches is that of the last batch, as when run serially.
+    with open(os.path.join(task.workdir, 'TEST-A.xml')) as fp:
+      self.assertEqual('A#two', fp.read())
+    self.assertFalse(os.path.exists(os.path.join(task.workdir, 'synthetic-classpath.jar')))
+    self.assertFalse(os.path.exists(os.path.join(task.workdir, 'batches')))
+
+  def test_run_batches_concurrently_stops_after_error(self):
+    self.set_options(batch_concurrency=2)
+    task = self.create_task(self.context())
+    ran = []
+
+    def run_batch(batch, outdir):
+      ran.append(batch)
+      raise TaskError('Boom')
+
+    batches = [(['A'],), (['B'],), (['C'],), (['D'],)]
+    with self.assertRaises(TaskError):
+      task._run_batches_concurrently(run_batch, batches)
+    # Only the batches already running when the first one raised can have been started.
+    self.assertLessEqual(len(ran), 2)
+
+  def test_balance_by_count_without_history(self):
+    task = self.create_task(self.context())
+    self.assertEqual([['a', 'd'], ['b', 'e'], ['c']],
+                     task._balance(['e', 'd', 'c', 'b', 'a'], 3))
+
+  def test_balance_by_recorded_durations(self):
+    self.set_options(balance_by_timings=True, batch_size=2)
+    task = self.create_task(self.context())
+    safe_file_dump(os.path.join(task.workdir, 'TEST-org.Slow.xml'),
+                   '<testsuite name="org.Slow" time="10.0"/>')
+    safe_file_dump(os.path.join(task.workdir, 'TEST-org.Fast.xml'),
+                   '<testsuite name="org.Fast" time="2.0"/>')
+    task._record_test_durations({'org.Slow': None, 'org.Fast': None, 'org.Missing': None}, 0)
+
+    task = self.create_task(self.context())
+    self.assertEqual({'org.Slow': 10.0, 'org.Fast': 2.0}, task._test_durations)
+    # Unseen tests are assumed to take the mean recorded duration.
+    self.assertEqual([['org.Slow'], ['org.New', 'org.Fast#testOne']],
+                     task._balance(['org.Fast#testOne', 'org.New', 'org.Slow'], 2,
+                                   durations=task._test_durations))
+    self.assertEqual([['org.Slow'], ['org.A', 'org.C'], ['org.B', 'org.Fast']],
+                     list(task._partition(['org.A', 'org.B', 'org.C', 'org.Fast', 'org.Slow'])))
+
+  def run_tests_with_durations(self, task, tests_to_targets, durations):
+    """Runs the given tests with a fake runner that reports the given test class durations."""
+    ran = []
+
+    def spawn_and_wait(**kwargs):
+      args = kwargs['args']
+      tests = args[args.index('-outdir') + 2:-1]
+      outdir = args[args.index('-outdir') + 1]
+      for test in tests:
+        ran.append(test)
+        safe_file_dump(os.path.join(outdir, 'TEST-{}.xml'.format(test)),
+                       '<testsuite name="{}" time="{}"/>'.format(test, durations[test]))
+      return 0
+
+    with patch.object(JUnitRun, 'tool_classpath', return_value=[]):
+      with patch.object(JUnitRun, 'classpath', return_value=[]):
+        with patch.object(JUnitRun, 'preferred_jvm_distribution', return_value=Mock()):
+          with patch.object(JUnitRun, '_spawn_and_wait', side_effect=spawn_and_wait):
+            task._run_tests(tests_to_targets)
+    return ran
+
+  def test_balanced_shards_run_every_test_once(self):
+    target = self.create_library('tests/java/org/pantsbuild', 'java_tests', 'tests', ['ATest.java'])
+    tests_to_targets = {test: target for test in ['org.A', 'org.B', 'org.C', 'org.D', 'org.E']}
+    # Each run reports durations quite different to those the shards were balanced by.
+    reported = {'org.A': 1.0, 'org.B': 1.0, 'org.C': 30.0, 'org.D': 40.0, 'org.E': 50.0}
+
+    # Record a history in the workdir with an unsharded run.
+    self.set_options(balance_by_timings=True)
+    task = self.create_task(self.context())
+    self.assertEqual(sorted(tests_to_targets),
+                     sorted(self.run_tests_with_durations(task, tests_to_targets, reported)))
+    with open(task._test_durations_file) as fp:
+      history = fp.read()
+
+    durations_file = os.path.join(self.build_root, 'test_durations.json')
+    durations = json.dumps({'org.A': 10.0, 'org.B': 10.0, 'org.C': 2.0})
+    safe_file_dump(durations_file, durations)
+    ran = []
+    for shard in range(3):
+      self.set_options(balance_by_timings=True, test_shard='{}/3'.format(shard),
+                       test_durations_file=durations_file)
+      task = self.create_task(self.context())
+      ran.extend(self.run_tests_with_durations(task, tests_to_targets, reported))
+
+    self.assertEqual(sorted(tests_to_targets), sorted(ran))
+    # Neither the durations the shards were balanced by nor the history were updated.
+    with open(durations_file) as fp:
+      self.assertEqual(durations, fp.read())
+    with open(task._test_durations_file) as fp:
+      self.assertEqual(history, fp.read())
+
+  def test_missing_test_durations_file(self):
+    self.set_options(balance_by_timings=True, test_shard='0/3',
+                     test_durations_file=os.path.join(self.build_root, 'nope.json'))
+    task = self.create_task(self.context())
+    with self.assertRaisesRegexp(TaskError, r'--test-durations-file'):
+      task._shard_durations
+
+  def test_invalid_balanced_test_shard(self):
+    self.set_options(balance_by_timings=True, test_shard='3/3')
+    with self.assertRaisesRegexp(TaskError, r'Invalid --test-shard'):
+      self.create_task(self.context())
@@ -0,0 +1,104 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+
+from pants.backend.jvm.targets.java_library import JavaLibrary
+from pants.backend.jvm.tasks.lint_task_mixin import LintTaskMixin
+from pants.base.exceptions import TaskError
+from pants.task.task import Task
+from pants_test.tasks.task_test_base import TaskTestBase
+
+
+class DummyLint(LintTaskMixin, Task):
+
+  @classmethod
+  def register_options(cls, register):
+    super(DummyLint, cls).register_options(register)
+    register('--use-nailgun', action='store_true', default=False)
+
+  def execute(self):
+    pass
+
+
+class LintTaskMixinTest(TaskTestBase):
+
+  @classmethod
+  def task_type(cls):
+    return DummyLint
+
+  def setUp(self):
+    super(LintTaskMixinTest, self).setUp()
+    self.checked = []
+    self.lock = threading.Lock()
+
+  def check(self, sources):
+    with self.lock:
+      self.checked.append(sorted(sources))
+    return 1 if any('bad' in source for source in sources) else 0
+
+  def create_target(self, name):
+    self.create_file('src/java/{0}/{0}.java'.format(name))
+    return self.make_target('src/java/{0}'.format(name), JavaLibrary,
+                            sources=['{}.java'.format(name)])
+
+  def lint(self, targets, **options):
+    self.set_options(**options)
+    task = self.create_task(self.context(target_roots=targets))
+    try:
+      with task.invalidated(targets) as invalidation_check:
+        failed = task.lint(invalidation_check.invalid_vts,
+                           lambda target: list(target.sources_relative_to_buildroot()),
+                           self.check)
+        if failed:
+          raise TaskError()
+    except TaskError:
+      pass
+    with task.invalidated(targets) as invalidation_check:
+      return failed, [vt.target for vt in invalidation_check.invalid_vts]
+
+  def test_passing_targets_marked_valid(self):
+    targets = [self.create_target(name) for name in ('a', 'bad', 'c', 'd')]
+
+    failed, invalid = self.lint(targets, worker_count=1)
+    self.assertEqual([targets[1]], failed)
+    self.assertEqual([targets[1]], invalid)
+    # The failing chunk is bisected. Since a passes, bad must fail and is not checked on its own.
+    self.assertEqual([['src/java/a/a.java', 'src/java/bad/bad.java',
+                       'src/java/c/c.java', 'src/java/d/d.java'],
+                      ['src/java/a/a.java', 'src/java/bad/bad.java'],
+                      ['src/java/a/a.java'],
+                      ['src/java/c/c.java', 'src/java/d/d.java']],
+                     self.checked)
+
+  def test_failing_chunk_bisected(self):
+    for bad_index in (0, 6, 15):
+      names = ['{}_{}'.format('bad' if i == bad_index else 'good', i) for i in range(16)]
+      targets = [self.create_target('{}/{}'.format(bad_index, name)) for name in names]
+      self.checked = []
+
+      failed, invalid = self.lint(targets, worker_count=1)
+      self.assertEqual([targets[bad_index]], failed)
+      self.assertEqual([targets[bad_index]], invalid)
+      # One check of the whole chunk, then at most two per halving.
+      self.assertLessEqual(len(self.checked), 1 + 2 * 4)
+
+  def test_concurrent_chunks(self):
+    targets = [self.create_target(name) for name in ('a', 'b', 'bad', 'd')]
+
+    failed, invalid = self.lint(targets, worker_count=2)
+    self.assertEqual([targets[2]], failed)
+    self.assertEqual([targets[2]], invalid)
+    # Two chunks of two, with only the chunk holding the failing target re-checked.
+    self.assertEqual(4, len(self.checked))
+    self.assertIn(['src/java/a/a.java', 'src/java/b/b.java'], self.checked)
+
+  def test_nailgun_checks_serially(self):
+    targets = [self.create_target(name) for name in ('a', 'b')]
+
+    self.lint(targets, worker_count=2, use_nailgun=True)
+    self.assertEqual([['src/java/a/a.java', 'src/java/b/b.java']], self.checked)
@@ -9,6 +9,8 @@ import json
 import os
 from textwrap import dedent
 
+from mock import patch
+
 from pants.backend.jvm.register import build_file_aliases as register_jvm
 from pants.backend.jvm.subsystems.scala_platform import ScalaPlatform
 from pants.backend.jvm.targets.jar_dependency import JarDependency
@@ -23,6 +25,7 @@ from pants.backend.jvm.tasks.classpath_products import ClasspathProducts
 from pants.backend.project_info.tasks.export import Export
 from pants.backend.python.register import build_file_aliases as register_python
 from pants.base.exceptions import TaskError
+from pants.base.worker_pool import WorkerPool
 from pants.build_graph.register import build_file_aliases as register_core
 from pants.build_graph.resources import Resources
 from pants.build_graph.target import Target
@@ -295,6 +298,16 @@ class ExportTest(InterpreterCacheTestMixin, ConsoleTaskTestBase):
     # confirms only one line of output, which is what -format should produce
     self.assertEqual(1, len(result))
 
+  def test_format_flag_streamed(self):
+    outfile = os.path.join(self.build_root, '.pants.d', 'test')
+    # Without libraries there are no jars to resolve.
+    self.set_options(formatted=False, output_file=outfile, libraries=False)
+    self.create_task(self.context(target_roots=[self.target('project_info:third')])).execute()
+    with open(outfile) as fp:
+      output = fp.read()
+    # The streamed chunks make up the same single line of JSON as console_output's.
+    self.assertEqual(''.join(self.execute_export('project_info:third')) + '\n', output)
+
   def test_target_types(self):
     result = self.execute_export_json('project_info:target_type')
     self.assertEqual('SOURCE',
@@ -377,3 +390,34 @@ class ExportTest(InterpreterCacheTestMixin, ConsoleTaskTestBase):
     self.assertTrue(result['targets']['src/python/alpha:alpha_synthetic_resources']['is_synthetic'])
     # But not the origin target
     self.assertFalse(result['targets']['src/python/alpha:alpha']['is_synthetic'])
+
+  def test_streamed_json(self):
+    def items():
+      yield 'version', '1.0.0'
+      yield 'targets', iter([('a', {'targets': ['b'], 'roots': []}),
+                             ('b', {'targets': [], 'id': 'b'})])
+      yield 'empty', iter([])
+      yield 'python_setup', {'interpreters': {'x': {'binary': 'python'}}}
+
+    expected = dict(version='1.0.0',
+                    targets={'a': {'targets': ['b'], 'roots': []},
+                             'b': {'targets': [], 'id': 'b'}},
+                    empty={},
+                    python_setup={'interpreters': {'x': {'binary': 'python'}}})
+    lines = list(Export._iter_json_lines(items()))
+    self.assertEqual(expected, json.loads('\n'.join(lines)))
+    # Streamed objects are indented just as `json.dumps` indents nested objects.
+    self.assertIn('        "b": {', lines)
+    self.assertIn('            "id": "b"', lines)
+    self.assertEqual(expected, json.loads(''.join(Export._iter_json_chunks(items()))))
+
+  def test_parallel_fragments(self):
+    self.set_options(worker_count=4, sources=True)
+    # Export in batches of one target, which must all share a single pool.
+    with patch.object(Export, '_BATCH_SIZE', 1), \
+         patch('pants.backend.project_info.tasks.export.WorkerPool', wraps=WorkerPool) as pool:
+      result = self.execute_export_json('project_info:java_test', 'project_info:jvm_target')
+    self.assertEqual(1, pool.call_count)
+    self.assertEqual(['project_info/this/is/a/source/Foo.scala',
+                      'project_info/this/is/a/source/Bar.scala'],
+                     result['targets']['project_info:jvm_target']['sources'])
@@ -6,16 +6,20 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import glob
+import imp
+import json
 import os
 import xml.dom.minidom as DOM
 from textwrap import dedent
 
 import coverage
-from mock import patch
+from mock import Mock, patch
 
+from pants.backend.python.targets.python_tests import PythonTests
 from pants.backend.python.tasks.pytest_run import PytestRun
-from pants.base.exceptions import TestFailedTaskError
+from pants.base.exceptions import TaskError, TestFailedTaskError
 from pants.util.contextutil import pushd
+from pants.util.dirutil import safe_file_dump
 from pants.util.timeout import TimeoutReached
 from pants_test.backend.python.tasks.python_task_test_base import PythonTaskTestBase
 
@@ -295,6 +299,21 @@ class PythonTestBuilderTest(PythonTestBuilderTestBase):
       args, kwargs = mock_timeout.call_args
       self.assertEqual(args, (1,))
 
+  def test_mixed_no_fast_workers(self):
+    self.run_failing_tests(targets=[self.green, self.red, self.error],
+                           failed_targets=[self.red, self.error],
+                           fast=False, fail_slow=True, workers=2)
+
+  def test_resultlog_merged_no_fast_workers(self):
+    resultlog = os.path.join(self.build_root, 'dist', 'resultlog')
+    self.run_failing_tests(targets=[self.green, self.red], failed_targets=[self.red],
+                           fast=False, fail_slow=True, workers=2,
+                           options=['--resultlog={}'.format(resultlog)])
+    with open(resultlog) as fp:
+      resultlog_content = fp.read()
+    self.assertIn('tests/test_core_green.py', resultlog_content)
+    self.assertIn('tests/test_core_red.py', resultlog_content)
+
   def test_junit_xml_option(self):
     # We expect xml of the following form:
     # <testsuite errors=[Ne] failures=[Nf] skips=[Ns] tests=[Nt] ...>
@@ -437,6 +456,11 @@ class PythonTestBuilderTest(PythonTestBuilderTestBase):
     with self.assertRaises(PytestRun.InvalidShardSpecification):
       self.run_tests(targets=[self.green], shard='1/a')
 
+  def test_strip_resultlog_args(self):
+    self.assertEqual(['-v', 'test.py'],
+                     PytestRun._strip_resultlog_args(['--resultlog=a', '-v', '--resultlog', 'b',
+                                                      'test.py']))
+
   def test_resultlog_regex(self):
     regex = PytestRun.RESULTLOG_FAILED_PATTERN
     for error_failure in ['E', 'F']:
@@ -450,3 +474,94 @@ class PythonTestBuilderTest(PythonTestBuilderTestBase):
       self.assertEqual(regex.match('%s   filename::class:method' % error_failure).group('file'), 'filename')
       self.assertEqual(regex.match('%s file/name.py::class:method' % error_failure).group('file'), 'file/name.py')
       self.assertEqual(regex.match('%s file:colons::class::method' % error_failure).group('file'), 'file:colons')
+
+
+class PythonTestBuilderShardingTest(PythonTestBuilderTestBase):
+  class Item(object):
+    def __init__(self, nodeid):
+      self.nodeid = nodeid
+
+  NODEIDS = ['tests/test_a.py::test_slow',
+             'tests/test_a.py::test_one',
+             'tests/test_b.py::TestB::()::test_two',
+             'tests/test_b.py::TestB::()::test_three']
+
+  def select(self, task):
+    with task._maybe_shard() as (conftest,):
+      conftest_module = imp.load_source('sharding_conftest', conftest)
+      items = [self.Item(nodeid) for nodeid in self.NODEIDS]
+      conftest_module.pytest_collection_modifyitems(session=None, config=Mock(), items=items)
+    return [item.nodeid for item in items]
+
+  def test_round_robin_without_durations(self):
+    self.set_options(shard='0/2')
+    task = self.create_task(self.context())
+    self.assertEqual(['tests/test_a.py::test_slow', 'tests/test_b.py::TestB::()::test_two'],
+                     self.select(task))
+
+  def write_durations(self, durations):
+    durations_file = os.path.join(self.build_root, 'durations.json')
+    safe_file_dump(durations_file, json.dumps(durations))
+    return durations_file
+
+  def write_junit_xml(self, path, nodeids, time):
+    testcases = []
+    for nodeid in nodeids:
+      names = [name.replace('.py', '') for name in nodeid.split('::') if name != '()']
+      testcases.append('<testcase classname="{}" name="{}" time="{}"/>'
+                       .format('.'.join(names[:-1]).replace('/', '.'), names[-1], time))
+    safe_file_dump(path, '<testsuite tests="{}">{}</testsuite>'.format(len(nodeids),
+                                                                      ''.join(testcases)))
+
+  def test_balanced_by_durations_file(self):
+    durations_file = self.write_durations({'tests.test_a.test_slow': 9.0,
+                                           'tests.test_a.test_one': 1.0,
+                                           'tests.test_b.TestB.test_two': 2.0})
+
+    # The unknown test_three is assumed to take the mean known duration of 4 seconds.
+    self.set_options(shard='0/2', test_durations_file=durations_file)
+    self.assertEqual(['tests/test_a.py::test_slow'], self.select(self.create_task(self.context())))
+    self.set_options(shard='1/2', test_durations_file=durations_file)
+    self.assertEqual(['tests/test_a.py::test_one',
+                      'tests/test_b.py::TestB::()::test_two',
+                      'tests/test_b.py::TestB::()::test_three'],
+                     self.select(self.create_task(self.context())))
+
+  def test_missing_test_durations_file(self):
+    self.set_options(shard='0/2', test_durations_file=os.path.join(self.build_root, 'missing.json'))
+    with self.assertRaises(TaskError):
+      self.select(self.create_task(self.context()))
+
+  def test_unsharded_runs_record_durations(self):
+    target = self.make_target('tests:a', PythonTests)
+    self.set_options(junit_xml_dir=os.path.join(self.build_root, 'junit'))
+    task = self.create_task(self.context())
+    with task._maybe_emit_junit_xml([target]) as (junit_arg,):
+      self.write_junit_xml(junit_arg[len('--junitxml='):], self.NODEIDS[:2], time=3.0)
+    with open(os.path.join(task.workdir, 'test_durations.json')) as fp:
+      self.assertEqual({'tests.test_a.test_slow': 3.0, 'tests.test_a.test_one': 3.0},
+                       json.load(fp))
+
+  def test_balanced_shards_run_every_test_once(self):
+    durations = {'tests.test_a.test_slow': 10.0,
+                 'tests.test_a.test_one': 10.0,
+                 'tests.test_b.TestB.test_two': 2.0}
+    durations_file = self.write_durations(durations)
+    target = self.make_target('tests:a', PythonTests)
+
+    selected = []
+    for shard in range(3):
+      self.set_options(shard='{}/3'.format(shard),
+                       test_durations_file=durations_file,
+                       junit_xml_dir=os.path.join(self.build_root, 'junit'))
+      task = self.create_task(self.context())
+      nodeids = self.select(task)
+      selected.extend(nodeids)
+      # Each shard's tests report durations that would re-balance later shards if recorded.
+      with task._maybe_emit_junit_xml([target]) as (junit_arg,):
+        self.write_junit_xml(junit_arg[len('--junitxml='):], nodeids, time=1.0)
+
+    self.assertEqual(sorted(self.NODEIDS), sorted(selected))
+    with open(durations_file) as fp:
+      self.assertEqual(durations, json.load(fp))
+    self.assertFalse(os.path.exists(os.path.join(task.workdir, 'test_durations.json')))
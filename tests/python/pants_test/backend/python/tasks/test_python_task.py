@@ -5,12 +5,17 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import os
 import subprocess
 from contextlib import contextmanager
 from textwrap import dedent
 
+from mock import Mock, patch
+
+from pants.backend.python.tasks import python_task as python_task_module
 from pants.backend.python.tasks.python_task import PythonTask
-from pants.util.contextutil import temporary_file_path
+from pants.util.contextutil import temporary_dir, temporary_file_path
+from pants.util.dirutil import safe_file_dump
 from pants_test.backend.python.tasks.python_task_test_base import PythonTaskTestBase
 
 
@@ -102,3 +107,36 @@ class PythonTaskTest(PythonTaskTestBase):
         # Adding an unused requests dep does not change the behavior of the binary despite
         # invalidating the chroot
         self.assertEqual(subprocess.check_output(pex1), subprocess.check_output(pex2))
+
+  def test_cached_chroots_share_library_layers(self):
+    with self.cached_chroot() as (chroot1, pex1):
+      self.rebind_targets()
+      self.binary.inject_dependency(self.requests.address)
+      with self.cached_chroot() as (chroot2, pex2):
+        self.assertNotEqual(chroot1.path(), chroot2.path())
+        # The unchanged library is linked into both chroots from the same layer.
+        lib1 = os.stat(os.path.join(chroot1.path(), 'lib', 'lib.py'))
+        lib2 = os.stat(os.path.join(chroot2.path(), 'lib', 'lib.py'))
+        self.assertEqual((lib1.st_dev, lib1.st_ino), (lib2.st_dev, lib2.st_ino))
+
+  def test_cached_chroot_gc_keeps_chroots_used_this_run(self):
+    with temporary_dir() as chroot_cache_dir:
+      self.set_options_for_scope('python-setup', chroot_cache_dir=chroot_cache_dir,
+                                 chroot_cache_max_size=0)
+      python_task = self.create_task(self.context(target_roots=[self.binary]))
+
+      def build_chroot(path, *args, **kwargs):
+        safe_file_dump(os.path.join(path, 'PEX-INFO'), '{}')
+      chroot_paths = [os.path.join(chroot_cache_dir, name) for name in ('stale', 'a', 'b')]
+      build_chroot(chroot_paths[0])
+
+      with patch.object(python_task, '_chroot_path', side_effect=chroot_paths[1:]), \
+           patch.object(python_task, '_build_chroot', side_effect=build_chroot), \
+           patch.object(python_task, 'create_chroot'), \
+           patch.object(python_task_module, 'PEXBuilder'), \
+           patch.object(python_task_module, 'PexInfo'):
+        for target in (self.library, self.binary):
+          python_task.cached_chroot(Mock(), None, [target])
+
+      # Though the cache may hold no bytes, only the chroot this run has not used is collected.
+      self.assertEqual([False, True, True], [os.path.exists(path) for path in chroot_paths])
@@ -0,0 +1,72 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.backend.python.chroot_cache_gc import LAYERS_DIR, garbage_collect_chroots
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_mkdir
+
+
+class ChrootCacheGcTest(unittest.TestCase):
+
+  def setUp(self):
+    self._tmpdir_context = temporary_dir()
+    self.cache_dir = self._tmpdir_context.__enter__()
+
+  def tearDown(self):
+    self._tmpdir_context.__exit__(None, None, None)
+
+  def create_entry(self, relpath, size, mtime):
+    path = os.path.join(self.cache_dir, relpath)
+    safe_file_dump(os.path.join(path, 'file'), 'x' * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+  def test_lru(self):
+    oldest = self.create_entry('a', 100, mtime=1)
+    layer = self.create_entry(os.path.join(LAYERS_DIR, 'b'), 100, mtime=2)
+    newest = self.create_entry('c', 100, mtime=3)
+
+    self.assertEqual([], garbage_collect_chroots(self.cache_dir, 300))
+    self.assertEqual([oldest, layer], garbage_collect_chroots(self.cache_dir, 150))
+    self.assertEqual([newest], [os.path.join(self.cache_dir, name)
+                                for name in os.listdir(self.cache_dir) if name != LAYERS_DIR])
+    self.assertEqual([], os.listdir(os.path.join(self.cache_dir, LAYERS_DIR)))
+
+  def test_keep(self):
+    oldest = self.create_entry('a', 100, mtime=1)
+    newest = self.create_entry('b', 100, mtime=2)
+
+    self.assertEqual([newest], garbage_collect_chroots(self.cache_dir, 0, keep=[oldest]))
+    self.assertTrue(os.path.exists(oldest))
+
+  def test_tmp_dirs_ignored(self):
+    tmp = self.create_entry('a.tmp', 100, mtime=1)
+    layer_tmp = self.create_entry(os.path.join(LAYERS_DIR, 'b.tmp.1234'), 100, mtime=1)
+
+    self.assertEqual([], garbage_collect_chroots(self.cache_dir, 0))
+    self.assertTrue(os.path.exists(tmp))
+    self.assertTrue(os.path.exists(layer_tmp))
+
+  def test_hard_links_shared(self):
+    layer = self.create_entry(os.path.join(LAYERS_DIR, 'layer'), 100, mtime=1)
+    chroot = os.path.join(self.cache_dir, 'chroot')
+    safe_mkdir(chroot)
+    os.link(os.path.join(layer, 'file'), os.path.join(chroot, 'file'))
+    os.utime(chroot, (2, 2))
+
+    # The two entries only occupy 100 bytes between them.
+    self.assertEqual([], garbage_collect_chroots(self.cache_dir, 100))
+    # Removing the layer leaves the chroot intact.
+    self.assertEqual([layer], garbage_collect_chroots(self.cache_dir, 99))
+    with open(os.path.join(chroot, 'file')) as fp:
+      self.assertEqual('x' * 100, fp.read())
+
+  def test_missing_cache_dir(self):
+    self.assertEqual([], garbage_collect_chroots(os.path.join(self.cache_dir, 'nope'), 0))
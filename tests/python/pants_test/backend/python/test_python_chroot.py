@@ -7,11 +7,16 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import subprocess
+import threading
+import time
 from contextlib import contextmanager
 from textwrap import dedent
 
+from mock import patch
+from pex.package import Package
 from pex.pex_builder import PEXBuilder
 from pex.platforms import Platform
+from pex.resolver import CachingResolver
 
 from pants.backend.codegen.targets.python_antlr_library import PythonAntlrLibrary
 from pants.backend.codegen.targets.python_thrift_library import PythonThriftLibrary
@@ -19,7 +24,7 @@ from pants.backend.codegen.targets.python_thrift_library import PythonThriftLibr
 # in pants java since non-jvm backends depend on it to run things.
 from pants.backend.jvm.subsystems.jvm import JVM
 from pants.backend.python.interpreter_cache import PythonInterpreterCache
-from pants.backend.python.python_chroot import PythonChroot
+from pants.backend.python.python_chroot import PythonChroot, _ConcurrentCachingResolver
 from pants.backend.python.python_requirement import PythonRequirement
 from pants.backend.python.python_setup import PythonRepos, PythonSetup
 from pants.backend.python.targets.python_binary import PythonBinary
@@ -39,6 +44,34 @@ def test_get_current_platform():
   assert set(expected_platforms) == set(PythonChroot.get_platforms(['current', 'linux-x86_64']))
 
 
+def test_concurrent_builds_of_a_package_are_serialized():
+  building = set()
+  overlapped = []
+  lock = threading.Lock()
+
+  def build(resolver, package, options):
+    with lock:
+      overlapped.append(package.filename in building)
+      building.add(package.filename)
+    time.sleep(0.05)
+    with lock:
+      building.remove(package.filename)
+
+  packages = [Package.from_href('/cache/{}'.format(name))
+              for name in ('a-1.0.tar.gz', 'a-1.0.tar.gz', 'b-1.0.tar.gz', 'b-1.0.tar.gz')]
+  with temporary_dir() as cache:
+    resolvers = [_ConcurrentCachingResolver(cache, None, platform=platform)
+                 for platform in ('linux-x86_64', 'macosx-10.11-x86_64') * 2]
+    with patch.object(CachingResolver, 'build', autospec=True, side_effect=build):
+      threads = [threading.Thread(target=resolver.build, args=(package, None))
+                 for resolver, package in zip(resolvers, packages)]
+      for thread in threads:
+        thread.start()
+      for thread in threads:
+        thread.join()
+  assert [False] * 4 == overlapped
+
+
 class PythonChrootTest(BaseTest):
 
   def setUp(self):
@@ -0,0 +1,124 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import os
+import unittest
+
+from mock import Mock
+from pex.util import DistributionHelper
+from pkg_resources import Requirement
+
+from pants.backend.python.resolved_requirements_cache import ResolvedRequirementsCache
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_rmtree
+
+
+class ResolvedRequirementsCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self._tmpdir_context = temporary_dir()
+    self.tmpdir = self._tmpdir_context.__enter__()
+    self.cache_dir = os.path.join(self.tmpdir, 'resolved_sets')
+    self.interpreter = Mock(identity='CPython-2.7.10')
+    ResolvedRequirementsCache._memory_cache.clear()
+
+  def tearDown(self):
+    self._tmpdir_context.__exit__(None, None, None)
+
+  def create_distribution(self, name, version):
+    egg = os.path.join(self.tmpdir, 'dists', '{}-{}-py2.7.egg'.format(name, version))
+    safe_file_dump(os.path.join(egg, 'EGG-INFO', 'PKG-INFO'),
+                   'Metadata-Version: 1.0\nName: {}\nVersion: {}\n'.format(name, version))
+    return DistributionHelper.distribution_from_path(egg)
+
+  def key(self, requirements, platform='linux-x86_64', find_links=()):
+    return ResolvedRequirementsCache.key(requirements, self.interpreter, platform, find_links)
+
+  def test_key(self):
+    reqs = [Requirement.parse('foo==1.0'), Requirement.parse('bar>=2')]
+    self.assertEqual(self.key(reqs), self.key(list(reversed(reqs))))
+    self.assertNotEqual(self.key(reqs), self.key(reqs[:1]))
+    self.assertNotEqual(self.key(reqs), self.key(reqs, platform='macosx-10.4-x86_64'))
+    self.assertNotEqual(self.key(reqs), self.key(reqs, find_links=['/tmp/repo']))
+    self.assertNotEqual(self.key(reqs),
+                        ResolvedRequirementsCache.key(reqs, Mock(identity='CPython-2.6.9'),
+                                                      'linux-x86_64', ()))
+
+  def test_round_trip(self):
+    reqs = [Requirement.parse('foo==1.0')]
+    key = self.key(reqs)
+    self.assertIsNone(ResolvedRequirementsCache(self.cache_dir).get(key, reqs))
+
+    foo = self.create_distribution('foo', '1.0')
+    ResolvedRequirementsCache(self.cache_dir).put(key, [foo])
+    self.assertEqual([foo], ResolvedRequirementsCache(self.cache_dir).get(key, reqs))
+
+    # A fresh process only has the persisted entry to go on.
+    ResolvedRequirementsCache._memory_cache.clear()
+    cached = ResolvedRequirementsCache(self.cache_dir).get(key, reqs)
+    self.assertEqual([(foo.project_name, foo.version, foo.location)],
+                     [(dist.project_name, dist.version, dist.location) for dist in cached])
+
+  def test_missing_distribution(self):
+    reqs = [Requirement.parse('foo==1.0')]
+    key = self.key(reqs)
+    foo = self.create_distribution('foo', '1.0')
+    ResolvedRequirementsCache(self.cache_dir).put(key, [foo])
+
+    ResolvedRequirementsCache._memory_cache.clear()
+    safe_rmtree(foo.location)
+    self.assertIsNone(ResolvedRequirementsCache(self.cache_dir).get(key, reqs))
+
+  def test_ttl(self):
+    exact = [Requirement.parse('foo==1.0')]
+    inexact = [Requirement.parse('foo>=1.0')]
+    transitive = [Requirement.parse('foo==1.0'), Requirement.parse('baz==1.0')]
+    foo = self.create_distribution('foo', '1.0')
+    bar = self.create_distribution('bar', '2.0')
+    for reqs, dists in (exact, [foo]), (inexact, [foo]), (transitive, [foo, bar]):
+      ResolvedRequirementsCache(self.cache_dir).put(self.key(reqs), dists)
+
+    # Record every entry as having been resolved long ago.
+    ResolvedRequirementsCache._memory_cache.clear()
+    for name in os.listdir(self.cache_dir):
+      path = os.path.join(self.cache_dir, name)
+      with open(path, 'rb') as fp:
+        entry = json.load(fp)
+      entry['recorded_at'] = 0
+      with open(path, 'wb') as fp:
+        json.dump(entry, fp)
+
+    cache = ResolvedRequirementsCache(self.cache_dir, ttl=60)
+    self.assertIsNotNone(cache.get(self.key(exact), exact))
+    self.assertIsNone(cache.get(self.key(inexact), inexact))
+    # Exact requirements can still resolve open-ended transitive distributions, like bar here.
+    self.assertIsNone(cache.get(self.key(transitive), transitive))
+
+  def test_memory_cache_revalidated(self):
+    reqs = [Requirement.parse('foo==1.0')]
+    key = self.key(reqs)
+    foo = self.create_distribution('foo', '1.0')
+    ResolvedRequirementsCache(self.cache_dir).put(key, [foo])
+
+    safe_rmtree(foo.location)
+    self.assertIsNone(ResolvedRequirementsCache(self.cache_dir).get(key, reqs))
+
+  def test_memory_cache_bounded(self):
+    reqs = [Requirement.parse('foo==1.0')]
+    foo = self.create_distribution('foo', '1.0')
+    keys = [self.key(reqs, platform='platform-{}'.format(i))
+            for i in range(ResolvedRequirementsCache._MEMORY_CACHE_SIZE + 1)]
+    for key in keys:
+      ResolvedRequirementsCache(self.cache_dir).put(key, [foo])
+
+    self.assertEqual(ResolvedRequirementsCache._MEMORY_CACHE_SIZE,
+                     len(ResolvedRequirementsCache._memory_cache))
+    # Only the least recently used entry was evicted, and it is still persisted.
+    cache = ResolvedRequirementsCache(self.cache_dir)
+    self.assertNotIn(cache._path(keys[0]), ResolvedRequirementsCache._memory_cache)
+    self.assertEqual([foo.location], [dist.location for dist in cache.get(keys[0], reqs)])
@@ -5,7 +5,17 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import BaseHTTPServer
+import os
+import SocketServer
+import time
+from contextlib import contextmanager
+from threading import Lock, Thread
+
 from pants.binaries.binary_util import BinaryUtil
+from pants.net.http.fetcher import Fetcher
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
 from pants_test.base_test import BaseTest
 
 
@@ -18,12 +28,13 @@ class BinaryUtilTest(BaseTest):
     def __init__(self, read_map):
       self._map = read_map
 
-    def download(self, url, listener=None, path_or_fd=None):
+    def download(self, url, listener=None, path_or_fd=None, **kwargs):
       if not url in self._map:
         raise IOError("404: Virtual URL '{}' does not exist.".format(url))
       if not path_or_fd:
         raise AssertionError("Expected path_or_fd to be set")
-      path_or_fd.write(self._map[url])
+      with open(path_or_fd, 'wb') as fp:
+        fp.write(self._map[url])
       return path_or_fd
 
     def keys(self):
@@ -167,3 +178,136 @@ class BinaryUtilTest(BaseTest):
     self.assertEquals("supportdir/skynet/42/name/version",
                       binary_util._select_binary_base_path("supportdir", "name", "version",
                                                            uname_func=uname_func))
+
+
+class BinaryUtilFetchTest(BaseTest):
+  """Tests binary_util's fetching against a real HTTP server."""
+
+  class RangeHTTPHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    # Maps a request path to its (content, delay_secs).
+    files = {}
+    requests = []
+    lock = Lock()
+
+    @staticmethod
+    def etag(content):
+      return '"{}"'.format(len(content))
+
+    def do_GET(self):
+      with self.lock:
+        self.requests.append((self.path, self.headers.get('Range')))
+      if self.path not in self.files:
+        self.send_response(404)
+        self.end_headers()
+        return
+      content, delay_secs = self.files[self.path]
+      time.sleep(delay_secs)
+      offset = 0
+      range_header = self.headers.get('Range')
+      if range_header and self.headers.get('If-Range') == self.etag(content):
+        offset = int(range_header[len('bytes='):].rstrip('-'))
+      self.send_response(206 if offset else 200)
+      self.send_header('Content-Length', str(len(content) - offset))
+      self.send_header('ETag', self.etag(content))
+      self.end_headers()
+      self.wfile.write(content[offset:])
+
+    def log_message(self, format, *args):
+      pass
+
+  class ThreadingHTTPServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+    daemon_threads = True
+
+  def setUp(self):
+    super(BinaryUtilFetchTest, self).setUp()
+    self.RangeHTTPHandler.files = {}
+    self.RangeHTTPHandler.requests = []
+
+  @contextmanager
+  def setup_server(self):
+    httpd = self.ThreadingHTTPServer(('localhost', 0), self.RangeHTTPHandler)
+    httpd_thread = Thread(target=httpd.serve_forever)
+    httpd_thread.start()
+    try:
+      yield 'http://localhost:{0}'.format(httpd.server_address[1])
+    finally:
+      httpd.shutdown()
+      httpd_thread.join()
+
+  def serve(self, path, content, delay_secs=0):
+    self.RangeHTTPHandler.files['/' + path] = (content, delay_secs)
+
+  def read(self, path):
+    with open(path, 'rb') as fp:
+      return fp.read()
+
+  def assert_no_partial_files(self, bootstrapdir):
+    for root, _, files in os.walk(bootstrapdir):
+      self.assertEqual(['foo'], files)
+
+  def partial_download(self, url, bootstrapdir, content, validator):
+    downloadpath = os.path.join(bootstrapdir, 'scripts/foo/1.0/foo~')
+    partial = BinaryUtil._partial_path(downloadpath, '{}/base/scripts/foo/1.0/foo'.format(url))
+    safe_file_dump(partial, content)
+    if validator:
+      safe_file_dump(Fetcher._validator_path(partial), validator)
+
+  def test_resume(self):
+    self.serve('base/scripts/foo/1.0/foo', 'foo script')
+    with self.setup_server() as url, temporary_dir() as bootstrapdir:
+      binary_util = BinaryUtil(['{}/base'.format(url)], 30, bootstrapdir)
+      self.partial_download(url, bootstrapdir, 'foo ', self.RangeHTTPHandler.etag('foo script'))
+
+      path = binary_util.select_script('scripts/foo', '1.0', 'foo')
+      self.assertEqual('foo script', self.read(path))
+      self.assertEqual([('/base/scripts/foo/1.0/foo', 'bytes=4-')],
+                       self.RangeHTTPHandler.requests)
+      self.assertTrue(os.access(path, os.X_OK))
+      self.assert_no_partial_files(os.path.dirname(path))
+
+  def test_resume_changed(self):
+    self.serve('base/scripts/foo/1.0/foo', 'foo script')
+    with self.setup_server() as url, temporary_dir() as bootstrapdir:
+      binary_util = BinaryUtil(['{}/base'.format(url)], 30, bootstrapdir)
+      # A partial download of content the server no longer has is started over.
+      self.partial_download(url, bootstrapdir, 'old ', self.RangeHTTPHandler.etag('old foo'))
+
+      path = binary_util.select_script('scripts/foo', '1.0', 'foo')
+      self.assertEqual('foo script', self.read(path))
+      self.assert_no_partial_files(os.path.dirname(path))
+
+  def test_resume_unvalidated(self):
+    self.serve('base/scripts/foo/1.0/foo', 'foo script')
+    with self.setup_server() as url, temporary_dir() as bootstrapdir:
+      binary_util = BinaryUtil(['{}/base'.format(url)], 30, bootstrapdir)
+      # Without a validator there is no telling whether the partial download is still current.
+      self.partial_download(url, bootstrapdir, 'old ', None)
+
+      path = binary_util.select_script('scripts/foo', '1.0', 'foo')
+      self.assertEqual('foo script', self.read(path))
+      self.assertEqual([('/base/scripts/foo/1.0/foo', None)], self.RangeHTTPHandler.requests)
+
+  def test_hedge(self):
+    self.serve('slow/scripts/foo/1.0/foo', 'slow foo', delay_secs=0.5)
+    self.serve('fast/scripts/foo/1.0/foo', 'fast foo')
+    with self.setup_server() as url, temporary_dir() as bootstrapdir:
+      binary_util = BinaryUtil(['{}/slow'.format(url), '{}/fast'.format(url)], 30, bootstrapdir,
+                               hedge_delay_secs=0.05)
+      path = binary_util.select_script('scripts/foo', '1.0', 'foo')
+      self.assertEqual('fast foo', self.read(path))
+      self.assertEqual(['/slow/scripts/foo/1.0/foo', '/fast/scripts/foo/1.0/foo'],
+                       [request_path for request_path, _ in self.RangeHTTPHandler.requests])
+      self.assert_no_partial_files(os.path.dirname(path))
+
+  def test_hedge_fallback(self):
+    self.serve('good/scripts/foo/1.0/foo', 'foo script')
+    with self.setup_server() as url, temporary_dir() as bootstrapdir:
+      # A partial download left behind by an earlier attempt at a mirror that has since gone away.
+      safe_file_dump(BinaryUtil._partial_path(os.path.join(bootstrapdir, 'scripts/foo/1.0/foo~'),
+                                              '{}/missing/scripts/foo/1.0/foo'.format(url)),
+                     'foo ')
+      binary_util = BinaryUtil(['{}/missing'.format(url), '{}/good'.format(url)], 30, bootstrapdir,
+                               hedge_delay_secs=10)
+      path = binary_util.select_script('scripts/foo', '1.0', 'foo')
+      self.assertEqual('foo script', self.read(path))
+      self.assert_no_partial_files(os.path.dirname(path))
@@ -79,6 +79,24 @@ class BuildGraphTest(BaseTest):
     self.build_graph.inject_target(target)
     self.assertTrue(self.build_graph.contains_address(a))
 
+  def test_generation(self):
+    generation = self.build_graph.generation
+    a = self.make_target('a')
+    self.assertLess(generation, self.build_graph.generation)
+
+    generation = self.build_graph.generation
+    b = self.make_target('b')
+    self.build_graph.inject_dependency(b.address, a.address)
+    self.assertLess(generation, self.build_graph.generation)
+
+    # Re-injecting an existing dependency leaves the graph, and so its generation, unchanged.
+    generation = self.build_graph.generation
+    self.build_graph.inject_dependency(b.address, a.address)
+    self.assertEqual(generation, self.build_graph.generation)
+
+    self.build_graph.reset()
+    self.assertLess(generation, self.build_graph.generation)
+
   def test_get_target_from_spec(self):
     a = self.make_target('foo:a')
     result = self.build_graph.get_target_from_spec('foo:a')
@@ -285,6 +303,36 @@ class BuildGraphTest(BaseTest):
     )
     self.inject_address_closure('//:synth_library_address')
 
+  def test_inject_synthetic_dependencies(self):
+    a = self.make_target('a')
+    b = self.make_target('b', dependencies=[a])
+    c = self.make_target('c', dependencies=[b])
+    d = self.make_target('d', dependencies=[c])
+
+    synthetic_a = Address.parse('synthetic:a')
+    synthetic_b = Address.parse('synthetic:b')
+    self.build_graph.inject_synthetic_target(synthetic_a, Target, derived_from=a)
+    self.build_graph.inject_synthetic_target(synthetic_b, Target, derived_from=b)
+
+    marked_dirty = []
+    for target in self.build_graph.targets():
+      target.mark_transitive_invalidation_hash_dirty = (
+        lambda target=target: marked_dirty.append(target.address))
+
+    self.build_graph.inject_synthetic_dependencies([(a.address, synthetic_a),
+                                                    (b.address, synthetic_b)])
+
+    self.assertEqual({a.address, synthetic_a}, set(self.build_graph.dependencies_of(b.address)))
+    # Pairs are wired in order, so the synthetic `b` also picks up the synthetic `a`.
+    self.assertEqual({a.address, synthetic_a}, set(self.build_graph.dependencies_of(synthetic_b)))
+    # `c` depends on `b`, so it should now also depend on the synthetic target derived from `b`.
+    self.assertEqual({b.address, synthetic_b}, set(self.build_graph.dependencies_of(c.address)))
+    self.assertEqual(set(), set(self.build_graph.dependencies_of(synthetic_a)))
+
+    # Everything downstream of the dependencies of `b` is marked dirty, exactly once.
+    self.assertEqual(sorted([a.address, b.address, c.address, d.address, synthetic_a, synthetic_b]),
+                     sorted(marked_dirty))
+
   def test_invalid_address_two_hops_same_file(self):
     self.add_to_build_file('BUILD',
                            'target(name="a", '
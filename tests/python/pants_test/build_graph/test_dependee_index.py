@@ -0,0 +1,71 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+from textwrap import dedent
+
+from pants.build_graph.address import Address
+from pants.build_graph.dependee_index import DependeeIndex
+from pants_test.base_test import BaseTest
+
+
+class DependeeIndexTest(BaseTest):
+
+  def setUp(self):
+    super(DependeeIndexTest, self).setUp()
+    self.add_to_build_file('a', "target(name='a')")
+    self.add_to_build_file('b', "target(name='b', dependencies=['a'])")
+    self.add_to_build_file('c', dedent("""
+      target(name='c', dependencies=['b'])
+      target(name='c2', dependencies=[':c'])
+    """))
+    self.add_to_build_file('d', "target(name='d', dependencies=['a'])")
+
+  def index(self):
+    return DependeeIndex(self.address_mapper,
+                         self.build_graph,
+                         DependeeIndex.index_file(self.pants_workdir))
+
+  def dependees(self, index, spec, transitive=False):
+    return set(address.spec for address in index.dependees_of([Address.parse(spec)],
+                                                              transitive=transitive))
+
+  def test_direct(self):
+    index = self.index()
+    self.assertEqual({'b:b', 'd:d'}, self.dependees(index, 'a'))
+    self.assertEqual({'c:c2'}, self.dependees(index, 'c'))
+    self.assertEqual(set(), self.dependees(index, 'c:c2'))
+
+  def test_transitive(self):
+    index = self.index()
+    self.assertEqual({'b:b', 'c:c', 'c:c2', 'd:d'}, self.dependees(index, 'a', transitive=True))
+    self.assertEqual({'c:c', 'c:c2'}, self.dependees(index, 'b', transitive=True))
+
+  def test_incremental_update(self):
+    self.assertEqual(4, self.index().update())
+
+    self.reset_build_graph()
+    index = self.index()
+    self.assertEqual(0, index.update())
+    self.assertEqual(0, len(self.build_graph.targets()))
+    self.assertEqual({'b:b', 'd:d'}, self.dependees(index, 'a'))
+
+    self.create_file('d/BUILD', "target(name='d', dependencies=['b'])")
+    self.reset_build_graph()
+    index = self.index()
+    self.assertEqual(1, index.update())
+    self.assertEqual({'b:b'}, self.dependees(index, 'a'))
+    self.assertEqual({'c:c', 'd:d'}, self.dependees(index, 'b'))
+
+  def test_removed_build_file(self):
+    self.index().update()
+
+    self.create_file('c/BUILD', '')
+    self.create_file('d/BUILD', '')
+    self.reset_build_graph()
+    index = self.index()
+    self.assertEqual(2, index.update())
+    self.assertEqual({'b:b'}, self.dependees(index, 'a', transitive=True))
@@ -0,0 +1,94 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+from pants.backend.jvm.targets.java_library import JavaLibrary
+from pants.build_graph.build_file_aliases import BuildFileAliases
+from pants.build_graph.owner_index import OwnerIndex
+from pants.build_graph.resources import Resources
+from pants.source.wrapped_globs import Globs, RGlobs
+from pants_test.base_test import BaseTest
+
+
+class OwnerIndexTest(BaseTest):
+
+  @property
+  def alias_groups(self):
+    return BuildFileAliases(
+      targets={
+        'java_library': JavaLibrary,
+        'resources': Resources,
+      },
+      context_aware_object_factories={
+        'globs': Globs,
+        'rglobs': RGlobs,
+      },
+    )
+
+  def index(self, match_filespecs=False):
+    self.reset_build_graph()
+    return OwnerIndex(self.address_mapper, self.build_graph,
+                      OwnerIndex.index_file(self.pants_workdir),
+                      match_filespecs=match_filespecs)
+
+  def owners(self, index, *sources):
+    return {source: set(address.spec for address in addresses)
+            for source, addresses in index.target_addresses_for_sources(sources).items()}
+
+  def test_warm_lookup_skips_parsing(self):
+    self.create_files('src/a', ['A.java', 'B.java'])
+    self.add_to_build_file('src/a', "java_library(name='a', sources=globs('*.java'))")
+    self.assertEqual({'src/a/A.java': {'src/a:a'}, 'src/a/BUILD': {'src/a:a'}},
+                     self.owners(self.index(), 'src/a/A.java', 'src/a/BUILD'))
+
+    index = self.index()
+    self.assertEqual({'src/a/B.java': {'src/a:a'}}, self.owners(index, 'src/a/B.java'))
+    self.assertEqual(0, len(self.build_graph.targets()))
+
+  def test_build_file_change(self):
+    self.add_to_build_file('src/a', "java_library(name='a', sources=['A.java'])")
+    self.assertEqual({'src/a/A.java': {'src/a:a'}}, self.owners(self.index(), 'src/a/A.java'))
+
+    self.create_file('src/a/BUILD', "java_library(name='b', sources=['A.java'])")
+    self.assertEqual({'src/a/A.java': {'src/a:b'}}, self.owners(self.index(), 'src/a/A.java'))
+
+    self.create_file('src/a/BUILD.extra', "java_library(name='c', sources=['A.java'])")
+    self.assertEqual({'src/a/A.java': {'src/a:b', 'src/a:c'}},
+                     self.owners(self.index(), 'src/a/A.java'))
+
+  def test_directory_change(self):
+    self.create_files('src/a', ['A.java'])
+    self.add_to_build_file('src/a', "java_library(name='a', sources=rglobs('*.java'))")
+    self.assertEqual({'src/a/b/B.java': set()}, self.owners(self.index(), 'src/a/b/B.java'))
+
+    self.create_files('src/a/b', ['B.java'])
+    self.assertEqual({'src/a/b/B.java': {'src/a:a'}}, self.owners(self.index(), 'src/a/b/B.java'))
+
+  def test_match_filespecs(self):
+    self.add_to_build_file('src/a', "java_library(name='a', sources=globs('*.java'))")
+    self.assertEqual({'src/a/Deleted.java': set()}, self.owners(self.index(), 'src/a/Deleted.java'))
+    self.assertEqual({'src/a/Deleted.java': {'src/a:a'}},
+                     self.owners(self.index(match_filespecs=True), 'src/a/Deleted.java'))
+
+  def test_resources(self):
+    self.create_files('src/a/res', ['a.txt', 'b.txt'])
+    self.add_to_build_file('src/a/res', "resources(name='r', sources=['a.txt'])")
+    self.add_to_build_file('src/a', "java_library(name='a', resources=['src/a/res:r'])")
+    self.assertEqual({'src/a/res/a.txt': {'src/a/res:r', 'src/a:a'}},
+                     self.owners(self.index(), 'src/a/res/a.txt'))
+
+    # The java_library's family must be invalidated by changes to the resources it depends on.
+    self.create_file('src/a/res/BUILD', "resources(name='r', sources=['b.txt'])")
+    self.assertEqual({'src/a/res/a.txt': set(), 'src/a/res/b.txt': {'src/a/res:r', 'src/a:a'}},
+                     self.owners(self.index(), 'src/a/res/a.txt', 'src/a/res/b.txt'))
+
+  def test_sources_in_spec_paths(self):
+    self.create_files('src/a', ['A.java', 'B.java'])
+    self.add_to_build_file('src/a', "java_library(name='a', sources=globs('*.java'))")
+    sources_by_address = self.index().sources_in_spec_paths(['src/a', 'src/missing'])
+    self.assertEqual({'src/a:a': ['src/a/A.java', 'src/a/B.java']},
+                     {address.spec: sorted(sources)
+                      for address, sources in sources_by_address.items()})
@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 # TODO: Create a dummy target type in this test and remove this dep.
 from pants.backend.jvm.targets.java_library import JavaLibrary
 from pants.build_graph.build_file_aliases import BuildFileAliases
+from pants.build_graph.owner_index import OwnerIndex
 from pants.build_graph.source_mapper import LazySourceMapper, SpecSourceMapper
 from pants_test.base_test import BaseTest
 
@@ -104,3 +105,16 @@ class LazySourceMapperTest(SourceMapperTest, BaseTest):
 class SpecSourceMapperTest(SourceMapperTest, BaseTest):
   def set_mapper(self, fast=False):
     self._mapper = SpecSourceMapper(self.address_mapper, self.build_graph, fast)
+
+
+class OwnerIndexTest(SourceMapperTest, BaseTest):
+  def set_mapper(self, fast=False):
+    self._mapper = OwnerIndex(self.address_mapper, self.build_graph,
+                              OwnerIndex.index_file(self.pants_workdir), fast)
+
+
+class OwnerIndexMatchFilespecsTest(SourceMapperTest, BaseTest):
+  def set_mapper(self, fast=False):
+    self._mapper = OwnerIndex(self.address_mapper, self.build_graph,
+                              OwnerIndex.index_file(self.pants_workdir), fast,
+                              match_filespecs=True)
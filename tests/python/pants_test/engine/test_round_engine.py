@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import itertools
 
 from pants.engine.round_engine import RoundEngine
+from pants.goal.task_registrar import TaskRegistrar
 from pants.task.task import Task
 from pants_test.base_test import BaseTest
 from pants_test.engine.base_engine_test import EngineTestBase
@@ -205,6 +206,59 @@ class RoundEngineTest(EngineTestBase, BaseTest):
                         self.as_goals('goal1', 'goal2', 'goal1', 'goal3', 'goal2'))
     self.assert_actions('task1', 'task2', 'task3')
 
+  def test_concurrent_tasks(self):
+    self.set_options_for_scope('', task_worker_count=2)
+    task1 = self.install_task('task1', goal='goal1', product_types=['1'])
+    task2 = self.install_task('task2', goal='goal1', product_types=['2'])
+    task3 = self.install_task('task3', goal='goal1', required_data=['1'])
+    task4 = self.install_task('task4', goal='goal1', product_types=['2'])
+    self.create_context(for_task_types=task1+task2+task3+task4)
+    self.engine.attempt(self._context, self.as_goals('goal1'))
+
+    # task1 and task2 are independent, task3 consumes the product of task1 and task4 produces the
+    # same product as task2; those two in turn are independent of each other.
+    executions = self.actions[-8:]
+    self.assertEqual([self.construct_action('task1'), self.construct_action('task2')],
+                     executions[:2])
+    self.assertEqual({self.execute_action('task1'), self.execute_action('task2')},
+                     set(executions[2:4]))
+    self.assertEqual([self.construct_action('task3'), self.construct_action('task4')],
+                     executions[4:6])
+    self.assertEqual({self.execute_action('task3'), self.execute_action('task4')},
+                     set(executions[6:]))
+
+  def assert_waves(self, *waves):
+    executions = self.actions[-2 * sum(len(wave) for wave in waves):]
+    for wave in waves:
+      self.assertEqual([self.construct_action(task) for task in wave], executions[:len(wave)])
+      self.assertEqual({self.execute_action(task) for task in wave},
+                       set(executions[len(wave):2 * len(wave)]))
+      executions = executions[2 * len(wave):]
+
+  def test_concurrent_tasks_respect_first(self):
+    self.set_options_for_scope('', task_worker_count=2)
+    task1 = self.install_task('task1', goal='goal1', product_types=['1'])
+    task2 = self.install_task('task2', goal='goal1', product_types=['2'])
+    # Conflicts with nothing through products, but was explicitly ordered ahead of the others.
+    prep = TaskRegistrar('prep', action=self.record('prep', product_types=['0'])).install(
+      'goal1', first=True).task_types()
+    task3 = self.install_task('task3', goal='goal1', product_types=['3'])
+    self.create_context(for_task_types=task1+task2+prep+task3)
+    self.engine.attempt(self._context, self.as_goals('goal1'))
+
+    self.assert_waves(['prep'], ['task1', 'task2', 'task3'])
+
+  def test_concurrent_tasks_productless_task_runs_alone(self):
+    self.set_options_for_scope('', task_worker_count=2)
+    task1 = self.install_task('task1', goal='goal1', product_types=['1'])
+    task2 = self.install_task('task2', goal='goal1')
+    task3 = self.install_task('task3', goal='goal1', product_types=['3'])
+    task4 = self.install_task('task4', goal='goal1', product_types=['4'])
+    self.create_context(for_task_types=task1+task2+task3+task4)
+    self.engine.attempt(self._context, self.as_goals('goal1'))
+
+    self.assert_waves(['task1'], ['task2'], ['task3', 'task4'])
+
   def test_replace_target_roots(self):
     task1 = self.install_task('task1', goal='goal1')
     task2 = self.install_task('task2', goal='goal2', alternate_target_roots=[42])
@@ -5,6 +5,8 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+from mock import patch
+
 from pants.build_graph.address import Address
 from pants.build_graph.target import Target
 from pants_test.base_test import BaseTest
@@ -106,3 +108,26 @@ class ContextTest(BaseTest):
     b.inject_dependency(syn_with_deps.address)
 
     self.assertEquals([b, syn_with_deps, a], context.targets())
+
+  def test_targets_cached_until_graph_mutated(self):
+    a = self.make_target('a')
+    b = self.make_target('b', dependencies=[a])
+    context = self.context(target_roots=[b])
+
+    with patch.object(context.build_graph, 'transitive_subgraph_of_addresses',
+                      wraps=context.build_graph.transitive_subgraph_of_addresses) as walk:
+      self.assertEquals([b, a], context.targets())
+      self.assertEquals([b], context.targets(lambda t: t == b))
+      self.assertEquals([a, b], context.targets(postorder=True))
+      # One walk each for the roots and the (empty) synthetics, per traversal order.
+      self.assertEquals(4, walk.call_count)
+
+      # Callers are free to mutate the lists they are handed.
+      context.targets().remove(a)
+      self.assertEquals([b, a], context.targets())
+      self.assertEquals(4, walk.call_count)
+
+      c = self.make_target('c')
+      b.inject_dependency(c.address)
+      self.assertEquals([b, a, c], context.targets())
+      self.assertEquals(6, walk.call_count)
@@ -18,6 +18,7 @@ from six import StringIO
 
 from pants.net.http.fetcher import Fetcher
 from pants.util.contextutil import temporary_file
+from pants.util.dirutil import safe_file_dump
 
 
 class FetcherTest(mox.MoxTestBase):
@@ -211,6 +212,70 @@ class FetcherTest(mox.MoxTestBase):
       with open(path) as fp:
         self.assertEqual(downloaded, fp.read())
 
+  def expect_resume(self, status_code, chunks, validator='"v1"'):
+    with temporary_file() as fd:
+      fd.write('012')
+      fd.close()
+      validator_path = Fetcher._validator_path(fd.name)
+      if validator:
+        safe_file_dump(validator_path, validator)
+        headers = {'Range': 'bytes=3-', 'If-Range': validator}
+        self.requests.get('http://1', allow_redirects=True, stream=True, timeout=13,
+                          headers=headers).AndReturn(self.response)
+      else:
+        self.requests.get('http://1', allow_redirects=True, stream=True,
+                          timeout=13).AndReturn(self.response)
+      self.response.status_code = status_code
+      self.response.headers = {'etag': '"v2"'}
+      self.response.iter_content(chunk_size=13).AndReturn(chunks)
+      self.response.close()
+
+      self.mox.ReplayAll()
+
+      try:
+        path = self.fetcher.download('http://1',
+                                     path_or_fd=fd.name,
+                                     chunk_size_bytes=13,
+                                     timeout_secs=13,
+                                     resume=True)
+        # A completed download is never resumed.
+        self.assertFalse(os.path.exists(validator_path))
+        with open(path) as fp:
+          return fp.read()
+      finally:
+        Fetcher.delete_download(fd.name)
+
+  def test_download_resume(self):
+    self.assertEqual('0123456789a', self.expect_resume(206, ['3456789', 'a']))
+
+  def test_download_resume_range_ignored(self):
+    self.assertEqual('0123456789a', self.expect_resume(200, ['0123456789', 'a']))
+
+  def test_download_resume_unvalidated(self):
+    self.assertEqual('0123456789a', self.expect_resume(200, ['0123456789', 'a'], validator=None))
+
+  def test_download_resume_interrupted(self):
+    with temporary_file() as fd:
+      fd.close()
+      self.requests.get('http://1', allow_redirects=True, stream=True,
+                        timeout=13).AndReturn(self.response)
+      self.response.status_code = 200
+      self.response.headers = {'etag': 'W/"weak"', 'last-modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+      self.response.iter_content(chunk_size=13).AndRaise(requests.Timeout)
+      self.response.close()
+
+      self.mox.ReplayAll()
+
+      try:
+        with self.assertRaises(Fetcher.TransientError):
+          self.fetcher.download('http://1', path_or_fd=fd.name, chunk_size_bytes=13,
+                                timeout_secs=13, resume=True)
+        # The validator the download started from is kept to resume it with, weak ETags aside.
+        with open(Fetcher._validator_path(fd.name)) as fp:
+          self.assertEqual('Wed, 21 Oct 2015 07:28:00 GMT', fp.read())
+      finally:
+        Fetcher.delete_download(fd.name)
+
 
 class FetcherRedirectTest(unittest.TestCase):
   # NB(Eric Ayers): Using class variables like this seems horrible, but I can't figure out a better
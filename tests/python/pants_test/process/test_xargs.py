@@ -7,6 +7,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import errno
 import os
+import threading
+import unittest
 
 import mox
 
@@ -86,3 +88,50 @@ class XargsTest(mox.MoxTestBase):
     self.mox.ReplayAll()
 
     self.assertEqual(42, self.xargs.execute(['one', 'two', 'three', 'four']))
+
+  def test_execute_chunked_up_front(self):
+    # Each of these args costs 3 bytes plus a terminating NUL and an 8 byte argv pointer.
+    xargs = Xargs(self.call, max_args_size=2 * 12)
+    self.call(['one', 'two']).AndReturn(0)
+    self.call(['six']).AndReturn(0)
+    self.mox.ReplayAll()
+
+    self.assertEqual(0, xargs.execute(['one', 'two', 'six']))
+
+  def test_execute_chunked_oversized_arg(self):
+    xargs = Xargs(self.call, max_args_size=1)
+    self.call(['one']).AndReturn(0)
+    self.call(['two']).AndReturn(0)
+    self.mox.ReplayAll()
+
+    self.assertEqual(0, xargs.execute(['one', 'two']))
+
+  def test_max_args_size(self):
+    env = {'A': 'b'}
+    self.assertEqual(Xargs.max_args_size(env=env) - 12,
+                     Xargs.max_args_size(cmd=['one'], env=env))
+    self.assertEqual(Xargs.max_args_size(env=env) - 13,
+                     Xargs.max_args_size(env={'A': 'bc', 'D': 'e'}))
+
+
+class ParallelXargsTest(unittest.TestCase):
+  def setUp(self):
+    self.lock = threading.Lock()
+    self.calls = []
+
+  def call(self, args):
+    with self.lock:
+      self.calls.append(args)
+    return 1 if 'bad' in args else 0
+
+  def execute(self, args):
+    return Xargs(self.call, max_args_size=1, worker_count=2).execute(args)
+
+  def test_execute(self):
+    self.assertEqual(0, self.execute(['one', 'two', 'three']))
+    self.assertEqual([['one'], ['three'], ['two']], sorted(self.calls))
+
+  def test_execute_fail(self):
+    self.assertEqual(1, self.execute(['one', 'bad', 'three']))
+    # All chunks run, even once one has failed.
+    self.assertEqual([['bad'], ['one'], ['three']], sorted(self.calls))
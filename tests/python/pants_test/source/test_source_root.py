@@ -106,3 +106,30 @@ class SourceRootTest(BaseTest):
                        SourceRoot('src/example/python', ('python',)),
                        SourceRoot('my/project/src/java', ('java',))},
                       set(source_roots.all_roots()))
+
+  def test_find_many(self):
+    source_roots = create_subsystem(SourceRootConfig, source_root_patterns=['src/*'],
+                                    unmatched='fail').get_source_roots()
+    self.assertEquals([SourceRoot('src/java', ('java',)),
+                       None,
+                       SourceRoot('src/python', ('python',)),
+                       SourceRoot('src/java', ('java',))],
+                      source_roots.find_many(['src/java/org/pantsbuild/foo',
+                                              'not/a/srcroot/java',
+                                              'src/python/pantsbuild/foo',
+                                              'src/java/org/pantsbuild/foo']))
+
+  def test_trie_shared(self):
+    options = {'source_root_patterns': ['src/*'], 'unmatched': 'fail'}
+    source_roots1 = create_subsystem(SourceRootConfig, **options).get_source_roots()
+    source_roots2 = create_subsystem(SourceRootConfig, **options).get_source_roots()
+    self.assertIs(source_roots1._trie, source_roots2._trie)
+
+    # A memoized miss does not survive the addition of a source root, nor is the addition visible
+    # to other SourceRoots sharing the trie.
+    self.assertIsNone(source_roots1.find_by_path('fixed/foo'))
+    source_roots1.add_source_root('fixed')
+    self.assertEquals(SourceRoot('fixed', ()), source_roots1.find_by_path('fixed/foo'))
+    self.assertIsNone(source_roots2.find_by_path('fixed/foo'))
+    self.assertIsNone(create_subsystem(SourceRootConfig, **options).get_source_roots()
+                      .find_by_path('fixed/foo'))
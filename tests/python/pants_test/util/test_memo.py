@@ -5,9 +5,12 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import gc
 import unittest
+import weakref
 
-from pants.util.memo import memoized, memoized_property, per_instance
+from pants.util.memo import (lru_cache, memo_stats, memoized, memoized_property, per_instance,
+                             weak_per_instance)
 
 
 class MemoizeTest(unittest.TestCase):
@@ -277,3 +280,57 @@ class MemoizeTest(unittest.TestCase):
 
     self.assertEqual(4, foo2.calls)
     self.assertEqual(4, foo2.calls)
+
+  def test_lru_cache(self):
+    calculations = []
+
+    @memoized(cache_factory=lru_cache(2))
+    def square(num):
+      calculations.append(num)
+      return num * num
+
+    self.assertEqual(4, square(2))
+    self.assertEqual(9, square(3))
+    self.assertEqual(4, square(2))
+    # Evicts 3, the least recently used.
+    self.assertEqual(16, square(4))
+    self.assertEqual(4, square(2))
+    self.assertEqual(9, square(3))
+
+    self.assertEqual([2, 3, 4, 3], calculations)
+    self.assertEqual(2, square.stats()['size'])
+
+  def test_weak_per_instance(self):
+    class Foo(self._Called):
+      @memoized_property(key_factory=weak_per_instance)
+      def calls(self):
+        return self._called()
+
+    foo1 = Foo(1)
+    self.assertEqual(1, foo1.calls)
+    self.assertEqual(1, foo1.calls)
+    foo2 = Foo(2)
+    self.assertEqual(2, foo2.calls)
+    self.assertEqual(2, Foo.calls.fget.stats()['size'])
+
+    del foo2.calls
+    self.assertEqual(4, foo2.calls)
+
+    # The memoized result does not keep its instance alive, and goes when the instance does.
+    foo1_ref = weakref.ref(foo1)
+    del foo1
+    gc.collect()
+    self.assertIsNone(foo1_ref())
+    self.assertEqual(1, Foo.calls.fget.stats()['size'])
+
+  def test_stats(self):
+    @memoized
+    def stats_square(num):
+      return num * num
+
+    stats_square(2)
+    stats_square(2)
+    stats_square(3)
+    self.assertEqual(dict(hits=1, misses=2, size=2), stats_square.stats())
+    self.assertEqual(dict(hits=1, misses=2, size=2),
+                     memo_stats()['{}.stats_square'.format(__name__)])